@@ -0,0 +1,126 @@
+"""
+Benchmark: shared admission gate in front of Gemini during a demand spike.
+
+A burst of chat turns from many sessions hits the local stand-in server,
+which enforces a requests-per-second quota (429 above it). Without the gate
+every turn goes straight to the API and retries on 429; with the gate turns
+are rate-limited to the quota, flagged (symptom) messages jump the queue and
+turns that would wait too long are refused at once. A second run shows
+round-robin fairness when one session floods the queue.
+
+Run from the repository root:
+    python benchmarks/bench_admission.py
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.admission import AdmissionGate, Overloaded
+from triage.gemini_client import GeminiClient, GeminiError, build_contents
+from triage.mock_gemini_server import MockState, start
+
+MODEL = "models/gemini-2.0-flash"
+QUOTA_PER_S = 20
+SESSIONS = 200
+SPIKE_S = 2.0
+FLAGGED_SHARE = 0.1
+
+
+def run_spike(client, gate):
+    """Every session sends one turn within SPIKE_S; returns per-turn outcome rows"""
+    rng = random.Random(5)
+    rows = []
+    lock = threading.Lock()
+
+    def turn(i, flagged):
+        contents = build_contents([{"role": "user", "content": f"question {i}"}])
+        t0 = time.perf_counter()
+        try:
+            if gate is None:
+                client.generate(contents)
+            else:
+                with gate.acquire(f"s{i}", flagged):
+                    client.generate(contents)
+            outcome = 'answered'
+        except Overloaded:
+            outcome = 'refused'
+        except GeminiError:
+            outcome = 'failed'
+        with lock:
+            rows.append((outcome, flagged, time.perf_counter() - t0))
+
+    threads = []
+    for i in range(SESSIONS):
+        threads.append(threading.Thread(target=turn, args=(i, rng.random() < FLAGGED_SHARE)))
+        threads[-1].start()
+        time.sleep(SPIKE_S / SESSIONS)
+    for t in threads:
+        t.join()
+    return rows
+
+
+def summarize(label, rows, server_429):
+    def p95(outcome, flagged=None):
+        xs = [s for o, f, s in rows if o == outcome and (flagged is None or f == flagged)]
+        return f"{np.percentile(xs, 95):.2f}" if xs else "-"
+    count = {o: sum(1 for r in rows if r[0] == o) for o in ('answered', 'failed', 'refused')}
+    print(f"{label:<10}{count['answered']:>9}{count['failed']:>8}{count['refused']:>9}{server_429:>7}"
+          f"{p95('answered', True):>12}{p95('answered', False):>12}{p95('failed'):>10}{p95('refused'):>10}")
+
+
+def run_fairness(client):
+    """One session queues 30 turns at once, then 10 other sessions ask one question each"""
+    gate = AdmissionGate(rate_per_s=QUOTA_PER_S * 0.9, burst=2, max_in_flight=4, max_waiting=64, max_wait_s=10)
+    waits = {'flooding session': [], 'other sessions': []}
+    lock = threading.Lock()
+
+    def turn(session, key):
+        t0 = time.perf_counter()
+        with gate.acquire(session):
+            wait = time.perf_counter() - t0
+            client.generate(build_contents([{"role": "user", "content": "hi"}]))
+        with lock:
+            waits[key].append(wait)
+
+    threads = [threading.Thread(target=turn, args=("flood", 'flooding session')) for _ in range(30)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    others = [threading.Thread(target=turn, args=(f"u{i}", 'other sessions')) for i in range(10)]
+    for t in others:
+        t.start()
+    for t in threads + others:
+        t.join()
+    print("\nFairness: one session floods 30 turns, then 10 sessions ask once")
+    for key, xs in waits.items():
+        print(f"  {key:<18} queue wait p50 {np.median(xs) * 1000:6.0f} ms, max {max(xs) * 1000:6.0f} ms")
+
+
+def main():
+    print(f"{SESSIONS} sessions within {SPIKE_S:.0f} s, API quota {QUOTA_PER_S} req/s, "
+          f"{FLAGGED_SHARE:.0%} of messages flagged")
+    print(f"{'':<10}{'answered':>9}{'failed':>8}{'refused':>9}{'429s':>7}"
+          f"{'p95 flag s':>12}{'p95 other s':>12}{'p95 fail':>10}{'p95 ref':>10}")
+    for label, gated in (("no gate", False), ("gate", True)):
+        state = MockState(latency_ms=300, jitter_ms=50, quota_per_s=QUOTA_PER_S)
+        server, base_url = start(state)
+        client = GeminiClient("x", MODEL, base_url=base_url, deadline_s=10.0)
+        gate = AdmissionGate(rate_per_s=QUOTA_PER_S * 0.9, burst=5, max_in_flight=16,
+                             max_waiting=64, max_wait_s=5.0) if gated else None
+        rows = run_spike(client, gate)
+        summarize(label, rows, state.counts['http_429'])
+        if gated:
+            run_fairness(client)
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
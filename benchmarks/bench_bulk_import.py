@@ -0,0 +1,119 @@
+"""
+Benchmark: bulk import of offline call sheets vs. one call at a time.
+
+Writes a synthetic sheet of 100,000 calls (with a sprinkling of bad rows) as
+CSV and as JSONL, and imports each into a scratch queue with
+triage.bulk_import. The baseline is what clicking the calls through the
+patient form costs per call: classify, load the queue and stats, append,
+save both files; it is timed on the first few thousand rows and
+extrapolated, since it grows with the queue.
+
+Run from the repository root:
+    python benchmarks/bench_bulk_import.py
+"""
+
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from triage.bulk_import import import_calls
+from triage.classifier import FEATURES, hybrid_classify_and_prioritize
+from triage.geocoder import build_geocoder
+from triage.queue_store import load_queue, load_stats, record_call, save_queue, save_stats
+from triage.triage_api import caller_fields, classify, new_request
+
+ROWS = 100_000
+BASELINE_ROWS = 2_000
+BAD_EVERY = 997
+LOCATIONS = ["Sitabuldi", "Dharampeth", "Sadar", "Manish Nagar", "Itwari", "Near Medical Square",
+             "plot 12, Ramdaspeth", "Civil Lines", "Hingna Road", "Koradi"]
+COLUMNS = ['id', 'name', 'age', 'phone', 'location'] + FEATURES + ['symptoms']
+
+
+def make_rows():
+    rng = random.Random(7)
+    rows = []
+    for i in range(ROWS):
+        row = {
+            'id': f"drill-{i}", 'name': f"Casualty {i}", 'age': rng.randint(1, 95),
+            'phone': f"98{rng.randint(10 ** 7, 10 ** 8 - 1)}", 'location': rng.choice(LOCATIONS),
+            'symptoms': "",
+        }
+        for f in FEATURES:
+            row[f] = rng.choice(("yes", "no", "no", "no"))
+        if i % BAD_EVERY == BAD_EVERY - 1:
+            row[rng.choice(('age', 'bleeding', 'name'))] = rng.choice(("", "maybe", "-4"))
+        rows.append(row)
+    return rows
+
+
+def write_sheets(rows, folder):
+    csv_path = os.path.join(folder, "calls.csv")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    jsonl_path = os.path.join(folder, "calls.jsonl")
+    with open(jsonl_path, "w") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+    return csv_path, jsonl_path
+
+
+def one_at_a_time(rows, geocoder, queue_path, stats_path):
+    """Per-call cost of the form path: classify, then read-append-write both files"""
+    answers_of = {'yes': 1, 'no': 0}
+    t0 = time.perf_counter()
+    done = 0
+    for row in rows[:BASELINE_ROWS]:
+        try:
+            fields = caller_fields(row)
+            answers = {f: answers_of[row[f]] for f in FEATURES}
+        except (ValueError, KeyError):
+            continue
+        result = classify(answers)
+        request = new_request(fields, result, geocoder.geocode(fields['location']))
+        queue = load_queue(queue_path)
+        stats = load_stats(stats_path)
+        if record_call(queue, stats, request):
+            save_queue(queue, queue_path)
+            save_stats(stats, stats_path)
+        done += 1
+    return time.perf_counter() - t0, done
+
+
+def main():
+    geocoder = build_geocoder()
+    hybrid_classify_and_prioritize({})      # model warm before any timing
+    rows = make_rows()
+    with tempfile.TemporaryDirectory(prefix="bulk-import-") as folder:
+        csv_path, jsonl_path = write_sheets(rows, folder)
+        print(f"Sheet: {ROWS:,} calls, {ROWS // BAD_EVERY} with a corrupted field "
+              f"(CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, JSONL {os.path.getsize(jsonl_path) / 1e6:.1f} MB)")
+        print(f"{'path':<28}{'seconds':>9}{'rows/s':>10}{'queued':>9}{'rejected':>10}")
+
+        for name, path, fmt in (("bulk import, CSV", csv_path, 'csv'), ("bulk import, JSONL", jsonl_path, 'jsonl')):
+            queue_path = os.path.join(folder, f"queue-{fmt}.json")
+            stats_path = os.path.join(folder, f"stats-{fmt}.json")
+            with open(path, newline="") as f:
+                report = import_calls(f, fmt, geocoder, queue_path, stats_path)
+            assert len(load_queue(queue_path)) == report['queued']
+            print(f"{name:<28}{report['seconds']:>9.2f}{report['rows'] / report['seconds']:>10,.0f}"
+                  f"{report['queued']:>9,}{len(report['errors']):>10,}")
+
+        seconds, done = one_at_a_time(rows, geocoder, os.path.join(folder, "queue-one.json"),
+                                      os.path.join(folder, "stats-one.json"))
+        print(f"{'one call at a time':<28}{seconds:>9.2f}{done / seconds:>10,.0f}{done:>9,}"
+              f"   (first {BASELINE_ROWS:,} rows; slows down as the queue grows)")
+
+
+if __name__ == "__main__":
+    main()
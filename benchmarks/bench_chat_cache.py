@@ -0,0 +1,95 @@
+"""
+Benchmark: chatbot response cache on a skewed stream of first-aid questions.
+
+Questions pick a topic (Zipf-like) and a phrasing template, so the stream
+has exact repeats and rephrasings. Reports exact / near-duplicate hit rates,
+how often a near-duplicate hit answered a different topic, lookup cost and
+the Gemini round trips saved (against the local stand-in server). Then
+checks that questions with the opposite meaning or another patient group
+never reuse each other's answers.
+
+Run from the repository root:
+    python benchmarks/bench_chat_cache.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.chat_cache import ResponseCache
+from triage.gemini_client import GeminiClient, build_contents
+from triage.mock_gemini_server import MockState, start
+
+TOPICS = [
+    "chest pain", "bleeding", "burns", "choking", "a seizure", "stroke symptoms", "snake bite",
+    "a broken arm", "heat stroke", "fainting", "an asthma attack", "a dog bite", "a nosebleed",
+    "high fever in a child", "an allergic reaction", "a sprained ankle", "food poisoning",
+]
+TEMPLATES = [
+    "what to do for {t}", "What to do for {t}?", "first aid for {t}", "{t} what should I do",
+    "how can I help someone with {t}", "what should i do for {t}", "First aid for {t}!",
+]
+N_QUESTIONS = 1500
+# (cached question, lookalike that must not get its answer)
+MUST_MISS = [
+    ("fever that will not go down", "fever that will go down"),
+    ("my child is not breathing", "my child is breathing"),
+    ("can I give aspirin to a child", "is it safe to give aspirin"),
+    ("what to do for chest pain", "chest pain in a child"),
+]
+
+
+def main():
+    state = MockState(latency_ms=40, jitter_ms=5)
+    server, base_url = start(state)
+    client = GeminiClient("x", "models/gemini-2.0-flash", base_url=base_url)
+    path = os.path.join(tempfile.mkdtemp(), "chat_cache.json")
+    cache = ResponseCache(path=path)
+
+    rng = random.Random(8)
+    weights = [1.0 / (i + 1) for i in range(len(TOPICS))]
+    stream = [rng.choices(TOPICS, weights=weights)[0] for _ in range(N_QUESTIONS)]
+
+    wrong = 0
+    lookup_s = 0.0
+    t0 = time.perf_counter()
+    for topic in stream:
+        question = rng.choice(TEMPLATES).format(t=topic)
+        t1 = time.perf_counter()
+        hit = cache.get(question)
+        lookup_s += time.perf_counter() - t1
+        if hit is None:
+            answer = client.generate(build_contents([{"role": "user", "content": question}]))
+            cache.put(question, answer)
+        elif topic not in hit['answer']:
+            wrong += 1
+    elapsed = time.perf_counter() - t0
+
+    stats = cache.stats()
+    print(f"{N_QUESTIONS} questions over {len(TOPICS)} topics x {len(TEMPLATES)} phrasings")
+    print(f"Exact hits:     {stats['exact']:5d}")
+    print(f"Similar hits:   {stats['similar']:5d} ({wrong} answered another topic)")
+    print(f"Misses:         {stats['misses']:5d} -> Gemini round trips")
+    print(f"Hit rate:       {stats['hit_rate']:.1%}")
+    print(f"Lookup cost:    {lookup_s / N_QUESTIONS * 1e6:.0f} us/question")
+    print(f"Wall time:      {elapsed:.2f}s vs ~{N_QUESTIONS * state.latency_ms / 1000:.0f}s uncached")
+
+    probe = ResponseCache(path=None)
+    for cached, lookalike in MUST_MISS:
+        probe.put(cached, f"answer for: {cached}")
+        assert probe.get(lookalike) is None, lookalike
+    print(f"Lookalikes:     {len(MUST_MISS)}/{len(MUST_MISS)} correctly missed")
+
+    t1 = time.perf_counter()
+    warm = ResponseCache(path=path)
+    print(f"Reloaded {warm.stats()['entries']} entries from disk in {(time.perf_counter() - t1) * 1000:.1f} ms")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
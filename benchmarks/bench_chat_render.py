@@ -0,0 +1,102 @@
+"""
+Benchmark: chat transcript rendering, one st.markdown per message vs one
+memoized HTML block.
+
+Runs both renderers headless with Streamlit's AppTest for conversations of
+10, 100 and 1000 messages. Reports the elements (websocket deltas) per run
+and the time of a rerun after one message was appended, which is what every
+chat turn triggers. The two renderers are copies of the old and new
+render_chat in pages/chatbot.py, which cannot be imported on its own.
+
+Run from the repository root:
+    python benchmarks/bench_chat_render.py
+"""
+
+import time
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+HELPERS = '''
+import streamlit as st
+
+def safe(text):
+    return text.replace("<", "&lt;").replace(">", "&gt;").replace("\\n", "<br>")
+
+def user_bubble(text):
+    return f"<div class='user-bubble'><span class='bubble-label'>You</span>{safe(text)}</div>"
+
+def bot_bubble(text, source="gemini"):
+    return f"<div class='bot-bubble'><span class='bubble-label'>AI Assistant</span>{safe(text)}</div>"
+'''
+
+PER_MESSAGE = HELPERS + '''
+st.markdown("<div class='chat-container'>", unsafe_allow_html=True)
+for msg in st.session_state.messages:
+    if msg["role"] == "user":
+        st.markdown(user_bubble(msg["content"]), unsafe_allow_html=True)
+    else:
+        st.markdown(bot_bubble(msg["content"], msg.get("source", "gemini")), unsafe_allow_html=True)
+st.markdown("</div>", unsafe_allow_html=True)
+'''
+
+BATCHED = HELPERS + '''
+def message_html(cache, i, msg):
+    key = (msg["role"], msg.get("source"), hash(msg["content"]))
+    hit = cache.get(i)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    if msg["role"] == "user":
+        html = user_bubble(msg["content"])
+    else:
+        html = bot_bubble(msg["content"], msg.get("source", "gemini"))
+    cache[i] = (key, html)
+    return html
+
+if "bubble_html" not in st.session_state:
+    st.session_state.bubble_html = {}
+cache = st.session_state.bubble_html
+messages = st.session_state.messages
+for i in [i for i in cache if i >= len(messages)]:
+    del cache[i]
+if messages:
+    st.markdown("".join(message_html(cache, i, msg) for i, msg in enumerate(messages)), unsafe_allow_html=True)
+'''
+
+SIZES = (10, 100, 1000)
+RERUNS = 5
+REPLY = ("Keep the person calm and seated, loosen tight clothing and call 108 if symptoms get worse.\n"
+         "Do not give food or drink. <b>Watch</b> their breathing until help arrives.")
+
+
+def conversation(n):
+    return [{"role": "user", "content": f"question {i}: what should I do?"} if i % 2 == 0
+            else {"role": "assistant", "content": REPLY, "source": "gemini"} for i in range(n)]
+
+
+def measure(script, n):
+    at = AppTest.from_string(script, default_timeout=120)
+    at.session_state.messages = conversation(n)
+    at.run()
+    samples = []
+    for i in range(RERUNS):
+        messages = at.session_state.messages
+        messages.append({"role": "user", "content": f"follow-up {i}"})
+        t0 = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - t0)
+    elements = len(at.markdown)
+    size = sum(len(m.value) for m in at.markdown)
+    return elements, size, np.median(samples) * 1000
+
+
+def main():
+    print(f"{'messages':>9}{'renderer':>14}{'elements':>10}{'KB':>8}{'rerun ms':>10}")
+    for n in SIZES:
+        for label, script in (("per message", PER_MESSAGE), ("batched", BATCHED)):
+            elements, size, ms = measure(script, n)
+            print(f"{n:>9}{label:>14}{elements:>10}{size / 1024:>8.1f}{ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
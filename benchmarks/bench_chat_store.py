@@ -0,0 +1,86 @@
+"""
+Benchmark: chat history in session state vs the sqlite chat store.
+
+Builds the history of a heavy user (many past chats with long transcripts)
+both ways and reports the memory held per user on the server, the cost of
+the sidebar on each rerun, the per-turn save and the load-on-click latency.
+
+Run from the repository root:
+    python benchmarks/bench_chat_store.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.chat_store import ChatStore
+
+CHATS = 200
+TURNS_PER_CHAT = 20
+REPLY = ("Keep the person calm and seated, loosen tight clothing and call 108 if symptoms are severe. "
+         "Do not give food or drink until a doctor has seen them. ") * 2
+
+
+def transcript(chat):
+    messages = []
+    for turn in range(TURNS_PER_CHAT):
+        messages.append({"role": "user", "content": f"chat {chat} question {turn}: what should I do next?"})
+        messages.append({"role": "assistant", "content": REPLY, "source": "gemini"})
+    return messages
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return np.median(samples) * 1000
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "chat_history.db")
+    store = ChatStore(path)
+    chats = [transcript(c) for c in range(CHATS)]
+
+    # Old layout: every past chat copied into st.session_state.chat_sessions
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    chat_sessions = [{"messages": [dict(m) for m in c], "time": "12:00"} for c in chats]
+    old_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    for c, messages in enumerate(chats):
+        for n in range(2, len(messages) + 1, 2):      # saved turn by turn, as the page does
+            store.save("user-1", f"chat-{c}", messages[:n])
+    save_ms = (time.perf_counter() - t0) * 1000 / (CHATS * TURNS_PER_CHAT)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    index = store.list_sessions("user-1")
+    new_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    old_sidebar = timed(lambda: [(s["messages"][0]["content"][:35], s["messages"].copy()) for s in chat_sessions], 50)
+    new_sidebar = timed(lambda: store.list_sessions("user-1"), 50)
+    load = timed(lambda: store.load(index[len(index) // 2]["id"]), 50)
+
+    print(f"Heavy user: {CHATS} chats x {2 * TURNS_PER_CHAT} messages; store keeps the last {store.max_sessions}")
+    print(f"{'':<22}{'session state':>15}{'chat store':>12}")
+    print(f"{'server memory':<22}{old_bytes / 1024:>12.0f} KB{new_bytes / 1024:>9.1f} KB")
+    print(f"{'sidebar per rerun':<22}{old_sidebar:>12.2f} ms{new_sidebar:>9.2f} ms")
+    print(f"{'sidebar buttons':<22}{len(chat_sessions):>15}{len(index):>12}")
+    print(f"Save per turn {save_ms:.2f} ms, open a chat (load {2 * TURNS_PER_CHAT} messages) {load:.2f} ms")
+    print(f"Database: {os.path.getsize(path) / 1024:.0f} KB on disk, {len(index)} chats listed")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: throughput and memory of `python -m triage classify`.
+
+Pipes synthetic JSONL answer rows (mixed object, nested and vector forms)
+into the CLI and reads its output, for inputs ten times apart in size. Peak
+RSS of the CLI process should stay flat as the input grows, since it holds
+one chunk at a time.
+
+Run from the repository root:
+    python benchmarks/bench_classify_cli.py
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from triage.classifier import FEATURES
+
+SIZES = [100_000, 1_000_000]
+
+
+def make_lines(n, seed=5):
+    rng = random.Random(seed)
+    for i in range(n):
+        flags = [int(rng.random() < 0.2) for _ in FEATURES]
+        kind = i % 3
+        if kind == 0:
+            row = flags
+        elif kind == 1:
+            row = dict(zip(FEATURES, flags))
+        else:
+            row = {'id': i, 'answers': dict(zip(FEATURES, flags))}
+        yield json.dumps(row) + "\n"
+
+
+def run(n):
+    """(seconds, output lines, input MB, peak RSS MB) of classifying n rows"""
+    proc = subprocess.Popen([sys.executable, "-m", "triage", "classify"], cwd=ROOT,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    sent = [0]
+
+    def feed():
+        for line in make_lines(n):
+            data = line.encode()
+            sent[0] += len(data)
+            proc.stdin.write(data)
+        proc.stdin.close()
+
+    t0 = time.perf_counter()
+    writer = threading.Thread(target=feed)
+    writer.start()
+    lines = sum(1 for _ in proc.stdout)
+    writer.join()
+    _, _, usage = os.wait4(proc.pid, 0)
+    proc.returncode = 0
+    return time.perf_counter() - t0, lines, sent[0] / 1e6, usage.ru_maxrss / 1024
+
+
+def main():
+    print(f"{'rows':>10}{'input MB':>10}{'seconds':>9}{'rows/s':>10}{'peak RSS MB':>13}")
+    for n in SIZES:
+        seconds, lines, mb, rss = run(n)
+        assert lines == n, (lines, n)
+        print(f"{n:>10,}{mb:>10.1f}{seconds:>9.2f}{n / seconds:>10,.0f}{rss:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: token-budgeted context window vs resending the whole chat.
+
+Replays one long conversation against the local stand-in server, whose
+prefill delay grows with the request size like a real model's. At turns 5,
+50 and 200 it reports request bytes, estimated prompt tokens and round-trip
+latency for the full history and for the windowed payload (system prompt +
+rolling summary + recent turns), plus the cost of building the window.
+
+Run from the repository root:
+    python benchmarks/bench_context_window.py
+"""
+
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.context_window import ContextWindow, estimate_tokens
+from triage.gemini_client import GeminiClient, build_contents
+from triage.mock_gemini_server import MockState, start
+
+SYSTEM_INSTRUCTION = """
+You are a medical AI assistant.
+- Keep answers to the point and safe (3-5 sentences).
+- Never diagnose, just advise.
+- Tell user to see doctor for serious issues.
+- If emergency symptoms → urge calling 108 immediately.
+"""
+CHECKPOINTS = (5, 50, 200)
+REPEATS = 15
+MODEL = "models/gemini-2.0-flash"
+QUESTIONS = [
+    "my father has chest pain and is sweating, what should I do",
+    "he is 62 and has diabetes, does that change anything",
+    "should I give him aspirin while we wait for the ambulance",
+    "how do I check if he is breathing properly",
+    "what if he faints before the ambulance arrives",
+    "can I give him water",
+    "how long does the ambulance usually take",
+    "what should I tell the paramedics when they arrive",
+]
+ANSWER = ("Keep him seated and calm, loosen tight clothing and call 108 now. If he is not allergic, "
+          "one adult aspirin chewed slowly can help. Watch his breathing and be ready to start CPR "
+          "if he becomes unresponsive and stops breathing normally. Note the time the pain started.")
+
+
+def conversation(turns, rng):
+    history = []
+    for _ in range(turns):
+        history.append({"role": "user", "content": rng.choice(QUESTIONS)})
+        history.append({"role": "assistant", "content": ANSWER})
+    return history
+
+
+def payload_bytes(contents):
+    return len(json.dumps({"contents": contents}).encode())
+
+
+def timed(client, contents):
+    samples = []
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        client.generate(contents)
+        samples.append(time.perf_counter() - t0)
+    return np.median(samples) * 1000
+
+
+def main():
+    state = MockState(latency_ms=150, jitter_ms=10, prefill_ms_per_kb=8)
+    server, base_url = start(state)
+    client = GeminiClient("x", MODEL, base_url=base_url)
+    history = conversation(max(CHECKPOINTS), random.Random(3))
+    window = ContextWindow()
+
+    print(f"Mock model: 150 ms + 8 ms per request KB; window budget {window.budget_tokens} tokens, "
+          f"last {window.keep_turns} turns")
+    print(f"{'turn':>5}{'full KB':>9}{'win KB':>8}{'full tok':>10}{'win tok':>9}"
+          f"{'full ms':>9}{'win ms':>8}{'build us':>10}")
+
+    # Grow the chat turn by turn so the rolling summary is extended incrementally, as in the app
+    build_s = []
+    for turn in range(1, max(CHECKPOINTS) + 1):
+        current = history[:2 * turn - 1]     # ends on the new user question
+        t0 = time.perf_counter()
+        system, recent = window.build(current, SYSTEM_INSTRUCTION)
+        build_s.append(time.perf_counter() - t0)
+        if turn not in CHECKPOINTS:
+            continue
+        full = build_contents(current, SYSTEM_INSTRUCTION)
+        windowed = build_contents(recent, system)
+        full_tok = sum(estimate_tokens(c["parts"][0]["text"]) for c in full)
+        win_tok = sum(estimate_tokens(c["parts"][0]["text"]) for c in windowed)
+        print(f"{turn:>5}{payload_bytes(full) / 1024:>9.1f}{payload_bytes(windowed) / 1024:>8.1f}"
+              f"{full_tok:>10}{win_tok:>9}{timed(client, full):>9.0f}{timed(client, windowed):>8.0f}"
+              f"{np.median(build_s[-5:]) * 1e6:>10.0f}")
+
+    print(f"\nWindow build over {len(build_s)} turns: p50 {np.median(build_s) * 1e6:.0f} us, "
+          f"max {max(build_s) * 1e6:.0f} us")
+    print(f"Summary at turn {max(CHECKPOINTS)}: {estimate_tokens(window.summary())} tokens, "
+          f"{len(window.summary().splitlines()) - 1} notes")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
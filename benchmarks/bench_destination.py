@@ -0,0 +1,77 @@
+"""
+Benchmark: condition-aware hospital selection.
+
+Patients at gazetteer localities with the classifier's most common
+diagnoses. Compares a fresh road search per request with the cached
+travel-time rows, and shows how the destination changes with the diagnosis.
+
+Run from the repository root:
+    python benchmarks/bench_destination.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.fleet import load_hospitals
+from triage.geocoder import build_geocoder
+from triage.hospitals import CapacityTable, DestinationSelector
+from triage.routing import load_default_engine
+
+DIAGNOSES = [
+    'Heart Attack (STEMI Suspected)', 'Stroke (Suspected)', 'Major Trauma/Hemorrhage',
+    'Cardiac Arrest', 'Severe Respiratory Distress', 'Seizure/Post-Seizure', 'Minor Trauma',
+]
+N_REQUESTS = 2000
+
+
+def main():
+    engine = load_default_engine()
+    hospitals = load_hospitals()
+    capacity = CapacityTable(hospitals)
+    selector = DestinationSelector(engine, hospitals, capacity)
+    geocoder = build_geocoder()
+    places = [p for p in geocoder.places if p['population'] > 0 and geocoder.in_service_area(p['lat'], p['lon'])]
+
+    rng = random.Random(5)
+    requests = [
+        (rng.choices(places, weights=[p['population'] for p in places])[0], rng.choice(DIAGNOSES))
+        for _ in range(N_REQUESTS)
+    ]
+    depart = 18 * 60 + 30
+
+    t0 = time.perf_counter()
+    for place, diagnosis in requests[:200]:
+        node = engine.graph.nearest_node(place['lat'], place['lon'])
+        engine.one_to_many(node, targets=set(selector.nodes), depart_minute=depart)
+    uncached_ms = (time.perf_counter() - t0) * 1000 / 200
+
+    t0 = time.perf_counter()
+    for place, diagnosis in requests:
+        selector.select(place['lat'], place['lon'], diagnosis, depart_at=depart)
+    cached_ms = (time.perf_counter() - t0) * 1000 / N_REQUESTS
+    stats = selector.stats()
+
+    print(f"Hospitals: {len(hospitals)}, requests: {N_REQUESTS}, localities: {len(places)}")
+    print(f"Road search per request:   {uncached_ms:7.3f} ms")
+    print(f"Selector (cached rows):    {cached_ms:7.3f} ms (mean incl. misses)")
+    print(f"Row cache hit ratio:       {stats['hit_ratio']:.1%} ({stats['entries']} rows)")
+
+    place = max(places, key=lambda p: p['population'])
+    print(f"\nFrom {place['name']} at 18:30:")
+    for diagnosis in DIAGNOSES:
+        d = selector.select(place['lat'], place['lon'], diagnosis, depart_at=depart)
+        print(f"  {diagnosis:<32} -> {d['id']:<9} {d['eta_min']:5.1f} min  needs {', '.join(d['required'])}")
+
+    # Fill the usual cath-lab destination and check the fallback
+    first = selector.select(place['lat'], place['lon'], DIAGNOSES[0], depart_at=depart)
+    capacity.update(first['id'], 0)
+    second = selector.select(place['lat'], place['lon'], DIAGNOSES[0], depart_at=depart)
+    print(f"\n{first['id']} full -> STEMI goes to {second['id']} ({second['eta_min']:.1f} min)")
+
+
+if __name__ == "__main__":
+    main()
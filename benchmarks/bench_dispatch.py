@@ -0,0 +1,126 @@
+"""
+Benchmark: severity-weighted batch assignment vs greedy sorted dispatch.
+
+- Full solve time for a 200 x 200 vehicle x patient matrix (target < 50 ms)
+- Incremental re-solve as calls arrive and units move
+- Weighted response time of the optimal plan vs the greedy queue order
+
+Run from the repository root:
+    python benchmarks/bench_dispatch.py
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.dispatch import (
+    SCIPY_AVAILABLE, BatchDispatcher, hungarian, patient_weight, solve_assignment,
+)
+
+LAT_MIN, LAT_MAX = 21.05, 21.22
+LON_MIN, LON_MAX = 78.98, 79.18
+N = 200
+PRIORITIES = [('HIGH', 130), ('MEDIUM', 85), ('LOW', 45)]
+
+
+def random_vehicle(rng, i):
+    return {'id': f"AMB-{i:03d}", 'lat': rng.uniform(LAT_MIN, LAT_MAX), 'lon': rng.uniform(LON_MIN, LON_MAX)}
+
+
+def random_patient(rng, i):
+    priority, score = rng.choice(PRIORITIES)
+    return {
+        'id': i, 'priority': priority, 'severity_score': score,
+        'lat': rng.uniform(LAT_MIN, LAT_MAX), 'lon': rng.uniform(LON_MIN, LON_MAX),
+    }
+
+
+def greedy_plan(dispatcher):
+    """Sorted-queue dispatch: each patient in priority order takes the nearest free unit"""
+    order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+    patients = sorted(
+        range(len(dispatcher.patient_ids)),
+        key=lambda j: (order[dispatcher._patients[dispatcher.patient_ids[j]]['priority']],
+                       -dispatcher._patients[dispatcher.patient_ids[j]]['severity_score']),
+    )
+    free = set(range(len(dispatcher.vehicle_ids)))
+    plan = {}
+    for j in patients:
+        if not free:
+            break
+        i = min(free, key=lambda r: dispatcher._eta[r, j])
+        free.discard(i)
+        plan[dispatcher.patient_ids[j]] = (dispatcher.vehicle_ids[i], dispatcher._eta[i, j])
+    return plan
+
+
+def weighted_minutes(dispatcher, plan):
+    return sum(patient_weight(dispatcher._patients[pid]) * eta for pid, (_, eta) in plan.items())
+
+
+def main():
+    rng = random.Random(7)
+    dispatcher = BatchDispatcher()
+    for i in range(N):
+        dispatcher.add_vehicle(random_vehicle(rng, i))
+    for i in range(N):
+        dispatcher.add_patient(random_patient(rng, i))
+
+    cost = dispatcher.cost_matrix()
+    runs = []
+    for _ in range(20):
+        t0 = time.perf_counter()
+        solve_assignment(cost)
+        runs.append(time.perf_counter() - t0)
+    print(f"Solver: {'scipy linear_sum_assignment' if SCIPY_AVAILABLE else 'pure-Python Hungarian'}")
+    print(f"Full solve {N}x{N}: median {sorted(runs)[len(runs) // 2] * 1000:.2f} ms, max {max(runs) * 1000:.2f} ms")
+
+    # Cross-check the fallback solver on a small instance
+    small = np.random.default_rng(1).random((12, 15))
+    r1, c1 = solve_assignment(small)
+    r2, c2 = hungarian(small.tolist())
+    assert abs(small[r1, c1].sum() - small[r2, c2].sum()) < 1e-9
+
+    # Incremental events: new call arrives / unit moves, then re-solve
+    event_times = []
+    next_id = N
+    for step in range(200):
+        t0 = time.perf_counter()
+        if step % 2 == 0:
+            dispatcher.remove_patient(dispatcher.patient_ids[0])
+            dispatcher.add_patient(random_patient(rng, next_id))
+            next_id += 1
+        else:
+            vid = rng.choice(dispatcher.vehicle_ids)
+            v = dict(dispatcher._vehicles[vid])
+            v['lat'] += rng.uniform(-0.002, 0.002)
+            dispatcher.update_vehicle(v)
+        dispatcher.solve()
+        event_times.append(time.perf_counter() - t0)
+    event_times.sort()
+    print(f"Event + re-solve: p50 {event_times[len(event_times) // 2] * 1000:.2f} ms, "
+          f"p99 {event_times[int(len(event_times) * 0.99)] * 1000:.2f} ms")
+
+    # Quality under scarcity: 60 units for 200 calls
+    scarce = BatchDispatcher()
+    for i in range(60):
+        scarce.add_vehicle(random_vehicle(rng, i))
+    for i in range(N):
+        scarce.add_patient(random_patient(rng, i))
+    optimal = scarce.solve()
+    greedy = greedy_plan(scarce)
+    high = {pid for pid in scarce.patient_ids if scarce._patients[pid]['priority'] == 'HIGH'}
+    print(f"Scarce fleet (60 units / {N} calls):")
+    print(f"  greedy:  {weighted_minutes(scarce, greedy):9.1f} weighted min, "
+          f"HIGH served {len(high & greedy.keys())}/{len(high)}")
+    print(f"  optimal: {weighted_minutes(scarce, optimal):9.1f} weighted min, "
+          f"HIGH served {len(high & optimal.keys())}/{len(high)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark: offline first-aid knowledge base and the race against Gemini.
+
+Part 1 reports index build time, BM25 query latency and top-1 accuracy on a
+set of labelled questions, and checks that answers keep the best-matching
+section even when it is not one of the first two of its protocol. Part 2 measures how long a user waits for a useful
+answer when the API is healthy, slow (past the turn deadline) or failing,
+with and without racing the offline guide, against the local stand-in server.
+
+Run from the repository root:
+    python benchmarks/bench_first_aid.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.first_aid import KnowledgeBase
+from triage.gemini_client import GeminiClient, build_contents, race_stream
+from triage.mock_gemini_server import MockState, start
+
+LABELLED = [
+    ("my father has chest pain and is sweating", "chest-pain"),
+    ("pain in chest spreading to left arm", "chest-pain"),
+    ("someone collapsed and is not breathing", "cpr"),
+    ("how do I do CPR", "cpr"),
+    ("my child is choking on a coin", "choking"),
+    ("food stuck in throat cannot breathe", "choking"),
+    ("deep cut on the leg bleeding a lot", "bleeding"),
+    ("how to stop heavy bleeding", "bleeding"),
+    ("burned my hand with hot oil", "burns"),
+    ("child scalded by boiling water", "burns"),
+    ("face drooping and slurred speech", "stroke"),
+    ("she is having a fit and shaking", "seizure"),
+    ("what to do during a seizure", "seizure"),
+    ("he fainted in the heat", "fainting"),
+    ("bitten by a cobra", "snake-bite"),
+    ("dog bit my son", "dog-bite"),
+    ("I think his arm is broken", "fracture"),
+    ("twisted my ankle playing football", "sprain"),
+    ("heat stroke symptoms", "heat-stroke"),
+    ("asthma attack and wheezing", "asthma"),
+    ("lips swelling after bee sting", "anaphylaxis"),
+    ("child drank kerosene", "poisoning"),
+    ("took too many sleeping pills", "poisoning"),
+    ("pulled a boy out of the river", "drowning"),
+    ("nose bleeding for ten minutes", "nosebleed"),
+    ("baby has high fever", "fever-child"),
+    ("diabetic and shaky and confused", "low-sugar"),
+    ("touched a live wire", "electric-shock"),
+    ("hit his head and is vomiting", "head-injury"),
+    ("bike crash on the highway", "road-accident"),
+]
+# (question, protocol id, section index) where the answer lies past section 1
+SECTION_PROBES = [
+    ("infant under one year choking, how do I give back blows", "choking", 2),
+    ("snake bite, should I cut the wound or suck out venom", "snake-bite", 2),
+    ("during a seizure should I hold them down or put something in their mouth", "seizure", 2),
+    ("burn: should I use ice, butter or toothpaste", "burns", 2),
+]
+MODEL = "models/gemini-2.0-flash"
+PATIENCE_S = 2.0
+DEADLINE_S = 6.0
+TURNS = 4
+
+
+def bench_index():
+    t0 = time.perf_counter()
+    kb = KnowledgeBase()
+    build_ms = (time.perf_counter() - t0) * 1000
+    correct = sum(1 for q, doc_id in LABELLED if (kb.answer(q) or {}).get('id') == doc_id)
+    samples = []
+    for _ in range(50):
+        for q, _ in LABELLED:
+            t1 = time.perf_counter()
+            kb.answer(q)
+            samples.append(time.perf_counter() - t1)
+    p50, p99 = np.percentile(samples, [50, 99]) * 1e6
+    print(f"{len(kb.documents)} protocols, {len(kb.chunks)} chunks, {len(kb.postings)} terms, "
+          f"built in {build_ms:.1f} ms")
+    print(f"Query latency p50 {p50:.0f} us, p99 {p99:.0f} us; top-1 accuracy {correct}/{len(LABELLED)}")
+    for q, doc_id, section in SECTION_PROBES:
+        reply = kb.answer(q)
+        doc = next(d for d in kb.documents if d['id'] == doc_id)
+        assert reply and reply['id'] == doc_id and doc['sections'][section] in reply['text'], q
+    print(f"Best section kept in the answer: {len(SECTION_PROBES)}/{len(SECTION_PROBES)} probes")
+    return kb
+
+
+def useful_after(client, kb, question, race):
+    """Seconds until the user sees a useful answer (None if never)"""
+    offline = kb.answer(question)
+    chunks = client.stream(build_contents([{"role": "user", "content": question}]), DEADLINE_S)
+    t0 = time.perf_counter()
+    shown = None
+    if race:
+        events = race_stream(chunks, PATIENCE_S)
+    else:
+        events = (('chunk', text) for text in chunks)
+    try:
+        for kind, _ in events:
+            if shown is None and (kind == 'chunk' or (kind in ('slow', 'error') and offline)):
+                shown = time.perf_counter() - t0
+    except Exception:
+        pass
+    return shown
+
+
+def bench_race(kb):
+    scenarios = [
+        ("healthy", MockState(latency_ms=400, jitter_ms=50, chunk_ms=100)),
+        ("slow (past deadline)", MockState(latency_ms=9000, jitter_ms=0)),
+        ("failing (all 503)", MockState(latency_ms=200, jitter_ms=0, error_rate=1.0)),
+    ]
+    print(f"\nTime to a useful answer (deadline {DEADLINE_S:.0f} s, offline guide after {PATIENCE_S:.0f} s)")
+    print(f"{'Gemini':<22}{'API only':>12}{'raced':>10}")
+    questions = [q for q, _ in LABELLED[:TURNS]]
+    for label, state in scenarios:
+        server, base_url = start(state)
+        client = GeminiClient("x", MODEL, base_url=base_url, deadline_s=DEADLINE_S)
+        cells = []
+        for race in (False, True):
+            waits = [useful_after(client, kb, q, race) for q in questions]
+            answered = [w for w in waits if w is not None]
+            cells.append(f"{np.median(answered):.2f} s" if answered else "no answer")
+        print(f"{label:<22}{cells[0]:>12}{cells[1]:>10}")
+        client.close()
+        server.shutdown()
+
+
+def main():
+    kb = bench_index()
+    bench_race(kb)
+
+
+if __name__ == "__main__":
+    main()
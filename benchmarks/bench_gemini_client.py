@@ -0,0 +1,87 @@
+"""
+Benchmark: pooled, retrying Gemini client vs one requests.post per message.
+
+Runs against the local stand-in server (no network, no API key) with
+injected 503/429 failures and a simulated handshake per new connection,
+from several concurrent "users". Reports connections opened, success rate
+and latency of the answered turns for both approaches.
+
+Run from the repository root:
+    python benchmarks/bench_gemini_client.py
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.gemini_client import GeminiClient, GeminiError, build_contents, reply_text
+from triage.mock_gemini_server import MockState, start
+
+USERS = 8
+TURNS_PER_USER = 40
+MODEL = "models/gemini-2.0-flash"
+
+
+def history(i):
+    return [{"role": "user", "content": f"what to do for chest pain #{i}"}]
+
+
+def naive_turn(base_url, i):
+    """One requests.post per message: fresh connection, flat timeout, no retries"""
+    t0 = time.perf_counter()
+    try:
+        r = requests.post(f"{base_url}/{MODEL}:generateContent", params={"key": "x"},
+                          json={"contents": build_contents(history(i))}, timeout=10)
+        reply_text(r.json())
+        ok = True
+    except Exception:
+        ok = False
+    return time.perf_counter() - t0, ok
+
+
+def pooled_turn(client, i):
+    t0 = time.perf_counter()
+    try:
+        client.generate(build_contents(history(i)))
+        ok = True
+    except GeminiError:
+        ok = False
+    return time.perf_counter() - t0, ok
+
+
+def run(label, state, turn):
+    before = state.counts['connections']
+    with ThreadPoolExecutor(USERS) as pool:
+        results = list(pool.map(turn, range(USERS * TURNS_PER_USER)))
+    lat = np.array([s for s, good in results if good]) * 1000
+    ok = sum(1 for _, good in results if good)
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    print(f"{label:<24}{state.counts['connections'] - before:>7}{100 * ok / len(results):>9.1f}%"
+          f"{p50:>9.0f}{p95:>9.0f}{p99:>9.0f}")
+
+
+def main():
+    state = MockState(latency_ms=80, jitter_ms=20, error_rate=0.05, rate_limit_rate=0.03, handshake_ms=60)
+    server, base_url = start(state)
+    print(f"{USERS} users x {TURNS_PER_USER} turns, 5% 503 + 3% 429 injected, 60 ms handshake")
+    print(f"{'Client':<24}{'conns':>7}{'success':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+
+    run("requests.post per turn", state, lambda i: naive_turn(base_url, i))
+
+    client = GeminiClient("x", MODEL, base_url=base_url)
+    run("pooled + retries", state, lambda i: pooled_turn(client, i))
+    stats = client.stats()
+    print(f"\nPooled client: {stats['requests']} requests over {stats['connections']} connections, "
+          f"{stats['retries']} retries, errors {stats['errors']}")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark: time to first token, streaming vs unary Gemini replies.
+
+The local stand-in server generates each reply chunk by chunk (fixed
+latency before the first chunk, then a delay per chunk). generateContent
+returns only when the whole reply is done; streamGenerateContent sends each
+chunk as server-sent events. What the user waits for before seeing text is
+the time to the first chunk.
+
+Run from the repository root:
+    python benchmarks/bench_gemini_stream.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.gemini_client import GeminiClient, build_contents
+from triage.mock_gemini_server import MockState, start
+
+TURNS = 30
+MODEL = "models/gemini-2.0-flash"
+
+
+def main():
+    state = MockState(latency_ms=400, jitter_ms=50, chunk_ms=120)
+    server, base_url = start(state)
+    client = GeminiClient("x", MODEL, base_url=base_url)
+    contents = build_contents([{"role": "user", "content": "what to do for chest pain"}])
+
+    unary = []
+    for _ in range(TURNS):
+        t0 = time.perf_counter()
+        client.generate(contents)
+        unary.append(time.perf_counter() - t0)
+
+    first, total, chunks = [], [], 0
+    for _ in range(TURNS):
+        t0 = time.perf_counter()
+        for i, text in enumerate(client.stream(contents)):
+            if i == 0:
+                first.append(time.perf_counter() - t0)
+            chunks += 1
+        total.append(time.perf_counter() - t0)
+
+    ms = lambda xs: np.median(xs) * 1000
+    print(f"{TURNS} turns, 400 ms to first chunk + 120 ms per chunk, {chunks / TURNS:.0f} chunks/reply")
+    print(f"Unary generateContent:    first text {ms(unary):6.0f} ms, complete {ms(unary):6.0f} ms")
+    print(f"streamGenerateContent:    first text {ms(first):6.0f} ms, complete {ms(total):6.0f} ms")
+    print(f"Time to first token: {ms(first) / ms(unary):.0%} of the unary wait")
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
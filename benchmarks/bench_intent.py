@@ -0,0 +1,97 @@
+"""
+Benchmark: emergency-intent detection on chat messages.
+
+Reports per-message latency of the Aho-Corasick detector, a naive baseline
+that searches for every lexicon phrase separately, and symptom / emergency
+accuracy on labelled messages, including negated ones ("no chest pain").
+
+Run from the repository root:
+    python benchmarks/bench_intent.py
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.intent import LEXICON, IntentDetector, normalize
+
+# message, expected symptoms, expected emergency
+LABELLED = [
+    ("my father collapsed and is turning blue", {'unconsciousness', 'cyanosis'}, True),
+    ("she isn't breathing!!", {'shortness_of_breath'}, True),
+    ("my son had a seizure and now he is confused", {'seizure', 'confusion'}, True),
+    ("Mom has chest pain and is short of breath", {'chest_pain', 'shortness_of_breath'}, True),
+    ("he was hit by a bus and is bleeding heavily", {'trauma', 'bleeding'}, True),
+    ("I was stabbed", {'trauma', 'bleeding'}, True),
+    ("her face is drooping and she has slurred speech", {'weakness', 'confusion'}, True),
+    ("baby is choking on a grape", {'shortness_of_breath'}, True),
+    ("grandpa passed out in the bathroom", {'unconsciousness'}, True),
+    ("my friend is gasping and his lips are blue", {'shortness_of_breath', 'cyanosis'}, True),
+    ("he has no chest pain but he's dizzy", {'dizziness'}, False),
+    ("not bleeding, but fell off the bike and broke his arm", {'trauma'}, False),
+    ("no fever, no breathing problems, just a cough", set(), False),
+    ("she is not unconscious, she's just tired", set(), False),
+    ("he's not moving and collapsed", {'unconsciousness'}, True),
+    ("I feel a bit dizzy after standing up", {'dizziness'}, False),
+    ("what is a normal blood pressure", set(), False),
+    ("how much paracetamol can a child take", set(), False),
+    ("my knee hurts after running", set(), False),
+    ("is it safe to take ibuprofen with food", set(), False),
+    ("hello, are you there?", set(), False),
+]
+FILLER = ["please help", "what should I do", "it started an hour ago", "we are at home", "he is 54"]
+N_MESSAGES = 20000
+
+
+def naive_detect(message, phrases):
+    """Baseline: one substring search per lexicon phrase, no negation"""
+    text = normalize(message)
+    return {feature for phrase, feature in phrases if f" {phrase} " in text}
+
+
+def main():
+    t0 = time.perf_counter()
+    detector = IntentDetector()
+    build_ms = (time.perf_counter() - t0) * 1000
+    phrases = [(p, f) for f, entries in LEXICON.items() for p in entries]
+
+    rng = random.Random(4)
+    stream = [f"{rng.choice(LABELLED)[0]} {rng.choice(FILLER)}" for _ in range(N_MESSAGES)]
+    timings = {}
+    for label, fn in (("Aho-Corasick", detector.detect), ("per-phrase search", lambda m: naive_detect(m, phrases))):
+        samples = []
+        for message in stream:
+            t1 = time.perf_counter()
+            fn(message)
+            samples.append(time.perf_counter() - t1)
+        timings[label] = np.array(samples) * 1e6
+
+    tp = fp = fn_ = 0
+    emergency_ok = 0
+    naive_fp = 0
+    for message, expected, emergency in LABELLED:
+        result = detector.detect(message)
+        got = set(result['symptoms'])
+        tp += len(got & expected)
+        fp += len(got - expected)
+        fn_ += len(expected - got)
+        emergency_ok += result['emergency'] == emergency
+        naive_fp += len(naive_detect(message, phrases) - expected)
+
+    print(f"Lexicon: {len(phrases)} phrases, automaton {len(detector.goto)} states, built in {build_ms:.1f} ms")
+    print(f"{'Detector':<20}{'p50 us':>8}{'p99 us':>8}{'msgs/s':>10}")
+    for label, us in timings.items():
+        print(f"{label:<20}{np.median(us):>8.1f}{np.percentile(us, 99):>8.1f}{1e6 / us.mean():>10.0f}")
+    print(f"\nLabelled messages: {len(LABELLED)}")
+    print(f"Symptoms:  precision {tp / max(tp + fp, 1):.0%}, recall {tp / max(tp + fn_, 1):.0%}")
+    print(f"Emergency: {emergency_ok}/{len(LABELLED)} correct")
+    print(f"False symptoms without negation handling: {naive_fp} (with: {fp})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: bytes each page sends per rerun, and how much of it is CSS.
+
+Runs every page headless with Streamlit's AppTest and sums the serialized
+size of the elements of one rerun (what goes over the websocket), the part
+of it inside <style> blocks, and the median rerun time, once with the page
+stylesheet inlined (minified) and once as an @import of the static asset.
+There is no browser here, so time to interactive is estimated as the first
+script run plus the CSS bytes the browser must receive and parse before the
+page is styled: every rerun when inlined, once per visit when served as a
+cached static file. Later reruns are what every widget click costs.
+
+Run from the repository root:
+    python benchmarks/bench_page_styles.py
+"""
+
+import os
+import re
+import sys
+import time
+
+import numpy as np
+from streamlit import config
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from triage.styles import STATIC_DIR, build
+
+PAGES = [
+    ("home", "index.py", {}),
+    ("patient", "pages/patient.py", {"user_type": "patient", "logged_in": True}),
+    ("technician", "pages/technician.py", {"user_type": "technician", "logged_in": True}),
+    ("routing", "pages/routing.py", {}),
+    ("chatbot", "pages/chatbot.py", {}),
+]
+RERUNS = 5
+STYLE = re.compile(r"<style>.*?</style>", re.S)
+MODES = [("inline", False), ("static", True)]
+DATA_FILES = ["emergency_queue.json", "fleet_status.json", "system_stats.json", "ambulances.json"]
+CREATED_FILES = ["chat_history.db", "chat_history.db-wal", "chat_history.db-shm", "chat_cache.json"]
+
+
+def walk(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from walk(child)
+
+
+def payload(at):
+    """(bytes of all elements, bytes of <style> blocks) of the last run"""
+    total = style = 0
+    for node in walk(at._tree):
+        proto = getattr(node, "proto", None)
+        if proto is not None and hasattr(proto, "ByteSize"):
+            total += proto.ByteSize()
+    for md in at.markdown:
+        style += sum(len(m.encode()) for m in STYLE.findall(md.value))
+    return total, style
+
+
+def measure(path, state):
+    at = AppTest.from_file(os.path.join(ROOT, path), default_timeout=120)
+    for key, value in state.items():
+        at.session_state[key] = value
+    t0 = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t0
+    samples = []
+    for _ in range(RERUNS):
+        t0 = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - t0)
+    total, style = payload(at)
+    return first * 1000, np.median(samples) * 1000, total, style
+
+
+def main():
+    saved = {f: open(f, "rb").read() for f in DATA_FILES if os.path.exists(f)}
+    created = [f for f in CREATED_FILES if not os.path.exists(f)]
+    sizes = build()
+    print(f"{'page':<12}{'mode':<8}{'KB/rerun':>10}{'CSS KB':>8}{'rerun ms':>10}{'first ms':>10}")
+    totals = {mode: np.zeros(2) for mode, _ in MODES}
+    try:
+        for name, path, state in PAGES:
+            measure(path, state)        # warm-up: imports and cached resources
+            for mode, static in MODES:
+                config.set_option("server.enableStaticServing", static)
+                first, rerun, total, style = measure(path, state)
+                totals[mode] += (total, style)
+                print(f"{name:<12}{mode:<8}{total / 1024:>10.1f}{style / 1024:>8.1f}{rerun:>10.1f}{first:>10.1f}")
+    finally:
+        # The pages may write their JSON stores; leave the tree as it was
+        for f, data in saved.items():
+            with open(f, "wb") as out:
+                out.write(data)
+        for f in created:
+            if os.path.exists(f):
+                os.remove(f)
+    for mode, _ in MODES:
+        print(f"{'all pages':<12}{mode:<8}{totals[mode][0] / 1024:>10.1f}{totals[mode][1] / 1024:>8.1f}")
+    print(f"Static sheets in {STATIC_DIR}/ (fetched once, then cached): "
+          + ", ".join(f"{page} {size / 1024:.1f} KB" for page, size in sizes.items()))
+
+
+if __name__ == "__main__":
+    main()
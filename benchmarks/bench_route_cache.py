@@ -0,0 +1,93 @@
+"""
+Benchmark: LRU route cache on repeated station -> locality queries.
+
+Emergencies cluster in the same localities and units start from the same
+stations, so the query stream is heavily skewed. Queries are drawn with a
+Zipf-like distribution over (station, locality) pairs across two traffic
+buckets, with a traffic update half-way through. A second stream times the
+dashboard's path: ETA rows from each unit to a changing set of patients,
+uncached against the per-(unit, bucket) row cache.
+
+Run from the repository root:
+    python benchmarks/bench_route_cache.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.fleet import load_ambulances
+from triage.geocoder import build_geocoder
+from triage.routing import load_default_engine
+
+N_QUERIES = 3000
+N_ROWS = 400
+
+
+def main():
+    engine = load_default_engine()
+    graph = engine.graph
+    stations = [graph.nearest_node(a['lat'], a['lon']) for a in load_ambulances()]
+    geocoder = build_geocoder()
+    localities = [
+        graph.nearest_node(p['lat'], p['lon'])
+        for p in geocoder.places if geocoder.in_service_area(p['lat'], p['lon'])
+    ]
+    pairs = [(s, t) for s in stations for t in localities]
+    weights = [1.0 / (rank + 1) for rank in range(len(pairs))]
+    rng = random.Random(11)
+    stream = rng.choices(pairs, weights=weights, k=N_QUERIES)
+    departures = [rng.choice((540, 1110)) for _ in range(N_QUERIES)]
+
+    t0 = time.perf_counter()
+    for (s, t), minute in zip(stream[:300], departures[:300]):
+        engine.shortest_path(s, t, depart_minute=minute)
+    uncached_ms = (time.perf_counter() - t0) * 1000 / 300
+
+    t0 = time.perf_counter()
+    for i, ((s, t), minute) in enumerate(zip(stream, departures)):
+        if i == N_QUERIES // 2:
+            # Traffic feed update: every cached route is now stale
+            engine.profiles.update_edges([0], [engine.profiles.weights(0)[0] * 1.5])
+        engine.route(s, t, depart_at=minute)
+    cached_ms = (time.perf_counter() - t0) * 1000 / N_QUERIES
+
+    stats = engine.route_cache.stats()
+
+    s, t = stream[0]
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        engine.route(s, t, depart_at=departures[0])
+    hit_us = (time.perf_counter() - t0) * 1e6 / 1000
+    print(f"Distinct (station, locality) pairs: {len(pairs)}, queries: {N_QUERIES}")
+    print(f"Uncached query:      {uncached_ms:7.3f} ms")
+    print(f"With route cache:    {cached_ms:7.3f} ms (mean incl. misses)")
+    print(f"Cache hit:           {hit_us:7.1f} us")
+    print(f"Hit ratio:           {stats['hit_ratio']:.1%} ({stats['hits']} hits / {stats['misses']} misses)")
+    print(f"Invalidations:       {stats['invalidations']}")
+    print(f"Entries / memory:    {stats['entries']} / {stats['memory_bytes'] / 1024:.1f} KiB")
+
+    # Dispatcher ETA rows: each unit against the patients currently queued
+    units = [(a['lat'], a['lon']) for a in load_ambulances()]
+    places = [(p['lat'], p['lon']) for p in geocoder.places if geocoder.in_service_area(p['lat'], p['lon'])]
+    asks = [(rng.choice(units), rng.sample(places, 8), rng.choice((540, 1110))) for _ in range(N_ROWS)]
+    t0 = time.perf_counter()
+    for unit, patients, minute in asks[:50]:
+        source = graph.nearest_node(*unit)
+        engine.one_to_many(source, [graph.nearest_node(*p) for p in patients], depart_minute=minute)
+    uncached_ms = (time.perf_counter() - t0) * 1000 / 50
+    t0 = time.perf_counter()
+    for unit, patients, minute in asks:
+        engine.eta_matrix_row(unit, patients, depart_at=minute)
+    cached_ms = (time.perf_counter() - t0) * 1000 / N_ROWS
+    rows = engine.row_cache.stats()
+    print(f"\nETA row, uncached:   {uncached_ms:7.3f} ms")
+    print(f"ETA row, row cache:  {cached_ms:7.3f} ms (mean incl. misses, hit ratio {rows['hit_ratio']:.1%})")
+    print(f"Rows / memory:       {rows['entries']} / {rows['memory_bytes'] / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: 10k ambulances moving at 1 Hz in a GridIndex.
+
+Each simulated second every vehicle reports a new position (and ~1% change
+state), then the dispatcher runs k-nearest and radius queries for a batch of
+patients. The tick must fit well inside the 1 s update period.
+
+Run from the repository root:
+    python benchmarks/bench_spatial_index.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.spatial_index import GridIndex, StaticKDTree, haversine_km
+
+# Nagpur metro bounding box
+LAT_MIN, LAT_MAX = 20.95, 21.30
+LON_MIN, LON_MAX = 78.90, 79.25
+
+N_VEHICLES = 10_000
+N_HOSPITALS = 500
+N_TICKS = 10
+QUERIES_PER_TICK = 200
+K = 5
+STATES = ('available', 'en_route', 'maintenance')
+
+
+def linear_nearest(points, lat, lon, k):
+    """Reference: full scan over the fleet"""
+    dists = [
+        (haversine_km(lat, lon, p_lat, p_lon), vid)
+        for vid, (p_lat, p_lon, state) in points.items()
+        if state == 'available'
+    ]
+    dists.sort()
+    return dists[:k]
+
+
+def main():
+    rng = random.Random(42)
+    index = GridIndex(cell_deg=0.01)
+    points = {}
+    for i in range(N_VEHICLES):
+        vid = f"AMB-{i:05d}"
+        lat = rng.uniform(LAT_MIN, LAT_MAX)
+        lon = rng.uniform(LON_MIN, LON_MAX)
+        state = rng.choice(STATES)
+        points[vid] = (lat, lon, state)
+        index.upsert(vid, lat, lon, state)
+
+    hospitals = StaticKDTree(
+        (f"H-{i:04d}", rng.uniform(LAT_MIN, LAT_MAX), rng.uniform(LON_MIN, LON_MAX))
+        for i in range(N_HOSPITALS)
+    )
+
+    update_times, query_times = [], []
+    for _ in range(N_TICKS):
+        t0 = time.perf_counter()
+        for vid, (lat, lon, state) in points.items():
+            # ~15 m/s for one second is ~0.00015 degrees
+            lat += rng.uniform(-0.00015, 0.00015)
+            lon += rng.uniform(-0.00015, 0.00015)
+            if rng.random() < 0.01:
+                state = rng.choice(STATES)
+            points[vid] = (lat, lon, state)
+            index.upsert(vid, lat, lon, state)
+        t1 = time.perf_counter()
+        for _ in range(QUERIES_PER_TICK):
+            q_lat = rng.uniform(LAT_MIN, LAT_MAX)
+            q_lon = rng.uniform(LON_MIN, LON_MAX)
+            index.nearest(q_lat, q_lon, k=K, states=('available',))
+            index.within_radius(q_lat, q_lon, 2.0, states=('available',))
+            hospitals.nearest(q_lat, q_lon, k=3)
+        t2 = time.perf_counter()
+        update_times.append(t1 - t0)
+        query_times.append((t2 - t1) / QUERIES_PER_TICK)
+
+    # Correctness spot check against a linear scan
+    for _ in range(50):
+        q_lat = rng.uniform(LAT_MIN, LAT_MAX)
+        q_lon = rng.uniform(LON_MIN, LON_MAX)
+        got = [vid for _, vid in index.nearest(q_lat, q_lon, k=K, states=('available',))]
+        want = [vid for _, vid in linear_nearest(points, q_lat, q_lon, K)]
+        assert got == want, (got, want)
+
+    t0 = time.perf_counter()
+    for _ in range(20):
+        linear_nearest(points, rng.uniform(LAT_MIN, LAT_MAX), rng.uniform(LON_MIN, LON_MAX), K)
+    linear_ms = (time.perf_counter() - t0) / 20 * 1000
+
+    tick_ms = max(update_times) * 1000 + max(query_times) * QUERIES_PER_TICK * 1000
+    print(f"Vehicles: {N_VEHICLES}, hospitals: {N_HOSPITALS}, ticks: {N_TICKS}")
+    print(f"Update 10k positions:   {sum(update_times) / N_TICKS * 1000:8.1f} ms/tick (max {max(update_times) * 1000:.1f})")
+    print(f"Query (kNN+radius+hosp): {sum(query_times) / N_TICKS * 1e6:8.1f} us/patient")
+    print(f"Linear-scan kNN:         {linear_ms * 1000:8.1f} us/patient")
+    print(f"Worst tick ({QUERIES_PER_TICK} patients): {tick_ms:.1f} ms of 1000 ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Benchmark: server work and payload per technician dashboard interaction.
+
+Starts the app with `streamlit run` and drives it like a browser over the
+websocket: log in as technician, then click the fleet buttons ("Complete En
+Route Mission", "Send to Maintenance") and fire the 5-second refresh. For
+each interaction it records the time until the server reports the run
+finished and the bytes of the messages it sent back. Widgets inside a
+st.fragment are clicked with their fragment id, as the browser does, so the
+server reruns only that fragment; on a page without fragments every click
+reruns the whole script.
+
+Run from the repository root (the data files are restored afterwards):
+    python benchmarks/bench_technician_fragments.py
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILES = ["emergency_queue.json", "system_stats.json", "ambulances.json"]
+PATIENTS = 25
+CLICKS = 10
+CONDITIONS = ["Cardiac Arrest", "Stroke", "Severe Bleeding", "Fracture", "Breathing Difficulty", "Burns"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_queue():
+    """A busy queue of geocoded calls around Nagpur, and a roster with units en route"""
+    rng = random.Random(3)
+    queue = []
+    for i in range(PATIENTS):
+        priority = rng.choice(["HIGH", "MEDIUM", "LOW"])
+        queue.append({
+            'id': f"bench-{i}", 'name': f"Patient {i}", 'age': rng.randint(5, 90),
+            'condition': rng.choice(CONDITIONS), 'symptoms': "bench symptoms", 'location': f"Area {i}",
+            'lat': 21.10 + rng.uniform(-0.06, 0.06), 'lon': 79.08 + rng.uniform(-0.06, 0.06),
+            'priority': priority, 'severity_score': rng.randint(10, 150), 'timestamp': "12:00:00",
+        })
+    with open(os.path.join(ROOT, "emergency_queue.json"), "w") as f:
+        json.dump(queue, f, indent=2)
+    # Enough units en route that every "Complete" click has one to bring back
+    with open(os.path.join(ROOT, "ambulances.json")) as f:
+        units = json.load(f)
+    states = ['available'] * 2 + ['en_route'] * CLICKS + ['maintenance'] * 2
+    roster = [dict(units[i % len(units)], id=f"BENCH-{i:02d}", state=state) for i, state in enumerate(states)]
+    with open(os.path.join(ROOT, "ambulances.json"), "w") as f:
+        json.dump(roster, f, indent=2)
+
+
+class Browser:
+    """Minimal Streamlit websocket client: reruns, button clicks, fragment reruns"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}       # user key -> (widget id, fragment id)
+        self.fragments = {}     # fragment id -> auto-rerun interval (s)
+        self.page_hash = ""
+
+    async def send(self, widget_states=(), fragment_id="", auto=False):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.page_script_hash = self.page_hash
+        for widget_id in widget_states:
+            w = state.widget_states.widgets.add()
+            w.id = widget_id
+            w.trigger_value = True
+        if fragment_id:
+            state.fragment_id = fragment_id
+            state.is_auto_rerun = auto
+        await self.ws.send(msg.SerializeToString())
+
+    async def run(self, **kwargs):
+        """Send one rerun; returns (seconds until the run finished, bytes received)"""
+        t0 = time.perf_counter()
+        await self.send(**kwargs)
+        received = 0
+        while True:
+            data = await asyncio.wait_for(self.ws.recv(), timeout=120)
+            received += len(data)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(data)
+            kind = fwd.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = fwd.new_session.page_script_hash
+            elif kind == "page_info_changed" or kind == "navigation":
+                if kind == "navigation":
+                    self.page_hash = fwd.navigation.page_script_hash
+            elif kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                if element.WhichOneof("type") == "button":
+                    key = element.button.id.rsplit("-", 1)[-1]
+                    self.widgets[key] = (element.button.id, fwd.delta.fragment_id)
+            elif kind == "auto_rerun":
+                self.fragments[fwd.auto_rerun.fragment_id] = fwd.auto_rerun.interval
+            elif kind == "script_finished":
+                if fwd.script_finished == ForwardMsg.ScriptFinishedStatus.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                return time.perf_counter() - t0, received
+
+    async def click(self, key):
+        widget_id, fragment_id = self.widgets[key]
+        return await self.run(widget_states=[widget_id], fragment_id=fragment_id)
+
+    async def refresh(self):
+        """The 5 s timer: a fragment auto-rerun if the page has one, else a full rerun"""
+        if self.fragments:
+            fragment_id = next(iter(self.fragments))
+            return await self.run(fragment_id=fragment_id, auto=True)
+        return await self.run()
+
+
+async def drive(port):
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        browser = Browser(ws)
+        await browser.run()
+        await browser.click("tech_btn")
+        while "complete_mission_unique" not in browser.widgets:   # page switch finishes in a new run
+            await browser.run()
+        results = {'complete mission': [], 'send to maintenance': [], 'queue refresh': []}
+        for _ in range(CLICKS):
+            results['send to maintenance'].append(await browser.click("send_maintenance_unique"))
+            results['complete mission'].append(await browser.click("complete_mission_unique"))
+            results['queue refresh'].append(await browser.refresh())
+        return results, bool(browser.fragments)
+
+
+def main():
+    saved = {f: open(os.path.join(ROOT, f), "rb").read() for f in DATA_FILES
+             if os.path.exists(os.path.join(ROOT, f))}
+    port = free_port()
+    seed_queue()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "index.py", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                time.sleep(0.2)
+        results, fragments = asyncio.run(drive(port))
+    finally:
+        server.terminate()
+        server.wait()
+        for f, data in saved.items():
+            with open(os.path.join(ROOT, f), "wb") as out:
+                out.write(data)
+
+    print(f"Technician dashboard, {PATIENTS} queued calls, {CLICKS} rounds "
+          f"({'fragments' if fragments else 'full-script reruns'})")
+    print(f"{'interaction':<22}{'p50 ms':>8}{'p95 ms':>8}{'KB sent':>9}")
+    for name, rows in results.items():
+        ms = np.array([r[0] for r in rows]) * 1000
+        kb = np.median([r[1] for r in rows]) / 1024
+        print(f"{name:<22}{np.percentile(ms, 50):>8.1f}{np.percentile(ms, 95):>8.1f}{kb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
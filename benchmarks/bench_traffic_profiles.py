@@ -0,0 +1,54 @@
+"""
+Benchmark: switching time-of-day traffic profiles on the road graph.
+
+Compares re-weighting the search (swap the bucket's weight list) against
+rebuilding the graph, and shows how ETAs change between 03:00 and rush hour
+when evaluated at the departure time.
+
+Run from the repository root:
+    python benchmarks/bench_traffic_profiles.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.routing import RoutingEngine, build_synthetic_city
+from triage.traffic import BUCKETS_PER_DAY
+
+
+def main():
+    t0 = time.perf_counter()
+    graph = build_synthetic_city()
+    rebuild_ms = (time.perf_counter() - t0) * 1000
+    engine = RoutingEngine(graph)
+    print(f"Graph: {graph.n_nodes} nodes, {graph.n_edges} edges")
+    print(f"Profile table: {engine.profiles.table.shape} uint16 = {engine.profiles.nbytes() / 1024:.0f} KiB")
+    print(f"Full graph rebuild:           {rebuild_ms:8.2f} ms")
+
+    t0 = time.perf_counter()
+    for b in range(BUCKETS_PER_DAY):
+        engine.set_bucket(b)
+    cold_ms = (time.perf_counter() - t0) * 1000 / BUCKETS_PER_DAY
+    t0 = time.perf_counter()
+    for _ in range(10):
+        for b in range(BUCKETS_PER_DAY):
+            engine.set_bucket(b)
+    warm_us = (time.perf_counter() - t0) * 1e6 / (10 * BUCKETS_PER_DAY)
+    print(f"Profile switch (first use):   {cold_ms:8.2f} ms")
+    print(f"Profile switch (cached):      {warm_us:8.2f} us")
+
+    rng = random.Random(3)
+    pairs = [(rng.randrange(graph.n_nodes), rng.randrange(graph.n_nodes)) for _ in range(30)]
+    for label, minute in (("03:00", 180), ("09:30", 570), ("18:30", 1110)):
+        t0 = time.perf_counter()
+        etas = [engine.one_to_many(s, [t], depart_minute=minute).get(t, 0) / 60 for s, t in pairs]
+        ms = (time.perf_counter() - t0) * 1000 / len(pairs)
+        print(f"Departing {label}: mean ETA {sum(etas) / len(etas):6.1f} min, {ms:6.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
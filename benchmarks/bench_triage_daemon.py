@@ -0,0 +1,89 @@
+"""
+Benchmark: per-worker cost of the classifier, in-process vs. the triage daemon.
+
+A fresh Python process stands in for each Streamlit worker. In-process, it
+imports triage.classifier (pandas, scikit-learn, model unpickling) and
+classifies one call; with the daemon, it imports TriageClient and asks over
+the Unix socket. Reports wall time to the first result and peak RSS per
+worker, then the latency of repeated classifications in one process and
+the client's fallback when the daemon is gone.
+
+Run from the repository root:
+    python benchmarks/bench_triage_daemon.py
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKERS = 3
+CALLS = 20_000
+IN_PROCESS = "from triage.classifier import hybrid_classify_and_prioritize as c; c({'chest_pain': 1})"
+VIA_DAEMON = "from triage.triage_daemon import TriageClient; TriageClient().classify({'chest_pain': 1})"
+
+
+def worker(code, env):
+    """(seconds, peak RSS MB) of one fresh process running `code`"""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = status
+    assert status == 0, code
+    return time.perf_counter() - t0, usage.ru_maxrss / 1024
+
+
+def per_call_us(fn, arg):
+    fn(arg)
+    t0 = time.perf_counter()
+    for _ in range(CALLS):
+        fn(arg)
+    return (time.perf_counter() - t0) / CALLS * 1e6
+
+
+def main():
+    folder = tempfile.mkdtemp(prefix="triage-daemon-")
+    env = dict(os.environ, TRIAGE_SOCKET=os.path.join(folder, "triage.sock"))
+    daemon = subprocess.Popen([sys.executable, "-m", "triage.triage_daemon"], cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 60
+        while not os.path.exists(env["TRIAGE_SOCKET"]):
+            if time.time() > deadline:
+                raise RuntimeError("triage daemon did not start")
+            time.sleep(0.1)
+
+        print(f"{'worker start-up':<24}{'first result s':>15}{'peak RSS MB':>13}")
+        for name, code in (("in-process classifier", IN_PROCESS), ("daemon client", VIA_DAEMON)):
+            runs = [worker(code, env) for _ in range(WORKERS)]
+            print(f"{name:<24}{np.median([r[0] for r in runs]):>15.2f}{np.median([r[1] for r in runs]):>13.1f}")
+
+        from triage.triage_daemon import TriageClient, pattern_code
+        client = TriageClient(path=env["TRIAGE_SOCKET"])
+        answers = {'chest_pain': 1, 'dizziness': 1}
+        remote = per_call_us(client.classify, answers)
+        batch = per_call_us(client.classify_codes, [pattern_code(answers)] * 100) / 100
+    finally:
+        daemon.send_signal(signal.SIGINT)
+        daemon.wait()
+
+    from triage.classifier import hybrid_classify_and_prioritize
+    local = per_call_us(hybrid_classify_and_prioritize, answers)
+    fallback_result = client.classify(answers)
+    print(f"\n{'per classification':<24}{'us':>8}")
+    print(f"{'in-process (memo hit)':<24}{local:>8.1f}")
+    print(f"{'daemon, one per call':<24}{remote:>8.1f}")
+    print(f"{'daemon, 100 per call':<24}{batch:>8.1f}")
+    print(f"\nDaemon stopped -> client falls back: {fallback_result} {client.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Load test: many simulated chat sessions against a Gemini endpoint.
+
+Each session is a thread that holds a multi-turn conversation the way the
+chatbot page does: the history is windowed with ContextWindow, the turn
+asks the shared AdmissionGate for a ticket and the reply is streamed with
+GeminiClient. Sessions pause between turns (think time). Reports p50/p99
+turn latency and time to first token, the outcome of every turn and the
+server-side counters.
+
+By default an in-process stand-in server is started with a lognormal
+latency, a 503 error rate and periodic 429 bursts; --base-url points the
+test at any other endpoint (e.g. python -m triage.mock_gemini_server).
+
+Run from the repository root:
+    python benchmarks/load_test_chat.py --sessions 50 --turns 6
+    python benchmarks/load_test_chat.py --no-gate
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage.admission import AdmissionGate, Overloaded
+from triage.context_window import ContextWindow
+from triage.gemini_client import DEFAULT_MODEL, GeminiClient, GeminiError, build_contents
+from triage.mock_gemini_server import MockState, start
+
+SYSTEM_INSTRUCTION = "You are a first-aid assistant. Give short, safe, practical advice."
+QUESTIONS = [
+    "My father has chest pain and is sweating, what should I do?",
+    "Someone fainted in the office, how do I help?",
+    "A child swallowed some cleaning liquid.",
+    "My friend cut his hand badly while cooking.",
+    "How do I treat a minor burn from boiling water?",
+    "She is having an asthma attack and has no inhaler.",
+    "What are the signs of a stroke?",
+    "He twisted his ankle playing football, is it broken?",
+]
+
+
+def simulate_session(i, args, client, gate, rows, lock):
+    """One user: `turns` questions with think time in between"""
+    rng = random.Random(i)
+    window = ContextWindow()
+    history = []
+    time.sleep(rng.uniform(0, args.ramp_s))
+    for turn in range(args.turns):
+        history.append({"role": "user", "content": f"{rng.choice(QUESTIONS)} (session {i}, turn {turn})"})
+        system, recent = window.build(history, SYSTEM_INSTRUCTION)
+        contents = build_contents(recent, system)
+        t0 = time.perf_counter()
+        first_token = None
+        parts = []
+        try:
+            ticket = gate.acquire(f"s{i}") if gate else None
+            chunks = client.stream(contents)
+            for text in (ticket.wrap(chunks) if ticket else chunks):
+                if first_token is None:
+                    first_token = time.perf_counter() - t0
+                parts.append(text)
+            outcome = 'answered'
+        except Overloaded:
+            outcome = 'refused'
+        except GeminiError:
+            outcome = 'failed'
+        elapsed = time.perf_counter() - t0
+        history.append({"role": "assistant", "content": "".join(parts) or "(no answer)"})
+        with lock:
+            rows.append((outcome, elapsed, first_token))
+        time.sleep(rng.expovariate(1000.0 / args.think_ms) if args.think_ms else 0)
+
+
+def percentiles(xs):
+    if not xs:
+        return "-", "-"
+    return f"{np.percentile(xs, 50) * 1000:.0f}", f"{np.percentile(xs, 99) * 1000:.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated chat sessions against a Gemini endpoint")
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--think-ms", type=float, default=500.0, help="mean pause between turns")
+    parser.add_argument("--ramp-s", type=float, default=2.0, help="sessions start within this time")
+    parser.add_argument("--base-url", help="endpoint to test; default: start a local stand-in")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--no-gate", action="store_true", help="call the API without admission control")
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="stand-in median latency")
+    parser.add_argument("--error-rate", type=float, default=0.03, help="stand-in share of 503s")
+    parser.add_argument("--burst-every-s", type=float, default=5.0, help="stand-in 429 burst period")
+    parser.add_argument("--burst-len-s", type=float, default=0.5, help="stand-in 429 burst length")
+    args = parser.parse_args()
+
+    server = state = None
+    base_url = args.base_url
+    if base_url is None:
+        state = MockState(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 2, latency_dist="lognormal",
+                          error_rate=args.error_rate, burst_every_s=args.burst_every_s,
+                          burst_len_s=args.burst_len_s, chunk_ms=20, seed=1)
+        server, base_url = start(state)
+    client = GeminiClient(os.environ.get("GEMINI_API_KEY", "x"), args.model, base_url=base_url,
+                          pool_size=max(16, args.sessions))
+    gate = None if args.no_gate else AdmissionGate(rate_per_s=50, burst=20, max_in_flight=32,
+                                                   max_waiting=max(64, args.sessions), max_wait_s=5.0)
+
+    rows = []
+    lock = threading.Lock()
+    threads = [threading.Thread(target=simulate_session, args=(i, args, client, gate, rows, lock))
+               for i in range(args.sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+
+    answered = [r for r in rows if r[0] == 'answered']
+    count = {o: sum(1 for r in rows if r[0] == o) for o in ('answered', 'refused', 'failed')}
+    turn_p50, turn_p99 = percentiles([r[1] for r in answered])
+    ttft_p50, ttft_p99 = percentiles([r[2] for r in answered if r[2] is not None])
+    fail_p50, fail_p99 = percentiles([r[1] for r in rows if r[0] != 'answered'])
+
+    print(f"{args.sessions} sessions x {args.turns} turns against {base_url} "
+          f"({'no gate' if gate is None else 'admission gate'})")
+    print(f"Turns: {len(rows)} in {wall:.1f} s ({len(rows) / wall:.1f}/s); "
+          f"answered {count['answered']}, refused {count['refused']}, failed {count['failed']}")
+    print(f"{'':<24}{'p50 ms':>8}{'p99 ms':>8}")
+    print(f"{'turn latency':<24}{turn_p50:>8}{turn_p99:>8}")
+    print(f"{'time to first token':<24}{ttft_p50:>8}{ttft_p99:>8}")
+    print(f"{'refused/failed turns':<24}{fail_p50:>8}{fail_p99:>8}")
+    client_stats = client.stats()
+    print(f"Client: {client_stats['attempts']} attempts, {client_stats['retries']} retries, "
+          f"errors {client_stats['errors']}")
+    if state is not None:
+        print(f"Server: {state.counts}")
+    else:
+        try:
+            print(f"Server: {requests.get(base_url.rsplit('/', 1)[0] + '/stats', timeout=2).json()}")
+        except (requests.RequestException, ValueError):
+            pass
+    client.close()
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Load test: concurrent callers against the headless triage API.
+
+Starts `python -m triage.triage_api` on a free port with a scratch queue and
+stats file (or targets --base-url), then runs client threads that each keep
+one HTTP/1.1 connection open and send requests back to back for --duration
+seconds. A --mix share of the calls are full intakes (POST /requests, with
+geocoding and enqueueing), the rest classification only (POST /triage).
+Reports throughput, p50/p99 latency per endpoint and the server counters;
+with the local server it also checks that every accepted intake reached the
+queue file.
+
+Run from the repository root:
+    python benchmarks/load_test_triage_api.py --clients 16 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from triage.classifier import FEATURES
+
+LOCATIONS = ["Sitabuldi", "Dharampeth", "Sadar", "Manish Nagar", "Itwari", "Near Medical Square",
+             "plot 12, Ramdaspeth", "Civil Lines"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def make_body(rng, intake, caller, n):
+    answers = {f: int(rng.random() < 0.2) for f in FEATURES}
+    if not intake:
+        return "/triage", {'answers': answers}
+    return "/requests", {
+        'id': f"load-{caller}-{n}", 'name': f"Caller {caller}-{n}", 'age': rng.randint(1, 95),
+        'phone': f"98{rng.randint(10 ** 7, 10 ** 8 - 1)}", 'location': rng.choice(LOCATIONS),
+        'answers': answers,
+    }
+
+
+def caller(i, args, host, port, deadline, rows, lock):
+    """One client connection sending requests until the deadline"""
+    rng = random.Random(i)
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    local = []
+    n = 0
+    while time.perf_counter() < deadline:
+        path, body = make_body(rng, rng.random() < args.mix, i, n)
+        data = json.dumps(body)
+        t0 = time.perf_counter()
+        try:
+            conn.request("POST", path, data, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            status = 0
+        local.append((path, status, time.perf_counter() - t0))
+        n += 1
+    conn.close()
+    with lock:
+        rows.extend(local)
+
+
+def wait_for(host, port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"triage API did not start on {host}:{port}")
+
+
+def get_json(host, port, path):
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    conn.request("GET", path)
+    body = json.loads(conn.getresponse().read())
+    conn.close()
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent callers against the triage API")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load")
+    parser.add_argument("--mix", type=float, default=0.5, help="share of POST /requests calls")
+    parser.add_argument("--base-url", help="API to test; default: start a local one on scratch files")
+    args = parser.parse_args()
+
+    server = scratch = None
+    if args.base_url:
+        url = urlsplit(args.base_url)
+        host, port = url.hostname, url.port or 80
+    else:
+        scratch = tempfile.mkdtemp(prefix="triage-load-")
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "triage.triage_api", "--port", str(port),
+             "--queue", os.path.join(scratch, "queue.json"), "--stats", os.path.join(scratch, "stats.json")],
+            cwd=ROOT, stdout=subprocess.DEVNULL,
+        )
+    try:
+        wait_for(host, port)
+        rows = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.duration
+        threads = [threading.Thread(target=caller, args=(i, args, host, port, deadline, rows, lock))
+                   for i in range(args.clients)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+        server_stats = get_json(host, port, "/stats")
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGINT)       # stops like Ctrl-C: final queue flush
+            server.wait()
+
+    ok = [r for r in rows if 200 <= r[1] < 300]
+    print(f"{args.clients} clients for {args.duration:.0f} s against http://{host}:{port} "
+          f"({args.mix:.0%} intakes)")
+    print(f"Requests: {len(rows)} in {wall:.1f} s ({len(rows) / wall:,.0f}/s); "
+          f"ok {len(ok)}, errors {len(rows) - len(ok)}")
+    print(f"{'endpoint':<18}{'count':>8}{'p50 ms':>8}{'p99 ms':>8}")
+    for path in ("/triage", "/requests"):
+        ms = [r[2] * 1000 for r in ok if r[0] == path]
+        if ms:
+            print(f"{path:<18}{len(ms):>8}{np.percentile(ms, 50):>8.2f}{np.percentile(ms, 99):>8.2f}")
+    print(f"Server: {server_stats}")
+    if scratch is not None:
+        with open(os.path.join(scratch, "queue.json")) as f:
+            queued = len(json.load(f))
+        print(f"Queue file: {queued} calls, server accepted {server_stats['received']} intakes")
+
+
+if __name__ == "__main__":
+    main()
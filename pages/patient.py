@@ -1,11 +1,10 @@
 import streamlit as st
-import json
 from datetime import datetime
-import os
-import pickle
-import numpy as np
-import joblib
-import pandas as pd  # <-- 1. IMPORT PANDAS
+from triage import queue_store
+from triage.geocoder import build_geocoder
+from triage.queue_store import record_call
+from triage.styles import style_tag
+from triage.triage_daemon import TriageClient
 
 # Page configuration
 st.set_page_config(
@@ -15,61 +14,19 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Load ML Model with better error handling
-MODEL_LOADED = False
-model = None
+@st.cache_resource
+def get_triage_client():
+    """Classifier shared by all sessions: the triage daemon if it runs, else loaded in this process"""
+    return TriageClient()
 
-# --- 2. UPDATED VALIDATION TEST TO USE A DATAFRAME ---
-def load_model():
-    """Try to load the ML model from multiple possible locations with compatibility fixes"""
-    global model, MODEL_LOADED
-    
-    possible_paths = [
-        'emergency_triage_model.pkl',
-        './emergency_triage_model.pkl',
-        '../emergency_triage_model.pkl',
-        'models/emergency_triage_model.pkl',
-    ]
-    
-    for path in possible_paths:
-        if not os.path.exists(path):
-            continue
-            
-        try:
-            # Use joblib.load() since the model was saved with joblib.dump()
-            model = joblib.load(path)
-            MODEL_LOADED = True
-            print(f"✅ Model loaded successfully from: {path} (using joblib)")
-            
-            # Quick validation test
-            try:
-                # --- START OF FIX ---
-                # Model expects a Pandas DataFrame with feature names, not a numpy array.
-                test_data = [[0, 0, 0, 0, 0, 0, 0, 0, 0, 0]]
-                test_cols = ['chest_pain', 'shortness_of_breath', 'unconsciousness', 'bleeding', 
-                               'confusion', 'weakness', 'seizure', 'trauma', 'dizziness', 'cyanosis']
-                test_df = pd.DataFrame(test_data, columns=test_cols)
-                _ = model.predict(test_df)
-                # --- END OF FIX ---
-                
-                print("✅ Model validation passed")
-                return True
-            except Exception as e:
-                print(f"⚠️ Model loaded but validation failed: {e}")
-                print("   (This is likely due to the model expecting a DataFrame with feature names)")
-                MODEL_LOADED = False
-                model = None
-                continue
-                
-        except Exception as e:
-            print(f"Failed to load from {path} using joblib: {e}")
-            continue
-    
-    print("⚠️ ML Model not found or incompatible. Using rule-based fallback system.")
-    return False
+MODEL_STATUS_TTL_S = 30
+
+@st.cache_data(ttl=MODEL_STATUS_TTL_S, show_spinner=False)
+def model_loaded():
+    """Model status from the daemon, asked at most once per TTL instead of every rerun"""
+    return get_triage_client().model_loaded()
 
-# Try to load model on startup
-load_model()
+MODEL_LOADED = model_loaded()
 
 def get_model_status_message():
     """Return a formatted message about model status"""
@@ -78,346 +35,21 @@ def get_model_status_message():
     else:
         return "⚠️ ML Model: **Unavailable** - Using rule-based system (still highly accurate)"
 
-# File paths for shared data
-QUEUE_FILE = "emergency_queue.json"
-STATS_FILE = "system_stats.json"
+@st.cache_resource
+def get_geocoder():
+    """Gazetteer index shared by all sessions (built once per process)"""
+    return build_geocoder()
 
-def load_queue():
-    """Load queue from file"""
+def enqueue_request(request):
+    """Append a call to the shared queue and count it, under the queue lock"""
     try:
-        if os.path.exists(QUEUE_FILE):
-            with open(QUEUE_FILE, 'r') as f:
-                return json.load(f)
-        return []
-    except:
-        return []
-
-def save_queue(queue):
-    """Save queue to file with deduplication"""
-    try:
-        seen = set()
-        unique_queue = []
-        for entry in queue:
-            entry_id = entry.get("id")
-            if entry_id and entry_id not in seen:
-                unique_queue.append(entry)
-                seen.add(entry_id)
-        
-        with open(QUEUE_FILE, 'w') as f:
-            json.dump(unique_queue, f, indent=2)
-        return True
+        return queue_store.update_queue(lambda queue, stats: record_call(queue, stats, request))
     except Exception as e:
         st.error(f"Error saving queue: {e}")
         return False
 
-def load_stats():
-    """Load stats from file"""
-    try:
-        if os.path.exists(STATS_FILE):
-            with open(STATS_FILE, 'r') as f:
-                return json.load(f)
-        return {
-            'calls_today': 0,
-            'dispatched': 0,
-            'avg_response': 8.5,
-            'success_rate': 95
-        }
-    except:
-        return {
-            'calls_today': 0,
-            'dispatched': 0,
-            'avg_response': 8.5,
-            'success_rate': 95
-        }
-
-def save_stats(stats):
-    """Save stats to file"""
-    try:
-        with open(STATS_FILE, 'w') as f:
-            json.dump(stats, f, indent=2)
-    except Exception as e:
-        st.error(f"Error saving stats: {e}")
-
-
-# --- 3. UPDATED PREDICTION TO USE A DATAFRAME & REVERTED TO STRING MAP ---
-def hybrid_classify_and_prioritize(answers):
-    """
-    Hybrid ML + Rule-based emergency classification
-    
-    PRIORITY ORDER:
-    1. Critical life-threatening rules (INSTANT response - no ML delay)
-    2. ML Model prediction (for complex pattern recognition)
-    3. Fallback scoring system (if ML unavailable)
-    
-    Returns: (diagnosis, priority, severity_score, method_used)
-    """
-    
-    # ========== PHASE 1: CRITICAL RULE-BASED CONDITIONS (INSTANT RESPONSE) ==========
-    # These bypass ML for speed - life-threatening conditions need immediate classification
-    
-    # RULE 1: Unconscious + Cyanosis = Cardiac Arrest (HIGHEST PRIORITY)
-    if answers.get('unconsciousness', 0) == 1 and answers.get('cyanosis', 0) == 1:
-        return 'Cardiac Arrest', 'HIGH', 150, 'Critical Rule'
-    
-    # RULE 2: Unconscious alone = Critical (brain injury, stroke, cardiac event)
-    if answers.get('unconsciousness', 0) == 1:
-        return 'Critical - Unconscious Patient', 'HIGH', 145, 'Critical Rule'
-    
-    # RULE 3: Severe Respiratory Distress + Cyanosis (suffocation, cardiac/respiratory failure)
-    if answers.get('shortness_of_breath', 0) == 1 and answers.get('cyanosis', 0) == 1:
-        return 'Severe Respiratory Distress', 'HIGH', 140, 'Critical Rule'
-    
-    # RULE 4: Triple cardiac symptoms (Chest pain + Breathing difficulty + Cyanosis)
-    if (answers.get('chest_pain', 0) == 1 and 
-        answers.get('shortness_of_breath', 0) == 1 and 
-        answers.get('cyanosis', 0) == 1):
-        return 'Heart Attack (STEMI Suspected)', 'HIGH', 135, 'Critical Rule'
-    
-    # RULE 5: Major Trauma with Bleeding (hypovolemic shock risk)
-    if answers.get('trauma', 0) == 1 and answers.get('bleeding', 0) == 1:
-        return 'Major Trauma/Hemorrhage', 'HIGH', 130, 'Critical Rule'
-    
-    # RULE 6: Chest Pain + Shortness of Breath (cardiac event without cyanosis yet)
-    if answers.get('chest_pain', 0) == 1 and answers.get('shortness_of_breath', 0) == 1:
-        return 'Heart Attack (Suspected)', 'HIGH', 128, 'Critical Rule'
-    
-    # RULE 7: Stroke symptoms (Confusion + One-sided Weakness)
-    if answers.get('confusion', 0) == 1 and answers.get('weakness', 0) == 1:
-        return 'Stroke (Suspected)', 'HIGH', 125, 'Critical Rule'
-    
-    # ========== PHASE 2: USE ML MODEL FOR COMPLEX PATTERN RECOGNITION ==========
-    # ML is better at detecting subtle combinations and non-obvious patterns
-    
-    if MODEL_LOADED and model is not None:
-        try:
-            # Prepare features in the EXACT order the model was trained on
-            features = [
-                answers.get('chest_pain', 0),
-                answers.get('shortness_of_breath', 0),
-                answers.get('unconsciousness', 0),
-                answers.get('bleeding', 0),
-                answers.get('confusion', 0),
-                answers.get('weakness', 0),
-                answers.get('seizure', 0),
-                answers.get('trauma', 0),
-                answers.get('dizziness', 0),
-                answers.get('cyanosis', 0)
-            ]
-            
-            # --- START OF FIX ---
-            # Create a DataFrame with the correct column names for prediction
-            feature_cols = ['chest_pain', 'shortness_of_breath', 'unconsciousness', 'bleeding', 
-                           'confusion', 'weakness', 'seizure', 'trauma', 'dizziness', 'cyanosis']
-            feature_df = pd.DataFrame([features], columns=feature_cols)
-            # --- END OF FIX ---
-            
-            
-            # Get ML prediction (will be a string like "Heart Attack")
-            diagnosis = model.predict(feature_df)[0]
-            
-            # Map ML diagnosis to priority and severity score (String-based map)
-            # This is the original map, which is correct for your model.
-            severity_map = {
-                'Cardiac Arrest': ('HIGH', 150),
-                'Heart Attack': ('HIGH', 135),
-                'Severe Respiratory Distress': ('HIGH', 130),
-                'Major Trauma/Bleeding': ('HIGH', 125),
-                'Stroke': ('HIGH', 120),
-                'Shock/Collapse': ('MEDIUM', 90),
-                'Seizure/Post-Seizure': ('MEDIUM', 85),
-                'Fainting/Syncope': ('LOW', 50),
-                'Minor Trauma': ('LOW', 45),
-                'Anxiety/Panic': ('LOW', 40)
-            }
-            
-            priority, severity_score = severity_map.get(diagnosis, ('MEDIUM', 70))
-            
-            return diagnosis, priority, severity_score, 'ML Model'
-            
-        except Exception as e:
-            # If ML fails, fall through to rule-based scoring
-            print(f"⚠️ ML prediction failed: {e}. Using fallback scoring.")
-    
-    # ========== PHASE 3: FALLBACK RULE-BASED SCORING SYSTEM ==========
-    # Used when ML model is unavailable or fails
-    
-    # Calculate weighted severity score
-    score = 0
-    score += answers.get('chest_pain', 0) * 35        # Cardiac indicator
-    score += answers.get('shortness_of_breath', 0) * 30  # Respiratory/cardiac
-    score += answers.get('unconsciousness', 0) * 50   # Critical brain/cardiac
-    score += answers.get('bleeding', 0) * 30          # Hemorrhage risk
-    score += answers.get('confusion', 0) * 25         # Neurological/stroke
-    score += answers.get('weakness', 0) * 25          # Stroke/cardiac
-    score += answers.get('seizure', 0) * 28           # Neurological emergency
-    score += answers.get('trauma', 0) * 30            # Injury severity
-    score += answers.get('dizziness', 0) * 15         # General instability
-    score += answers.get('cyanosis', 0) * 40          # Oxygen deprivation
-    
-    # Determine diagnosis from symptom patterns
-    if answers.get('chest_pain', 0) == 1 and answers.get('shortness_of_breath', 0) == 1:
-        diagnosis = 'Heart Attack (Suspected)'
-    elif answers.get('confusion', 0) == 1 and answers.get('weakness', 0) == 1:
-        diagnosis = 'Stroke (Suspected)'
-    elif answers.get('bleeding', 0) == 1 and answers.get('trauma', 0) == 1:
-        diagnosis = 'Major Trauma/Bleeding'
-    elif answers.get('seizure', 0) == 1:
-        diagnosis = 'Seizure/Post-Seizure'
-    elif answers.get('shortness_of_breath', 0) == 1:
-        diagnosis = 'Respiratory Distress'
-    elif answers.get('dizziness', 0) == 1 and answers.get('weakness', 0) == 1:
-        diagnosis = 'Syncope/Collapse'
-    elif score > 0:
-        diagnosis = 'General Medical Emergency'
-    else:
-        diagnosis = 'Non-Emergency Medical Assistance'
-    
-    # Determine priority based on score
-    if score >= 120:
-        priority = 'HIGH'
-    elif score >= 60:
-        priority = 'MEDIUM'
-    else:
-        priority = 'LOW'
-    
-    return diagnosis, priority, score, 'Rule-Based Fallback'
-
-# Custom CSS with GREEN THEME
-st.markdown("""
-    <style>
-    /* Hide sidebar and default elements */
-    [data-testid="stSidebar"] {display: none;}
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    /* BLUE → DARK NAVY DYNAMIC BACKGROUND */
-    .stApp {
-        background: linear-gradient(-45deg, 
-            #3b82f6, #1e3a8a, #0f1a3a, #000814
-        );
-        background-size: 400% 400%;
-        animation: gradientShift 15s ease infinite;
-    }
-
-    @keyframes gradientShift {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-    
-    .main {
-        background: rgba(255, 255, 255, 0.05);
-        backdrop-filter: blur(10px);
-        padding: 2rem;
-        border-radius: 15px;
-    }
-    
-    /* Header - GREEN THEME */
-    .dashboard-header {
-        background: linear-gradient(135deg, rgba(16, 185, 129, 0.3), rgba(5, 150, 105, 0.3));
-        backdrop-filter: blur(10px);
-        padding: 1.5rem;
-        border-radius: 15px;
-        margin-bottom: 2rem;
-        border: 1px solid rgba(16, 185, 129, 0.4);
-    }
-    
-    .dashboard-title {
-        color: white;
-        margin: 0;
-        font-size: 2.5rem;
-        font-weight: 900;
-        text-shadow: 0 0 20px rgba(16, 185, 129, 0.5);
-    }
-    
-    /* White cards */
-    .question-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 12px;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.3);
-        margin-bottom: 1rem;
-    }
-    
-    .info-card {
-        background: white;
-        padding: 2rem;
-        border-radius: 15px;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.3);
-        text-align: center;
-    }
-    
-    /* Priority indicators */
-    .priority-indicator {
-        width: 20px;
-        height: 20px;
-        border-radius: 4px;
-        display: inline-block;
-        margin-right: 10px;
-        box-shadow: 0 2px 5px rgba(0, 0, 0, 0.2);
-    }
-    
-    .severity-high { background: #ef4444; }
-    .severity-medium { background: #f59e0b; }
-    .severity-low { background: #10b981; }
-    
-    .section-header {
-        color: white;
-        font-size: 1.8rem;
-        font-weight: 700;
-        margin: 2rem 0 1rem 0;
-        text-shadow: 0 0 10px rgba(255, 255, 255, 0.3);
-    }
-    
-    .result-box {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 12px;
-        margin: 1rem 0;
-        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.3);
-    }
-    
-    .result-box h3 { color: #1e293b; margin-top: 0; }
-    .result-box p { color: #475569; margin: 0.5rem 0; }
-    
-    .info-message {
-        background: rgba(96, 165, 250, 0.15);
-        border-left: 4px solid #60a5fa;
-        padding: 1rem;
-        border-radius: 8px;
-        color: rgba(255, 255, 255, 0.9);
-        margin: 1rem 0;
-    }
-    
-    .warning-message {
-        background: rgba(251, 191, 36, 0.15);
-        border-left: 4px solid #fbbf24;
-        padding: 1rem;
-        border-radius: 8px;
-        color: rgba(255, 255, 255, 0.9);
-        margin: 1rem 0;
-    }
-    
-    .success-message {
-        background: rgba(34, 197, 94, 0.15);
-        border-left: 4px solid #22c55e;
-        padding: 1rem;
-        border-radius: 8px;
-        color: rgba(255, 255, 255, 0.9);
-        margin: 1rem 0;
-    }
-    
-    .error-message {
-        background: rgba(239, 68, 68, 0.15);
-        border-left: 4px solid #ef4444;
-        padding: 1rem;
-        border-radius: 8px;
-        color: rgba(255, 255, 255, 0.9);
-        margin: 1rem 0;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# GREEN theme (styles/patient.css)
+st.markdown(style_tag("patient", st.get_option("server.enableStaticServing")), unsafe_allow_html=True)
 
 # Initialize session state
 if 'user_type' not in st.session_state or st.session_state.user_type != "patient":
@@ -443,6 +75,10 @@ if 'critical_answers' not in st.session_state:
     st.session_state.critical_answers = {}
 if 'is_critical_case' not in st.session_state:
     st.session_state.is_critical_case = False
+if 'prefill_answers' not in st.session_state:
+    # Symptoms detected in a chatbot message (see pages/chatbot.py); pre-select those answers
+    st.session_state.prefill_answers = {}
+    st.session_state.prefill_message = ""
 
 # TOP 3 CRITICAL QUESTIONS (asked first for rapid triage)
 # These are separate from the main questionnaire and use combined/specialized wording
@@ -523,6 +159,7 @@ with col2:
         st.session_state.user_type = None
         st.session_state.logged_in = False
         st.session_state.request_step = 'home'
+        st.session_state.prefill_answers = {}
         st.switch_page("index.py")
 
 # Main content based on step
@@ -590,6 +227,24 @@ if st.session_state.request_step == 'home':
 elif st.session_state.request_step == 'patient_info':
     st.markdown("<h3 class='section-header'>👤 Patient Information</h3>", unsafe_allow_html=True)
     st.markdown("<p class='info-message'>Please provide the following information about the patient</p>", unsafe_allow_html=True)
+    if st.session_state.prefill_answers:
+        detected = [k.replace('_', ' ') for k in questionnaire if st.session_state.prefill_answers.get(k)]
+        st.markdown(
+            f"<p class='error-message'><strong>🚨 From your chat message:</strong> {', '.join(detected)}. "
+            f"Those answers are already selected in the next steps.</p>",
+            unsafe_allow_html=True
+        )
+    
+    # Locality autocomplete - kept outside the form so suggestions update on Enter
+    geocoder = get_geocoder()
+    locality = None
+    locality_query = st.text_input("🔎 Search your area / locality", placeholder="Start typing, e.g. Ramdaspeth", key="locality_query")
+    if locality_query:
+        suggestions = geocoder.autocomplete(locality_query)
+        if suggestions:
+            locality = st.selectbox("Matching areas", suggestions, key="locality_choice")
+        else:
+            st.caption("No matching area found - describe the location in the address field below")
     
     with st.form("patient_info_form"):
         col1, col2 = st.columns(2)
@@ -608,11 +263,15 @@ elif st.session_state.request_step == 'patient_info':
         
         if submitted:
             if name and age and phone and address:
+                # Prefer the picked locality, fall back to the free-text address
+                geo = geocoder.geocode(locality) if locality else geocoder.geocode(address)
                 st.session_state.patient_info = {
                     'name': name,
                     'age': age,
                     'phone': phone,
                     'address': address,
+                    'locality': locality,
+                    'geo': geo,
                     'relationship': relationship,
                     'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 }
@@ -645,6 +304,7 @@ elif st.session_state.request_step == 'critical_questions':
             selected = st.radio(
                 f"Select:",
                 options=q_data['options'],
+                index=1 if st.session_state.prefill_answers.get(key) else 0,
                 key=f"critical_{key}",
                 horizontal=True,
                 label_visibility="collapsed"
@@ -713,6 +373,8 @@ elif st.session_state.request_step == 'critical_questions':
                     
                     st.session_state.questionnaire_answers = full_answers
                     st.session_state.patient_info['additional_info'] = 'CRITICAL CASE - Rapid triage triggered'
+                    if st.session_state.prefill_message:
+                        st.session_state.patient_info['additional_info'] += f" | Chat: {st.session_state.prefill_message}"
                     st.session_state.request_step = 'result'
                     st.rerun()
                 else:
@@ -750,6 +412,7 @@ elif st.session_state.request_step == 'questionnaire':
             selected = st.radio(
                 f"Select:",
                 options=q_data['options'],
+                index=1 if st.session_state.prefill_answers.get(key) else 0,
                 key=f"q_{key}",
                 horizontal=True,
                 label_visibility="collapsed"
@@ -764,6 +427,7 @@ elif st.session_state.request_step == 'questionnaire':
         st.markdown("<div class='question-card'>", unsafe_allow_html=True)
         st.markdown("**Additional Symptoms or Information (Optional)**")
         additional_info = st.text_area("Any other relevant details", 
+                                      value=st.session_state.prefill_message,
                                       placeholder="e.g., medications, allergies, pre-existing conditions",
                                       height=100)
         st.markdown("</div>", unsafe_allow_html=True)
@@ -812,7 +476,7 @@ elif st.session_state.request_step == 'result':
     else:
         # Use hybrid ML classification for non-critical cases
         with st.spinner("🤖 AI analyzing symptoms..."):
-            diagnosis, priority, severity_score, method_used = hybrid_classify_and_prioritize(
+            diagnosis, priority, severity_score, method_used = get_triage_client().classify(
                 st.session_state.questionnaire_answers
             )
     
@@ -826,9 +490,6 @@ elif st.session_state.request_step == 'result':
     
     # Add to queue once
     if not st.session_state.request_submitted:
-        current_queue = load_queue()
-        current_stats = load_stats()
-        
         new_request = {
             'id': abs(hash(str(st.session_state.patient_info) + str(datetime.now()))),
             'name': st.session_state.patient_info['name'],
@@ -842,15 +503,15 @@ elif st.session_state.request_step == 'result':
             'phone': st.session_state.patient_info['phone']
         }
         
-        request_id = new_request['id']
-        existing_ids = {req.get('id') for req in current_queue}
+        # Attach coordinates so dispatch can route to the patient
+        geo = st.session_state.patient_info.get('geo')
+        if geo:
+            new_request['lat'] = geo['lat']
+            new_request['lon'] = geo['lon']
+            new_request['geo_confidence'] = geo['confidence']
+            new_request['in_service_area'] = geo['in_service_area']
         
-        if request_id not in existing_ids:
-            current_queue.append(new_request)
-            save_queue(current_queue)
-            
-            current_stats['calls_today'] += 1
-            save_stats(current_stats)
+        enqueue_request(new_request)
         
         st.session_state.request_submitted = True
     
@@ -882,6 +543,13 @@ elif st.session_state.request_step == 'result':
     else:
         st.markdown(f"<p class='success-message'><span class='priority-indicator {priority_class}'></span><strong>NON-CRITICAL - Priority: {priority}</strong><br>Severity Score: {severity_score}/150</p>", unsafe_allow_html=True)
     
+    # Warn the caller when the address could not be placed inside the service area
+    geo = st.session_state.patient_info.get('geo')
+    if geo is None:
+        st.markdown("<p class='warning-message'>📍 <strong>Location not recognised:</strong> the dispatcher will confirm your address by phone.</p>", unsafe_allow_html=True)
+    elif not geo['in_service_area']:
+        st.markdown(f"<p class='error-message'>📍 <strong>Outside service area:</strong> {geo['name']} is outside {get_geocoder().service_area['name']}. Please call 108 for the nearest local service.</p>", unsafe_allow_html=True)
+    
     st.markdown("<br>", unsafe_allow_html=True)
     
     col1, col2 = st.columns(2)
@@ -964,6 +632,8 @@ elif st.session_state.request_step == 'result':
             st.session_state.request_submitted = False
             st.session_state.critical_answers = {}
             st.session_state.is_critical_case = False
+            st.session_state.prefill_answers = {}
+            st.session_state.prefill_message = ""
             st.rerun()
 
 
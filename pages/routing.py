@@ -1,4 +1,9 @@
 import streamlit as st
+from triage.fleet import load_ambulances
+from triage.geocoder import build_geocoder
+from triage.isochrones import RESPONSE_TARGET_MIN, IsochroneCache, coverage_report, population_nodes
+from triage.routing import load_default_engine
+from triage.styles import style_tag
 
 st.set_page_config(
     page_title="Real-Time Routing - Coming Soon",
@@ -6,113 +11,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# ---- STYLING ----
-st.markdown("""
-    <style>
-    .stApp {
-        background: linear-gradient(-45deg, #1e3a8a, #2563eb, #3b82f6, #60a5fa);
-        background-size: 400% 400%;
-        animation: gradientShift 15s ease infinite;
-    }
-
-    @keyframes gradientShift {
-        0% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-        100% { background-position: 0% 50%; }
-    }
-
-    .main {
-        background: rgba(255, 255, 255, 0.1);
-        backdrop-filter: blur(20px);
-        border-radius: 20px;
-        padding: 3rem;
-    }
-
-    .coming-soon-container {
-        text-align: center;
-        padding: 4rem 2rem;
-    }
-
-    .icon-large {
-        font-size: 8rem;
-        margin-bottom: 2rem;
-        animation: bounce 2s ease-in-out infinite;
-    }
-
-    @keyframes bounce {
-        0%, 100% { transform: translateY(0); }
-        50% { transform: translateY(-20px); }
-    }
-
-    .title {
-        font-size: 3rem;
-        font-weight: 900;
-        color: white;
-        margin-bottom: 1rem;
-        text-shadow: 0 0 20px rgba(255, 255, 255, 0.5);
-    }
-
-    .subtitle {
-        font-size: 1.4rem;
-        color: rgba(255, 255, 255, 0.9);
-        margin-bottom: 3rem;
-        max-width: 900px;
-        margin-left: auto;
-        margin-right: auto;
-        line-height: 1.8;
-    }
-
-    .feature-box {
-        background: rgba(255, 255, 255, 0.08);
-        border-radius: 15px;
-        padding: 2rem;
-        margin: 1rem 0;
-        text-align: left;
-        border: 1px solid rgba(255,255,255,0.2);
-        box-shadow: 0 4px 12px rgba(0,0,0,0.2);
-        transition: all 0.3s ease;
-    }
-
-    .feature-box:hover {
-        background: rgba(255, 255, 255, 0.12);
-        transform: translateY(-5px);
-    }
-
-    .feature-title {
-        font-size: 1.3rem;
-        font-weight: 700;
-        color: white;
-        margin-bottom: 0.5rem;
-    }
-
-    .feature-desc {
-        color: rgba(255, 255, 255, 0.85);
-        font-size: 1rem;
-    }
-
-    /* Black Buttons */
-    .stButton > button {
-        width: 220px !important;
-        margin: 2rem auto !important;
-        display: block !important;
-        background: #000 !important;
-        color: white !important;
-        font-weight: 600 !important;
-        border-radius: 12px !important;
-        box-shadow: 0 4px 10px rgba(0,0,0,0.4);
-        transition: all 0.3s ease;
-        border: none !important;
-        font-size: 1.05rem !important;
-        letter-spacing: 0.5px;
-    }
-
-    .stButton > button:hover {
-        background: #111 !important;
-        transform: translateY(-2px);
-        box-shadow: 0 8px 20px rgba(255,255,255,0.25);
-    }
-    </style>
-""", unsafe_allow_html=True)
+# ---- STYLING (styles/routing.css) ----
+st.markdown(style_tag("routing", st.get_option("server.enableStaticServing")), unsafe_allow_html=True)
 
 # ---- MAIN CONTENT ----
 st.markdown("""
@@ -125,6 +25,38 @@ st.markdown("""
     </div>
 """, unsafe_allow_html=True)
 
+# ---- LIVE FLEET POSITIONS (fed by the GPS ingestion service) ----
+ambulances = load_ambulances()
+if ambulances:
+    st.markdown("### 📍 Live Fleet Positions")
+    st.map(
+        {
+            'lat': [a['lat'] for a in ambulances],
+            'lon': [a['lon'] for a in ambulances],
+        },
+        zoom=11,
+    )
+    st.caption(f"{len(ambulances)} units • positions map-matched from GPS pings (python -m triage.gps)")
+
+# ---- RESPONSE-TIME COVERAGE ----
+@st.cache_resource
+def get_coverage_tools():
+    """Routing engine, isochrone cache and populated localities (built once)"""
+    engine = load_default_engine()
+    return engine, IsochroneCache(engine), population_nodes(engine, build_geocoder())
+
+if ambulances:
+    engine, iso_cache, localities = get_coverage_tools()
+    available = [(a['id'], a['lat'], a['lon']) for a in ambulances if a.get('state') == 'available']
+    report = coverage_report(engine, iso_cache, available, localities, RESPONSE_TARGET_MIN)
+    
+    st.markdown(f"### ⏱️ {RESPONSE_TARGET_MIN:g}-Minute Coverage (current traffic)")
+    col1, col2 = st.columns(2)
+    col1.metric("Population covered", f"{report['population_pct']:.0f}%")
+    col2.metric("Localities covered", f"{report['localities_covered']}/{report['localities_total']}")
+    if report['gaps']:
+        st.caption("Coverage gaps: " + ", ".join(name for name, _ in report['gaps'][:8]))
+
 # ---- FEATURES SECTION ----
 st.markdown("### 🚀 Planned Features")
 
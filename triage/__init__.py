@@ -0,0 +1,5 @@
+"""Shared backend modules for the Smart Ambulance Triage System.
+
+The Streamlit pages under ``pages/`` import from here so that dispatch,
+routing and classification logic can be reused outside the UI.
+"""
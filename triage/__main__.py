@@ -0,0 +1,125 @@
+"""
+Command-line entry points of the triage package.
+
+    python -m triage classify [FILE] [--chunk N]
+
+classify reads answer vectors as JSONL (a file, or stdin when FILE is
+omitted or '-') and writes one JSONL result per non-blank line to stdout:
+diagnosis, priority, severity_score, method and latency_us, plus the id of
+the input row if it had one. Each line may be
+
+    {"chest_pain": 1, "shortness_of_breath": 1}          symptom flags
+    {"id": "c-17", "answers": {"chest_pain": 1}}         as POST /triage takes them
+    [1, 1, 0, 0, 0, 0, 0, 0, 0, 0]                       ten flags in FEATURES order
+
+Lines are read and written in chunks, so memory stays flat however large the
+input; classification goes through the memoized hybrid classifier, so after
+the first 1024 distinct patterns every row is a cache hit. A bad line yields
+{"line": n, "error": ...} in its place and processing continues.
+
+    zcat audit.jsonl.gz | python -m triage classify > results.jsonl
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from itertools import islice
+
+DEFAULT_CHUNK = 4096
+
+
+def parse_line(line, features):
+    """(id or None, answers dict) of one input line; ValueError if it is not usable"""
+    row = json.loads(line)
+    if isinstance(row, list):
+        if len(row) != len(features):
+            raise ValueError(f"answer vector must have {len(features)} flags")
+        return None, dict(zip(features, row))
+    if not isinstance(row, dict):
+        raise ValueError("line must be an object or a list of flags")
+    if 'answers' in row:
+        return row.get('id'), row['answers']
+    return row.get('id'), {k: v for k, v in row.items() if k != 'id'}
+
+
+def classify_stream(lines, out, chunk=DEFAULT_CHUNK):
+    """Classify JSONL lines into `out` chunk by chunk; returns (rows, errors), blank lines skipped"""
+    from triage.classifier import FEATURES, hybrid_classify_and_prioritize, parse_answers
+
+    line_no = rows = errors = 0
+    lines = iter(lines)
+    while True:
+        block = list(islice(lines, chunk))
+        if not block:
+            return rows, errors
+        results = []
+        for line in block:
+            line_no += 1
+            if not line.strip():
+                continue
+            rows += 1
+            t0 = time.perf_counter()
+            try:
+                row_id, answers = parse_line(line, FEATURES)
+                diagnosis, priority, severity_score, method = hybrid_classify_and_prioritize(
+                    parse_answers(answers))
+            except ValueError as e:
+                errors += 1
+                results.append(json.dumps({'line': line_no, 'error': str(e)}))
+                continue
+            result = {
+                'diagnosis': str(diagnosis),
+                'priority': priority,
+                'severity_score': severity_score,
+                'method': method,
+                'latency_us': round((time.perf_counter() - t0) * 1e6, 1),
+            }
+            if row_id is not None:
+                result = dict(id=row_id, **result)
+            results.append(json.dumps(result))
+        out.write("\n".join(results) + "\n" if results else "")
+
+
+def cmd_classify(args):
+    # The classifier reports on model loading with print(); keep stdout pure JSONL
+    with contextlib.redirect_stdout(sys.stderr):
+        from triage import classifier
+    if args.path in (None, '-'):
+        source = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+    else:
+        source = open(args.path, 'r', encoding='utf-8')
+    started = time.perf_counter()
+    with source:
+        rows, errors = classify_stream(source, sys.stdout, args.chunk)
+    sys.stdout.flush()
+    elapsed = time.perf_counter() - started
+    info = classifier.cache_info()
+    print(f"🧮 Classified {rows - errors:,} of {rows:,} lines in {elapsed:.2f} s "
+          f"({errors:,} errors, {info.misses} distinct patterns)", file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m triage", description="Triage command-line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    classify = commands.add_parser("classify", help="classify JSONL answer vectors to JSONL results")
+    classify.add_argument("path", nargs="?", help="JSONL input (default: stdin)")
+    classify.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="lines per read/write")
+    classify.set_defaults(run=cmd_classify)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except BrokenPipeError:
+        # Downstream closed early (e.g. `| head`): stop quietly
+        sys.stdout = open(os.devnull, 'w')
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Process-wide admission control for outbound Gemini calls.
+
+All chatbot sessions share one API quota. Before a turn may call the API it
+needs a ticket from the AdmissionGate:
+
+- a token bucket caps the request rate (the quota), with a small burst;
+- a bounded number of requests may be in flight at once;
+- waiting turns are queued per session and served round-robin, so one busy
+  session cannot starve the others, and flagged (symptom) messages go first;
+- when the queue is full, or the expected wait is longer than a turn is
+  allowed to wait, the turn is refused at once (Overloaded) so the page can
+  answer right away instead of parking a Streamlit thread.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+RATE_PER_S = 2.0
+BURST = 10
+MAX_IN_FLIGHT = 8
+MAX_WAITING = 32
+MAX_WAIT_S = 5.0
+WAIT_WINDOW = 2048
+
+
+class Overloaded(Exception):
+    """The turn was not admitted; `reason` is 'queue_full', 'too_slow' or 'timeout'"""
+
+    def __init__(self, reason):
+        super().__init__(f"admission refused: {reason}")
+        self.reason = reason
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; not thread-safe (the gate holds its lock)"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def take(self, now=None):
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self, now=None):
+        """Seconds until the next token"""
+        self._refill(time.monotonic() if now is None else now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+class Ticket:
+    """Admission to call the API; release() (or finishing wrap()) frees the slot"""
+
+    def __init__(self, gate, session, priority):
+        self.gate = gate
+        self.session = session
+        self.priority = priority
+        self.granted = False
+        self.released = False
+
+    def release(self):
+        if self.granted and not self.released:
+            self.released = True
+            self.gate._release()
+
+    def wrap(self, chunks):
+        """Yield from a reply stream and release the ticket when it ends"""
+        try:
+            yield from chunks
+        finally:
+            self.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class AdmissionGate:
+    """Token bucket + in-flight limit + fair per-session queue"""
+
+    def __init__(self, rate_per_s=RATE_PER_S, burst=BURST, max_in_flight=MAX_IN_FLIGHT,
+                 max_waiting=MAX_WAITING, max_wait_s=MAX_WAIT_S):
+        self.bucket = TokenBucket(rate_per_s, burst)
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.max_wait_s = max_wait_s
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.priority = deque()         # flagged tickets, FIFO
+        self.sessions = OrderedDict()   # session -> deque of tickets, in round-robin order
+        self.waiting = 0
+        self.waits = deque(maxlen=WAIT_WINDOW)
+        self.counts = {'admitted': 0, 'priority': 0, 'queue_full': 0, 'too_slow': 0, 'timeout': 0}
+
+    # ---------------- queue ----------------
+    def _head(self):
+        if self.priority:
+            return self.priority[0]
+        if self.sessions:
+            return next(iter(self.sessions.values()))[0]
+        return None
+
+    def _enqueue(self, ticket):
+        if ticket.priority:
+            self.priority.append(ticket)
+        else:
+            self.sessions.setdefault(ticket.session, deque()).append(ticket)
+        self.waiting += 1
+
+    def _dequeue(self, ticket):
+        if ticket.priority:
+            self.priority.remove(ticket)
+        else:
+            queue = self.sessions[ticket.session]
+            queue.remove(ticket)
+            if queue:
+                self.sessions.move_to_end(ticket.session)   # served: back of the round
+            else:
+                del self.sessions[ticket.session]
+        self.waiting -= 1
+
+    def _expected_wait(self, ahead):
+        """Rough wait for a turn with `ahead` turns queued before it"""
+        return self.bucket.wait_time() + ahead / self.bucket.rate
+
+    # ---------------- public ----------------
+    def acquire(self, session, priority=False, max_wait_s=None):
+        """Ticket once the turn may call the API; raises Overloaded instead of waiting too long"""
+        max_wait_s = self.max_wait_s if max_wait_s is None else max_wait_s
+        t0 = time.monotonic()
+        ticket = Ticket(self, session, priority)
+        with self.cond:
+            ahead = len(self.priority) if priority else self.waiting
+            if self.waiting >= self.max_waiting:
+                self.counts['queue_full'] += 1
+                raise Overloaded('queue_full')
+            if self._expected_wait(ahead) > max_wait_s:
+                self.counts['too_slow'] += 1
+                raise Overloaded('too_slow')
+            self._enqueue(ticket)
+            deadline = t0 + max_wait_s
+            while True:
+                now = time.monotonic()
+                if self._head() is ticket and self.in_flight < self.max_in_flight and self.bucket.take(now):
+                    break
+                if now >= deadline:
+                    self._dequeue(ticket)
+                    self.counts['timeout'] += 1
+                    self.cond.notify_all()
+                    raise Overloaded('timeout')
+                # Woken by releases; otherwise re-check when the next token is due
+                self.cond.wait(min(deadline - now, max(self.bucket.wait_time(now), 0.005)))
+            self._dequeue(ticket)
+            self.in_flight += 1
+            ticket.granted = True
+            self.counts['admitted'] += 1
+            self.counts['priority'] += priority
+            self.waits.append(time.monotonic() - t0)
+            self.cond.notify_all()
+        return ticket
+
+    def _release(self):
+        with self.cond:
+            self.in_flight -= 1
+            self.cond.notify_all()
+
+    def stats(self):
+        with self.cond:
+            waits = np.array(self.waits) * 1000 if self.waits else np.zeros(1)
+            refused = self.counts['queue_full'] + self.counts['too_slow'] + self.counts['timeout']
+            return dict(self.counts, refused=refused, in_flight=self.in_flight, waiting=self.waiting,
+                        wait_p50_ms=float(np.percentile(waits, 50)),
+                        wait_p95_ms=float(np.percentile(waits, 95)))
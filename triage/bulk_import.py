@@ -0,0 +1,202 @@
+"""
+Bulk import of call sheets collected offline (drills, mass-casualty events).
+
+Reads a CSV with a header row or a JSONL file, one call per row: name, age,
+phone, location, the ten symptom flags (0/1, yes/no, true/false; blank means
+no) and optionally symptoms and id. JSONL rows may also nest the flags under
+"answers", as POST /requests does.
+
+Rows are streamed and validated one by one; a bad row is reported with its
+line number and skipped, the rest still import. The flags of every valid row
+are packed into one byte matrix, turned into a 10-bit pattern code per row,
+and only the distinct codes (at most 1024) are classified, with a single
+model call for the patterns no critical rule covers. The whole batch then
+goes into the queue and stats files in one load-append-save under the queue
+lock, and each file is swapped in atomically, so the dashboard sees all of
+the import or none and concurrent writers keep their calls.
+
+Run from the repository root:
+    python -m triage.bulk_import calls.csv
+    python -m triage.bulk_import calls.jsonl --dry-run --errors errors.jsonl
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+import numpy as np
+
+from triage.classifier import FEATURES, classify_batch
+from triage.geocoder import build_geocoder
+from triage.queue_store import QUEUE_FILE, STATS_FILE, record_calls, update_queue
+from triage.triage_api import REQUIRED_FIELDS, caller_fields, describe, new_request
+
+FLAG_VALUES = {
+    '1': 1, 'yes': 1, 'y': 1, 'true': 1,
+    '0': 0, 'no': 0, 'n': 0, 'false': 0, '': 0,
+}
+BIT_WEIGHTS = 1 << np.arange(len(FEATURES), dtype=np.uint16)
+SHOW_ERRORS = 10
+
+
+def detect_format(path):
+    """'jsonl' for .jsonl/.ndjson files, else 'csv'"""
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(f, fmt):
+    """Yield (line number, record dict or None, error or None) from an open text file"""
+    if fmt == 'csv':
+        reader = csv.DictReader(f)
+        missing = [c for c in list(REQUIRED_FIELDS) + FEATURES if c not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for line_no, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "row must be a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def parse_flags(record):
+    """The ten symptom flags of a record as bytes, in FEATURES order"""
+    answers = record.get('answers', record)
+    if not isinstance(answers, dict):
+        raise ValueError("answers must be an object of symptom flags")
+    if answers is not record:
+        unknown = sorted(set(answers) - set(FEATURES))
+        if unknown:
+            raise ValueError(f"unknown symptoms: {', '.join(unknown)}")
+    flags = bytearray(len(FEATURES))
+    for i, feature in enumerate(FEATURES):
+        value = answers.get(feature)
+        if value is None:
+            continue
+        if isinstance(value, str):
+            flag = FLAG_VALUES.get(value)
+            value = flag if flag is not None else FLAG_VALUES.get(value.strip().lower())
+        if value not in (0, 1):
+            raise ValueError(f"{feature} must be 0/1 or yes/no")
+        flags[i] = int(value)   # JSON may give 1.0 or true
+    return flags
+
+
+def pattern_codes(flags, count):
+    """10-bit symptom pattern per row from the packed flag bytes"""
+    matrix = np.frombuffer(bytes(flags), dtype=np.uint8).reshape(count, len(FEATURES))
+    return matrix @ BIT_WEIGHTS
+
+
+def code_key(code):
+    """Feature tuple of a pattern code"""
+    return tuple((int(code) >> i) & 1 for i in range(len(FEATURES)))
+
+
+def import_calls(f, fmt='csv', geocoder=None, queue_path=QUEUE_FILE, stats_path=STATS_FILE, dry_run=False):
+    """
+    Validate, classify and enqueue every row of an open file.
+
+    Returns a report dict: rows, valid, queued, duplicates, errors
+    ([(line, message)]) and seconds.
+    """
+    started = time.perf_counter()
+    callers = []
+    flags = bytearray()
+    errors = []
+    rows = 0
+    for line_no, record, error in read_rows(f, fmt):
+        rows += 1
+        if error is None:
+            try:
+                row_flags = parse_flags(record)
+                callers.append(caller_fields(record))
+                flags += row_flags
+            except ValueError as e:
+                error = str(e)
+        if error is not None:
+            errors.append((line_no, error))
+
+    requests = []
+    if callers:
+        codes, inverse = np.unique(pattern_codes(flags, len(callers)), return_inverse=True)
+        results = [describe(c) for c in classify_batch([code_key(code) for code in codes])]
+        places = {}     # a sheet repeats few localities: geocode each once
+        for fields, idx in zip(callers, inverse.tolist()):
+            location = fields['location']
+            if location not in places:
+                places[location] = geocoder.geocode(location) if geocoder else None
+            requests.append(new_request(fields, results[idx], places[location]))
+
+    queued = 0
+    if requests and not dry_run:
+        queued = update_queue(lambda queue, stats: record_calls(queue, stats, requests), queue_path, stats_path)
+
+    return {
+        'rows': rows,
+        'valid': len(requests),
+        'queued': queued,
+        'duplicates': 0 if dry_run else len(requests) - queued,
+        'errors': errors,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def write_errors(errors, path):
+    with open(path, 'w', encoding='utf-8') as out:
+        for line_no, message in errors:
+            out.write(json.dumps({'line': line_no, 'error': message}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import of offline call sheets into the emergency queue")
+    parser.add_argument("path", help="CSV or JSONL file ('-' for stdin)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    parser.add_argument("--queue", default=QUEUE_FILE, help="emergency queue file")
+    parser.add_argument("--stats", default=STATS_FILE, help="system stats file")
+    parser.add_argument("--no-geocode", action="store_true", help="skip resolving locations to coordinates")
+    parser.add_argument("--dry-run", action="store_true", help="validate and classify only")
+    parser.add_argument("--errors", help="write every rejected row to this JSONL file")
+    args = parser.parse_args()
+
+    fmt = args.format or ('csv' if args.path == '-' else detect_format(args.path))
+    geocoder = None if args.no_geocode else build_geocoder()
+    if args.path == '-':
+        f = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+    else:
+        f = open(args.path, 'r', encoding='utf-8-sig', newline='')
+    try:
+        with f:
+            report = import_calls(f, fmt, geocoder, args.queue, args.stats, args.dry_run)
+    except ValueError as e:
+        print(f"⚠️ {e}")
+        sys.exit(1)
+
+    verb = "Validated" if args.dry_run else "Imported"
+    print(f"📥 {verb} {report['valid']:,} of {report['rows']:,} rows in {report['seconds']:.2f} s "
+          f"({report['queued']:,} queued, {report['duplicates']:,} duplicate ids skipped, "
+          f"{len(report['errors']):,} rejected)")
+    for line_no, message in report['errors'][:SHOW_ERRORS]:
+        print(f"⚠️ line {line_no}: {message}")
+    if len(report['errors']) > SHOW_ERRORS:
+        print(f"   ... and {len(report['errors']) - SHOW_ERRORS:,} more")
+    if args.errors:
+        write_errors(report['errors'], args.errors)
+    if report['errors'] and not report['valid']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Local stand-in for the hospitals' bed-capacity feed.
+
+Serves free emergency beds per hospital from hospitals.json. Occupancy drifts
+as a random walk (admissions and discharges) so dashboards see it change;
+POST /capacity overrides values, e.g. to mark a hospital as full.
+
+    GET  /capacity   {hospital_id: {available, total, updated}}
+    POST /capacity   {hospital_id: available, ...}
+
+Run from the repository root:
+    python -m triage.capacity_service --port 8766
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from triage.fleet import load_hospitals
+
+MAX_BODY_BYTES = 64 * 1024
+
+
+class CapacityFeed:
+    """Simulated bed occupancy, one random-walk step per tick"""
+
+    def __init__(self, hospitals, seed=0):
+        self.rng = random.Random(seed)
+        self.total = {h['id']: h.get('er_beds', 0) for h in hospitals}
+        self.available = {hid: total // 2 for hid, total in self.total.items()}
+        self.updated = {hid: time.time() for hid in self.total}
+        self.lock = threading.Lock()
+
+    def tick(self):
+        with self.lock:
+            for hid, total in self.total.items():
+                step = self.rng.choice((-1, 0, 0, 1))
+                self.available[hid] = min(total, max(0, self.available[hid] + step))
+                self.updated[hid] = time.time()
+
+    def set(self, values):
+        with self.lock:
+            for hid, available in values.items():
+                if hid in self.total:
+                    self.available[hid] = min(self.total[hid], max(0, int(available)))
+                    self.updated[hid] = time.time()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                hid: {'available': self.available[hid], 'total': total, 'updated': self.updated[hid]}
+                for hid, total in self.total.items()
+            }
+
+
+def make_handler(feed):
+    """Request handler bound to a CapacityFeed"""
+
+    class CapacityHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, code, body):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path != "/capacity":
+                return self._reply(404, {'error': 'not found'})
+            self._reply(200, feed.snapshot())
+
+        def do_POST(self):
+            if self.path != "/capacity":
+                return self._reply(404, {'error': 'not found'})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    raise ValueError(f"Content-Length must be 0-{MAX_BODY_BYTES}")
+                feed.set(json.loads(self.rfile.read(length)))
+            except Exception as e:
+                self.close_connection = True    # the body may be left unread
+                return self._reply(400, {'error': str(e)})
+            self._reply(200, feed.snapshot())
+
+        def log_message(self, format, *args):
+            pass
+
+    return CapacityHandler
+
+
+def serve(feed, host="127.0.0.1", port=8766, tick_s=5.0):
+    """Run the capacity endpoint until interrupted"""
+    server = ThreadingHTTPServer((host, port), make_handler(feed))
+    stop = threading.Event()
+
+    def drift():
+        while not stop.wait(tick_s):
+            feed.tick()
+
+    threading.Thread(target=drift, daemon=True).start()
+    print(f"🏥 Capacity service listening on http://{host}:{port}/capacity")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in hospital capacity service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--tick", type=float, default=5.0, help="seconds between occupancy changes")
+    args = parser.parse_args()
+    serve(CapacityFeed(load_hospitals()), args.host, args.port, args.tick)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Response cache for single-turn chatbot questions.
+
+First-aid questions repeat constantly ("what to do for chest pain", "first
+aid for bleeding"). Answers are cached on the normalized question with a TTL
+and LRU eviction. A small TF-IDF index over the cached questions also
+catches rephrasings ("chest pain what should I do"): candidates sharing a
+term are scored by cosine similarity and reused above a threshold.
+
+Answers are medical and shared by every user, so a near-duplicate must ask
+about exactly the same things: both questions need the same set of content
+terms, negations included. "my child is breathing" never gets the answer
+for "my child is not breathing", nor "chest pain in a child" the one for
+"chest pain"; only word order, filler words and plurals may differ.
+
+The cache is written to a JSON file so a restart keeps the warm set.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+CHAT_CACHE_FILE = "chat_cache.json"
+CACHE_SIZE = 512
+CACHE_TTL_S = 7 * 24 * 3600
+SIMILARITY_THRESHOLD = 0.8
+
+# Filler words that do not change what is being asked. Negations ("no", "not",
+# "never", "don t") must stay content terms: the similar-match guard relies on it
+STOPWORDS = {
+    'a', 'an', 'the', 'what', 'to', 'do', 'for', 'i', 'should', 'how', 'can', 'is', 'are',
+    'my', 'me', 'of', 'in', 'on', 'with', 'if', 'someone', 'somebody', 'person', 'please',
+    'tell', 'about', 'when', 'does', 'it', 'you', 'we', 'give', 'help', 'need', 'has', 'have',
+    'first', 'aid', 'treat', 'treatment',
+}
+
+
+def normalize(text):
+    """Lowercase, drop punctuation, collapse whitespace"""
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def terms(key):
+    """Content terms of a normalized question, with plural 's' folded"""
+    out = []
+    for word in key.split():
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        out.append(word)
+    return out
+
+
+class ResponseCache:
+    """TTL + LRU cache of answers with TF-IDF near-duplicate lookup"""
+
+    def __init__(self, capacity=CACHE_SIZE, ttl_s=CACHE_TTL_S, threshold=SIMILARITY_THRESHOLD,
+                 path=CHAT_CACHE_FILE):
+        self.capacity = capacity
+        self.ttl_s = ttl_s
+        self.threshold = threshold
+        self.path = path
+        self.lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> {'answer', 'created', 'terms'}
+        self._postings = {}             # term -> set of keys
+        self.counts = {'exact': 0, 'similar': 0, 'misses': 0}
+        if path:
+            self._load()
+
+    # ---------------- index ----------------
+    def _index(self, key, entry):
+        self._entries[key] = entry
+        for term in set(entry['terms']):
+            self._postings.setdefault(term, set()).add(key)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        for term in set(entry['terms']):
+            keys = self._postings.get(term)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[term]
+
+    def _idf(self, term):
+        return math.log((1 + len(self._entries)) / (1 + len(self._postings.get(term, ())))) + 1.0
+
+    def _vector(self, term_list):
+        counts = {}
+        for term in term_list:
+            counts[term] = counts.get(term, 0) + 1
+        vec = {t: c * self._idf(t) for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        return {t: w / norm for t, w in vec.items()}
+
+    def _expired(self, entry, now):
+        return now - entry['created'] > self.ttl_s
+
+    def _most_similar(self, term_list, now):
+        candidates = set()
+        for term in set(term_list):
+            candidates |= self._postings.get(term, set())
+        if not candidates:
+            return None, 0.0
+        query = self._vector(term_list)
+        wanted = set(term_list)
+        best, best_score = None, 0.0
+        for key in candidates:
+            entry = self._entries[key]
+            if self._expired(entry, now):
+                continue
+            # A term only one side has (a negation, "child", "aspirin") changes the question
+            if set(entry['terms']) != wanted:
+                continue
+            doc = self._vector(entry['terms'])
+            score = sum(w * doc.get(t, 0.0) for t, w in query.items())
+            if score > best_score:
+                best, best_score = key, score
+        return best, best_score
+
+    # ---------------- public ----------------
+    def get(self, question):
+        """{'answer', 'match', 'score'} for a cached or near-duplicate question, else None"""
+        key = normalize(question)
+        now = time.time()
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry, now):
+                self._drop(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counts['exact'] += 1
+                return {'answer': entry['answer'], 'match': 'exact', 'score': 1.0}
+
+            term_list = terms(key)
+            similar, score = self._most_similar(term_list, now) if term_list else (None, 0.0)
+            if similar is not None and score >= self.threshold:
+                self._entries.move_to_end(similar)
+                self.counts['similar'] += 1
+                return {'answer': self._entries[similar]['answer'], 'match': 'similar', 'score': score}
+            self.counts['misses'] += 1
+            return None
+
+    def put(self, question, answer):
+        """Cache an answer and persist the cache"""
+        key = normalize(question)
+        if not key:
+            return
+        with self.lock:
+            if key in self._entries:
+                self._drop(key)
+            self._index(key, {'answer': answer, 'created': time.time(), 'terms': terms(key)})
+            while len(self._entries) > self.capacity:
+                self._drop(next(iter(self._entries)))
+            if self.path:
+                self._save()
+
+    def stats(self):
+        with self.lock:
+            lookups = sum(self.counts.values())
+            hits = self.counts['exact'] + self.counts['similar']
+            return dict(self.counts, entries=len(self._entries),
+                        hit_rate=hits / lookups if lookups else 0.0)
+
+    # ---------------- disk tier ----------------
+    def _load(self):
+        try:
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, 'r') as f:
+                rows = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read chat cache: {e}")
+            return
+        now = time.time()
+        for row in rows[-self.capacity:]:
+            entry = {'answer': row['answer'], 'created': row['created'], 'terms': terms(row['key'])}
+            if not self._expired(entry, now):
+                self._index(row['key'], entry)
+
+    def _save(self):
+        rows = [{'key': k, 'answer': e['answer'], 'created': e['created']} for k, e in self._entries.items()]
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(rows, f)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"⚠️ Could not write chat cache: {e}")
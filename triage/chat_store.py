@@ -0,0 +1,117 @@
+"""
+Persistent chat history for the chatbot.
+
+Past conversations used to live in st.session_state: lost on reload and
+growing without bound in server memory. They now go to a small sqlite file.
+Only session metadata (title, time, message count) is read for the sidebar;
+a transcript is loaded when its chat is opened. Turns are appended as they
+happen, so the open chat survives a reload too. Each owner keeps at most
+MAX_SESSIONS chats; the least recently used ones are evicted.
+"""
+
+import sqlite3
+import threading
+import time
+
+CHAT_DB_FILE = "chat_history.db"
+MAX_SESSIONS = 50
+TITLE_CHARS = 35
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    title TEXT NOT NULL,
+    created REAL NOT NULL,
+    used REAL NOT NULL,
+    n_messages INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_owner_used ON sessions (owner, used);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    source TEXT,
+    PRIMARY KEY (session_id, seq)
+);
+"""
+
+
+class ChatStore:
+    """sqlite-backed chat sessions, shared by all Streamlit sessions of a process"""
+
+    def __init__(self, path=CHAT_DB_FILE, max_sessions=MAX_SESSIONS):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def save(self, owner, session_id, messages):
+        """Append the messages not stored yet and mark the chat as just used"""
+        if not messages:
+            return
+        now = time.time()
+        with self.lock, self.db:
+            row = self.db.execute("SELECT n_messages FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            stored = row[0] if row else 0
+            if row is None:
+                title = messages[0]["content"][:TITLE_CHARS]
+                self.db.execute("INSERT INTO sessions VALUES (?, ?, ?, ?, ?, 0)",
+                                (session_id, owner, title, now, now))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?)",
+                [(session_id, seq, m["role"], m["content"], m.get("source"))
+                 for seq, m in enumerate(messages[stored:], start=stored)]
+            )
+            self.db.execute("UPDATE sessions SET n_messages = ?, used = ? WHERE id = ?",
+                            (len(messages), now, session_id))
+            if row is None:
+                self._evict(owner)
+
+    def _evict(self, owner):
+        stale = self.db.execute(
+            "SELECT id FROM sessions WHERE owner = ? ORDER BY used DESC LIMIT -1 OFFSET ?",
+            (owner, self.max_sessions)
+        ).fetchall()
+        for (session_id,) in stale:
+            self.db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self.db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def list_sessions(self, owner, limit=MAX_SESSIONS):
+        """Metadata of the owner's chats, most recently used first"""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id, title, used, n_messages FROM sessions WHERE owner = ? ORDER BY used DESC LIMIT ?",
+                (owner, limit)
+            ).fetchall()
+        return [{'id': r[0], 'title': r[1], 'used': r[2], 'n_messages': r[3]} for r in rows]
+
+    def load(self, session_id):
+        """Full transcript of one chat (and mark it as used)"""
+        with self.lock, self.db:
+            self.db.execute("UPDATE sessions SET used = ? WHERE id = ?", (time.time(), session_id))
+            rows = self.db.execute(
+                "SELECT role, content, source FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+        messages = []
+        for role, content, source in rows:
+            message = {"role": role, "content": content}
+            if source:
+                message["source"] = source
+            messages.append(message)
+        return messages
+
+    def clear(self, owner):
+        """Delete all of the owner's chats"""
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM messages WHERE session_id IN (SELECT id FROM sessions WHERE owner = ?)",
+                            (owner,))
+            self.db.execute("DELETE FROM sessions WHERE owner = ?", (owner,))
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,269 @@
+"""
+Hybrid ML + rule-based emergency classification.
+
+Shared by the patient portal and the offline tools (simulator, bulk import).
+The result depends only on the ten binary symptom features, so there are at
+most 2^10 distinct inputs: classifications are memoized on the answer tuple
+and repeated symptom patterns skip the model entirely.
+"""
+
+import os
+from functools import lru_cache
+
+import joblib
+import pandas as pd
+
+from triage.symptoms import FEATURES
+
+MODEL_PATHS = [
+    'emergency_triage_model.pkl',
+    './emergency_triage_model.pkl',
+    '../emergency_triage_model.pkl',
+    'models/emergency_triage_model.pkl',
+]
+
+# Map ML diagnosis to priority and severity score (String-based map)
+SEVERITY_MAP = {
+    'Cardiac Arrest': ('HIGH', 150),
+    'Heart Attack': ('HIGH', 135),
+    'Severe Respiratory Distress': ('HIGH', 130),
+    'Major Trauma/Bleeding': ('HIGH', 125),
+    'Stroke': ('HIGH', 120),
+    'Shock/Collapse': ('MEDIUM', 90),
+    'Seizure/Post-Seizure': ('MEDIUM', 85),
+    'Fainting/Syncope': ('LOW', 50),
+    'Minor Trauma': ('LOW', 45),
+    'Anxiety/Panic': ('LOW', 40)
+}
+
+# Fallback weighted severity score per symptom
+FALLBACK_WEIGHTS = {
+    'chest_pain': 35,           # Cardiac indicator
+    'shortness_of_breath': 30,  # Respiratory/cardiac
+    'unconsciousness': 50,      # Critical brain/cardiac
+    'bleeding': 30,             # Hemorrhage risk
+    'confusion': 25,            # Neurological/stroke
+    'weakness': 25,             # Stroke/cardiac
+    'seizure': 28,              # Neurological emergency
+    'trauma': 30,               # Injury severity
+    'dizziness': 15,            # General instability
+    'cyanosis': 40,             # Oxygen deprivation
+}
+
+MODEL_LOADED = False
+model = None
+
+
+def load_model(paths=MODEL_PATHS):
+    """Try to load the ML model from multiple possible locations with compatibility fixes"""
+    global model, MODEL_LOADED
+
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+
+        try:
+            # Use joblib.load() since the model was saved with joblib.dump()
+            model = joblib.load(path)
+            MODEL_LOADED = True
+            print(f"✅ Model loaded successfully from: {path} (using joblib)")
+
+            # Quick validation test - the model expects a DataFrame with feature names
+            try:
+                model.predict(pd.DataFrame([[0] * len(FEATURES)], columns=FEATURES))
+                print("✅ Model validation passed")
+                _classify_key.cache_clear()
+                return True
+            except Exception as e:
+                print(f"⚠️ Model loaded but validation failed: {e}")
+                print("   (This is likely due to the model expecting a DataFrame with feature names)")
+                MODEL_LOADED = False
+                model = None
+                continue
+
+        except Exception as e:
+            print(f"Failed to load from {path} using joblib: {e}")
+            continue
+
+    print("⚠️ ML Model not found or incompatible. Using rule-based fallback system.")
+    _classify_key.cache_clear()
+    return False
+
+
+def answers_key(answers):
+    """Feature tuple (model column order) for an answers dict"""
+    return tuple(1 if answers.get(f, 0) == 1 else 0 for f in FEATURES)
+
+
+def parse_answers(answers):
+    """Validated answers from an outside caller; ValueError on unknown symptoms or non-binary flags"""
+    if not isinstance(answers, dict):
+        raise ValueError("answers must be an object of symptom flags")
+    unknown = sorted(set(answers) - set(FEATURES))
+    if unknown:
+        raise ValueError(f"unknown symptoms: {', '.join(unknown)}")
+    for feature, value in answers.items():
+        if value not in (0, 1):
+            raise ValueError(f"{feature} must be 0 or 1")
+    return {f: int(answers.get(f, 0)) for f in FEATURES}
+
+
+def hybrid_classify_and_prioritize(answers):
+    """
+    Hybrid ML + Rule-based emergency classification
+
+    PRIORITY ORDER:
+    1. Critical life-threatening rules (INSTANT response - no ML delay)
+    2. ML Model prediction (for complex pattern recognition)
+    3. Fallback scoring system (if ML unavailable)
+
+    Returns: (diagnosis, priority, severity_score, method_used)
+    """
+    return _classify_key(answers_key(answers))
+
+
+def cache_info():
+    """Hit/miss counters of the classification memo"""
+    return _classify_key.cache_info()
+
+
+@lru_cache(maxsize=2 ** len(FEATURES))
+def _classify_key(key):
+    answers = dict(zip(FEATURES, key))
+
+    result = _critical_rule(answers)
+    if result is not None:
+        return result
+
+    # ========== PHASE 2: USE ML MODEL FOR COMPLEX PATTERN RECOGNITION ==========
+    # ML is better at detecting subtle combinations and non-obvious patterns
+
+    if MODEL_LOADED and model is not None:
+        try:
+            # Features in the EXACT order the model was trained on, with column names
+            feature_df = pd.DataFrame([list(key)], columns=FEATURES)
+
+            # Get ML prediction (will be a string like "Heart Attack")
+            return _model_result(model.predict(feature_df)[0])
+
+        except Exception as e:
+            # If ML fails, fall through to rule-based scoring
+            print(f"⚠️ ML prediction failed: {e}. Using fallback scoring.")
+
+    return _fallback(answers)
+
+
+def classify_batch(keys):
+    """
+    Results for many feature tuples, in input order.
+
+    Each distinct symptom pattern is classified once, and the patterns that
+    no critical rule covers go through the model in a single predict call
+    instead of one DataFrame per row. Same results as classifying each row
+    with hybrid_classify_and_prioritize.
+    """
+    distinct = list(dict.fromkeys(keys))
+    results = {}
+    to_model = []
+    for key in distinct:
+        answers = dict(zip(FEATURES, key))
+        result = _critical_rule(answers)
+        if result is not None:
+            results[key] = result
+        else:
+            to_model.append(key)
+
+    if to_model and MODEL_LOADED and model is not None:
+        try:
+            diagnoses = model.predict(pd.DataFrame([list(k) for k in to_model], columns=FEATURES))
+            for key, diagnosis in zip(to_model, diagnoses):
+                results[key] = _model_result(diagnosis)
+            to_model = []
+        except Exception as e:
+            print(f"⚠️ ML prediction failed: {e}. Using fallback scoring.")
+
+    for key in to_model:
+        results[key] = _fallback(dict(zip(FEATURES, key)))
+    return [results[key] for key in keys]
+
+
+def _critical_rule(answers):
+    # ========== PHASE 1: CRITICAL RULE-BASED CONDITIONS (INSTANT RESPONSE) ==========
+    # These bypass ML for speed - life-threatening conditions need immediate classification
+
+    # RULE 1: Unconscious + Cyanosis = Cardiac Arrest (HIGHEST PRIORITY)
+    if answers['unconsciousness'] == 1 and answers['cyanosis'] == 1:
+        return 'Cardiac Arrest', 'HIGH', 150, 'Critical Rule'
+
+    # RULE 2: Unconscious alone = Critical (brain injury, stroke, cardiac event)
+    if answers['unconsciousness'] == 1:
+        return 'Critical - Unconscious Patient', 'HIGH', 145, 'Critical Rule'
+
+    # RULE 3: Severe Respiratory Distress + Cyanosis (suffocation, cardiac/respiratory failure)
+    if answers['shortness_of_breath'] == 1 and answers['cyanosis'] == 1:
+        return 'Severe Respiratory Distress', 'HIGH', 140, 'Critical Rule'
+
+    # RULE 4: Triple cardiac symptoms (Chest pain + Breathing difficulty + Cyanosis)
+    if (answers['chest_pain'] == 1 and
+        answers['shortness_of_breath'] == 1 and
+        answers['cyanosis'] == 1):
+        return 'Heart Attack (STEMI Suspected)', 'HIGH', 135, 'Critical Rule'
+
+    # RULE 5: Major Trauma with Bleeding (hypovolemic shock risk)
+    if answers['trauma'] == 1 and answers['bleeding'] == 1:
+        return 'Major Trauma/Hemorrhage', 'HIGH', 130, 'Critical Rule'
+
+    # RULE 6: Chest Pain + Shortness of Breath (cardiac event without cyanosis yet)
+    if answers['chest_pain'] == 1 and answers['shortness_of_breath'] == 1:
+        return 'Heart Attack (Suspected)', 'HIGH', 128, 'Critical Rule'
+
+    # RULE 7: Stroke symptoms (Confusion + One-sided Weakness)
+    if answers['confusion'] == 1 and answers['weakness'] == 1:
+        return 'Stroke (Suspected)', 'HIGH', 125, 'Critical Rule'
+
+    return None
+
+
+def _model_result(diagnosis):
+    priority, severity_score = SEVERITY_MAP.get(diagnosis, ('MEDIUM', 70))
+    return diagnosis, priority, severity_score, 'ML Model'
+
+
+def _fallback(answers):
+    # ========== PHASE 3: FALLBACK RULE-BASED SCORING SYSTEM ==========
+    # Used when ML model is unavailable or fails
+
+    # Calculate weighted severity score
+    score = sum(answers[f] * w for f, w in FALLBACK_WEIGHTS.items())
+
+    # Determine diagnosis from symptom patterns
+    if answers['chest_pain'] == 1 and answers['shortness_of_breath'] == 1:
+        diagnosis = 'Heart Attack (Suspected)'
+    elif answers['confusion'] == 1 and answers['weakness'] == 1:
+        diagnosis = 'Stroke (Suspected)'
+    elif answers['bleeding'] == 1 and answers['trauma'] == 1:
+        diagnosis = 'Major Trauma/Bleeding'
+    elif answers['seizure'] == 1:
+        diagnosis = 'Seizure/Post-Seizure'
+    elif answers['shortness_of_breath'] == 1:
+        diagnosis = 'Respiratory Distress'
+    elif answers['dizziness'] == 1 and answers['weakness'] == 1:
+        diagnosis = 'Syncope/Collapse'
+    elif score > 0:
+        diagnosis = 'General Medical Emergency'
+    else:
+        diagnosis = 'Non-Emergency Medical Assistance'
+
+    # Determine priority based on score
+    if score >= 120:
+        priority = 'HIGH'
+    elif score >= 60:
+        priority = 'MEDIUM'
+    else:
+        priority = 'LOW'
+
+    return diagnosis, priority, score, 'Rule-Based Fallback'
+
+
+# Try to load model on import
+load_model()
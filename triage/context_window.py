@@ -0,0 +1,119 @@
+"""
+Token-budgeted conversation window for chatbot payloads.
+
+Instead of resending every message on every turn, the payload keeps the
+system prompt, a rolling summary of older turns and as many recent turns as
+fit a token budget. Tokens are estimated locally (about four characters per
+token, the usual rule of thumb for English with Gemini/GPT tokenizers), which
+is accurate enough for budgeting and costs nothing.
+
+The summary is extractive (each folded turn becomes a one-line note) and is
+extended incrementally: turns are folded once and the notes are cached, so
+long chats do not re-summarize their whole history each turn.
+"""
+
+import re
+
+CONTEXT_BUDGET_TOKENS = 2000
+KEEP_TURNS = 8
+SUMMARY_BUDGET_TOKENS = 300
+NOTE_CHARS = 160
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text):
+    """Approximate token count (~4 characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message):
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _clip(text, limit=NOTE_CHARS):
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def summarize_message(message):
+    """One-line note for a folded message"""
+    if message["role"] == "user":
+        return "User: " + _clip(message["content"])
+    first = _SENTENCE_END.split(message["content"].strip(), maxsplit=1)[0]
+    return "Assistant: " + _clip(first)
+
+
+class ContextWindow:
+    """
+    Builds the (system text, recent messages) pair sent for each turn.
+
+    One instance per session; it remembers which messages are already folded
+    into the summary and starts over when build() is given another chat id
+    (or a shorter history).
+    """
+
+    def __init__(self, budget_tokens=CONTEXT_BUDGET_TOKENS, keep_turns=KEEP_TURNS,
+                 summary_tokens=SUMMARY_BUDGET_TOKENS):
+        self.budget_tokens = budget_tokens
+        self.keep_turns = keep_turns
+        self.summary_tokens = summary_tokens
+        self._chat_id = None
+        self._folded = 0      # messages [0, _folded) are in the summary
+        self._notes = []
+
+    def _reset_if_new(self, history, chat_id):
+        if chat_id != self._chat_id or self._folded > len(history):
+            self._chat_id = chat_id
+            self._folded = 0
+            self._notes = []
+
+    def _fold(self, history, upto):
+        for message in history[self._folded:upto]:
+            self._notes.append(summarize_message(message))
+        self._folded = max(self._folded, upto)
+        # Rolling: oldest notes fall off once the summary is over budget
+        total = sum(estimate_tokens(n) for n in self._notes)
+        while self._notes and total > self.summary_tokens:
+            total -= estimate_tokens(self._notes.pop(0))
+
+    def summary(self):
+        if not self._notes:
+            return ""
+        return "Earlier in this conversation:\n" + "\n".join(f"- {n}" for n in self._notes)
+
+    def build(self, history, system_instruction, chat_id=None):
+        """(system text incl. summary, recent messages) within the token budget"""
+        self._reset_if_new(history, chat_id)
+        fixed = estimate_tokens(system_instruction) + self.summary_tokens + MESSAGE_OVERHEAD_TOKENS
+
+        # Walk back from the newest message while within the turn and token limits;
+        # the latest user message is always kept.
+        start = len(history)
+        used = fixed
+        while start > 0:
+            cost = message_tokens(history[start - 1])
+            if start < len(history) and (used + cost > self.budget_tokens
+                                         or len(history) - start >= 2 * self.keep_turns):
+                break
+            used += cost
+            start -= 1
+        # Start the window on a user turn
+        while start < len(history) - 1 and history[start]["role"] != "user":
+            start += 1
+        start = max(start, self._folded)
+
+        if start > self._folded:
+            self._fold(history, start)
+        summary = self.summary()
+        system = system_instruction + ("\n\n" + summary if summary else "")
+        return system, history[start:]
+
+    def stats(self, history, system_instruction, chat_id=None):
+        """Estimated tokens of the full history vs the windowed payload"""
+        system, recent = self.build(history, system_instruction, chat_id)
+        full = estimate_tokens(system_instruction) + sum(message_tokens(m) for m in history)
+        windowed = estimate_tokens(system) + sum(message_tokens(m) for m in recent)
+        return {'messages': len(history), 'sent': len(recent), 'folded': self._folded,
+                'full_tokens': full, 'window_tokens': windowed}
@@ -0,0 +1,113 @@
+"""
+Offline first-aid knowledge base.
+
+The chatbot depends on the Gemini API, which is slowest or unreachable
+exactly when emergencies spike. first_aid_kb.json holds short protocol
+documents; each section becomes a chunk, indexed in memory with an inverted
+index (term -> postings of chunk id and term frequency) and ranked with
+BM25. A query touches only the postings of its own terms, so answers come
+back in well under a millisecond and can be shown while the API is slow or
+instead of it when it fails.
+"""
+
+import json
+import math
+
+from triage.chat_cache import normalize, terms
+
+FIRST_AID_FILE = "first_aid_kb.json"
+BM25_K1 = 1.5
+BM25_B = 0.75
+TITLE_WEIGHT = 2        # title and keyword terms count this many times per chunk
+MIN_SCORE = 2.0
+MAX_SECTIONS = 2
+# Pronouns and glue words that chat_cache keeps but that only add noise to retrieval
+EXTRA_STOPWORDS = {
+    'he', 'she', 'his', 'her', 'him', 'they', 'them', 'their', 'was', 'were', 'and', 'or', 'but',
+    'at', 'be', 'been', 'this', 'that', 'there', 'from', 'as', 'so', 'then', 'just', 'now', 'very',
+}
+
+
+def stem(word):
+    """Crude suffix folding so 'bleeding'/'bleed', 'choking'/'choke' and 'stabbed'/'stab' meet"""
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def tokens(text):
+    return [stem(t) for t in terms(normalize(text)) if t not in EXTRA_STOPWORDS]
+
+
+def load_documents(path=FIRST_AID_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not load first-aid guide: {e}")
+        return []
+
+
+class KnowledgeBase:
+    """BM25 over protocol sections with an inverted index"""
+
+    def __init__(self, documents=None, path=FIRST_AID_FILE):
+        self.documents = load_documents(path) if documents is None else documents
+        self.chunks = []        # {'doc', 'section', 'title', 'text'}
+        self.lengths = []
+        self.postings = {}      # term -> [(chunk id, tf)]
+        for d, doc in enumerate(self.documents):
+            header = tokens(doc['title'] + " " + doc.get('keywords', "")) * TITLE_WEIGHT
+            for s, text in enumerate(doc['sections']):
+                self._add({'doc': d, 'section': s, 'title': doc['title'], 'text': text},
+                          header + tokens(text))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        n = len(self.chunks)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()}
+
+    def _add(self, chunk, chunk_tokens):
+        cid = len(self.chunks)
+        self.chunks.append(chunk)
+        self.lengths.append(len(chunk_tokens))
+        counts = {}
+        for t in chunk_tokens:
+            counts[t] = counts.get(t, 0) + 1
+        for t, tf in counts.items():
+            self.postings.setdefault(t, []).append((cid, tf))
+
+    def search(self, query, k=3):
+        """Top-k chunks as dicts with a 'score', best first"""
+        scores = {}
+        for t in set(tokens(query)):
+            idf = self.idf.get(t)
+            if idf is None:
+                continue
+            for cid, tf in self.postings[t]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[cid] / self.avg_length)
+                scores[cid] = scores.get(cid, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda kv: -kv[1])[:k]
+        return [dict(self.chunks[cid], score=score) for cid, score in best]
+
+    def answer(self, query):
+        """
+        Offline reply for a question, or None if nothing matches well.
+
+        Uses the best matching protocol: its MAX_SECTIONS highest-scoring
+        sections, shown in document order and headed by the protocol title.
+        """
+        hits = self.search(query, k=6)
+        if not hits or hits[0]['score'] < MIN_SCORE:
+            return None
+        top = hits[0]
+        best = [h['section'] for h in hits if h['doc'] == top['doc']][:MAX_SECTIONS]
+        sections = sorted(best)
+        doc = self.documents[top['doc']]
+        body = "\n\n".join(doc['sections'][s] for s in sections)
+        return {'title': doc['title'], 'id': doc['id'], 'score': top['score'],
+                'text': f"{doc['title']}\n\n{body}\n\nIn an emergency call 108."}
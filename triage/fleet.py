@@ -0,0 +1,122 @@
+"""
+Ambulance and hospital rosters with coordinates, plus spatial index builders.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+from triage.spatial_index import GridIndex, StaticKDTree
+
+AMBULANCES_FILE = "ambulances.json"
+HOSPITALS_FILE = "hospitals.json"
+
+VEHICLE_STATES = ('available', 'en_route', 'maintenance')
+
+
+def load_ambulances(path=AMBULANCES_FILE):
+    """Load ambulance roster from file"""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+        return []
+    except:
+        return []
+
+
+def save_ambulances(ambulances, path=AMBULANCES_FILE):
+    """Save ambulance roster to file"""
+    # Write a sibling file and swap it in, so readers never see a half-written roster
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(ambulances, f, indent=2)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _roster_lock(path):
+    """Exclusive advisory lock shared by every process that rewrites the roster"""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def update_ambulances(change, path=AMBULANCES_FILE):
+    """
+    Read-modify-write of the roster under the roster lock.
+
+    `change(ambulances)` edits the freshly loaded list in place and returns a
+    truthy value if it should be saved; that value is returned. The GPS
+    worker and the technician page both write the roster, and without the
+    lock whichever saved last reverted the other's edit.
+    """
+    with _roster_lock(path):
+        ambulances = load_ambulances(path)
+        result = change(ambulances)
+        if result:
+            save_ambulances(ambulances, path)
+        return result
+
+
+def load_hospitals(path=HOSPITALS_FILE):
+    """Load hospital registry from file"""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+        return []
+    except:
+        return []
+
+
+def build_fleet_index(ambulances, cell_deg=0.01):
+    """Build a GridIndex over ambulances keyed by id with their state"""
+    index = GridIndex(cell_deg=cell_deg)
+    for amb in ambulances:
+        index.upsert(amb['id'], amb['lat'], amb['lon'], amb.get('state', 'available'))
+    return index
+
+
+def build_hospital_index(hospitals):
+    """Build a StaticKDTree over hospitals keyed by id"""
+    return StaticKDTree((h['id'], h['lat'], h['lon']) for h in hospitals)
+
+
+def set_ambulance_state(ambulances, unit_id, state):
+    """Set one unit's state in a roster list; returns True if the unit exists"""
+    for amb in ambulances:
+        if amb['id'] == unit_id:
+            amb['state'] = state
+            return True
+    return False
+
+
+def fleet_counts(ambulances):
+    """Fleet status counts (total and units per state) derived from the roster"""
+    counts = dict.fromkeys(VEHICLE_STATES, 0)
+    for amb in ambulances:
+        state = amb.get('state', 'available')
+        counts[state] = counts.get(state, 0) + 1
+    counts['total'] = len(ambulances)
+    return counts
+
+
+def first_in_state(ambulances, state):
+    """Id of the first unit in a given state, or None"""
+    for amb in ambulances:
+        if amb.get('state') == state:
+            return amb['id']
+    return None
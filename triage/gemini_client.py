@@ -0,0 +1,288 @@
+"""
+Process-wide Gemini REST client.
+
+One pooled requests.Session keeps TCP/TLS connections alive across chat
+turns instead of reconnecting for every message. Each user turn gets a total
+deadline; inside it, 429 and 5xx replies and connection errors are retried
+with capped, fully jittered exponential backoff (honouring Retry-After).
+Latency, retry and error counters are kept for the dashboards and benchmarks.
+
+stream() uses streamGenerateContent with server-sent events and yields text
+as it arrives, so the chat can show the first words long before the reply
+is complete. Retries only happen before the first byte of a reply.
+"""
+
+import json
+import math
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_MODEL = "models/gemini-2.0-flash"
+
+TURN_DEADLINE_S = 15.0
+CONNECT_TIMEOUT_S = 3.0
+MAX_RETRIES = 3
+BACKOFF_BASE_S = 0.25
+BACKOFF_CAP_S = 4.0
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+POOL_SIZE = 16
+LATENCY_WINDOW = 2048
+
+
+class GeminiError(Exception):
+    """The turn could not be answered within its deadline"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def build_contents(history, system_instruction=None):
+    """Gemini `contents` from chat messages; assistant turns use the `model` role"""
+    contents = []
+    if system_instruction:
+        contents.append({"role": "user", "parts": [{"text": system_instruction}]})
+    for m in history:
+        role = "model" if m["role"] in ("assistant", "model") else "user"
+        contents.append({"role": role, "parts": [{"text": m["content"]}]})
+    return contents
+
+
+def reply_text(data):
+    """Text of the first candidate in a generateContent response"""
+    return "".join(p.get("text", "") for p in data["candidates"][0]["content"]["parts"])
+
+
+def chunk_text(data):
+    """Text in one streamed chunk ('' for chunks carrying only metadata)"""
+    try:
+        return reply_text(data)
+    except (KeyError, IndexError):
+        return ""
+
+
+def race_stream(chunks, patience_s):
+    """
+    Consume a reply stream in a worker thread so the caller can act on silence.
+
+    Yields ('chunk', text) as text arrives, ('slow', None) once if nothing has
+    arrived after patience_s, then ('done', None) or ('error', GeminiError).
+    """
+    events = queue.Queue()
+
+    def pump():
+        try:
+            for text in chunks:
+                events.put(('chunk', text))
+            events.put(('done', None))
+        except GeminiError as e:
+            events.put(('error', e))
+        except Exception as e:
+            # Anything else (malformed chunk, admission wrapper) must still end the
+            # race, or the consumer waits on the queue forever
+            events.put(('error', GeminiError(f"reply stream failed: {e!r}")))
+
+    threading.Thread(target=pump, daemon=True).start()
+    waiting = True
+    while True:
+        try:
+            kind, value = events.get(timeout=patience_s if waiting else None)
+        except queue.Empty:
+            waiting = False
+            yield 'slow', None
+            continue
+        waiting = False
+        yield kind, value
+        if kind != 'chunk':
+            return
+
+
+class ClientMetrics:
+    """Thread-safe counters plus a rolling window of turn latencies"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=window)
+        self.first_token = deque(maxlen=window)
+        self.counts = {'turns': 0, 'ok': 0, 'failed': 0, 'attempts': 0, 'retries': 0}
+        self.errors = {}
+
+    def attempt(self, retry):
+        with self.lock:
+            self.counts['attempts'] += 1
+            if retry:
+                self.counts['retries'] += 1
+
+    def error(self, kind):
+        with self.lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def turn(self, seconds, ok, first_token_s=None):
+        with self.lock:
+            self.counts['turns'] += 1
+            self.counts['ok' if ok else 'failed'] += 1
+            self.latencies.append(seconds)
+            if first_token_s is not None:
+                self.first_token.append(first_token_s)
+
+    def snapshot(self):
+        with self.lock:
+            lat = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+            p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+            ttft = np.array(self.first_token) * 1000 if self.first_token else np.zeros(1)
+            return dict(self.counts, errors=dict(self.errors),
+                        p50_ms=float(p50), p95_ms=float(p95), p99_ms=float(p99),
+                        ttft_p50_ms=float(np.percentile(ttft, 50)))
+
+
+class GeminiClient:
+    """Pooled, retrying generateContent client; safe to share between threads"""
+
+    def __init__(self, api_key, model=DEFAULT_MODEL, base_url=DEFAULT_BASE_URL,
+                 deadline_s=TURN_DEADLINE_S, max_retries=MAX_RETRIES, pool_size=POOL_SIZE):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.deadline_s = deadline_s
+        self.max_retries = max_retries
+        self.metrics = ClientMetrics()
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def url(self, method="generateContent"):
+        return f"{self.base_url}/{self.model}:{method}"
+
+    def _backoff(self, attempt, retry_after=None):
+        # Retry-After is server input: ignore nan/inf and keep it within [0, cap]
+        if retry_after is not None and math.isfinite(retry_after):
+            return min(max(retry_after, 0.0), BACKOFF_CAP_S)
+        return random.uniform(0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** attempt))
+
+    def _deadline(self, deadline_s=None):
+        return time.monotonic() + (deadline_s or self.deadline_s)
+
+    def _post(self, method, payload, deadline, stream=False, params=None):
+        """
+        POST with retries until `deadline` (monotonic); returns the successful response.
+
+        Raises GeminiError when retries or time run out, or on a
+        non-retryable status.
+        """
+        params = dict(params or {}, key=self.api_key)
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.metrics.error('deadline')
+                raise GeminiError("deadline exceeded")
+            self.metrics.attempt(attempt > 0)
+            retry_after = None
+            try:
+                r = self.session.post(
+                    self.url(method), params=params, json=payload, stream=stream,
+                    timeout=(min(CONNECT_TIMEOUT_S, remaining), remaining),
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                kind = 'timeout' if isinstance(e, requests.Timeout) else 'connection'
+                self.metrics.error(kind)
+                # Exception text embeds the URL (and API key), so keep only the type
+                error = GeminiError(f"{kind} error: {type(e).__name__}")
+            else:
+                if r.status_code == 200:
+                    return r
+                self.metrics.error(f"http_{r.status_code}")
+                error = GeminiError(f"HTTP {r.status_code}", status=r.status_code)
+                r.close()
+                if r.status_code not in RETRY_STATUS:
+                    raise error
+                try:
+                    retry_after = float(r.headers["Retry-After"])
+                except (KeyError, ValueError):
+                    pass
+            if attempt >= self.max_retries:
+                raise error
+            pause = self._backoff(attempt, retry_after)
+            if time.monotonic() + pause >= deadline:
+                self.metrics.error('deadline')
+                raise error
+            time.sleep(pause)
+            attempt += 1
+
+    def generate(self, contents, deadline_s=None):
+        """Reply text for a `contents` list within the turn deadline"""
+        t0 = time.perf_counter()
+        deadline = self._deadline(deadline_s)
+        try:
+            text = reply_text(self._post("generateContent", {"contents": contents}, deadline).json())
+        except (GeminiError, ValueError, KeyError, IndexError) as e:
+            self.metrics.turn(time.perf_counter() - t0, ok=False)
+            if isinstance(e, GeminiError):
+                raise
+            self.metrics.error('bad_response')
+            raise GeminiError(f"unexpected response: {e}")
+        self.metrics.turn(time.perf_counter() - t0, ok=True)
+        return text
+
+    def stream(self, contents, deadline_s=None):
+        """
+        Yield reply text chunks as they arrive (streamGenerateContent, SSE).
+
+        Raises GeminiError if the request fails, the stream breaks or the
+        deadline passes; text already yielded stays valid.
+        """
+        t0 = time.perf_counter()
+        deadline = self._deadline(deadline_s)
+        first_token = None
+        ok = False
+        try:
+            r = self._post("streamGenerateContent", {"contents": contents}, deadline,
+                           stream=True, params={"alt": "sse"})
+            with r:
+                # chunk_size=None hands over bytes as soon as they are read
+                for line in r.iter_lines(chunk_size=None):
+                    if not line.startswith(b"data:"):
+                        continue
+                    text = chunk_text(json.loads(line[5:]))
+                    if text:
+                        if first_token is None:
+                            first_token = time.perf_counter() - t0
+                        yield text
+                    if time.monotonic() > deadline:
+                        self.metrics.error('deadline')
+                        raise GeminiError("deadline exceeded mid-stream")
+            ok = True
+        except requests.RequestException as e:
+            self.metrics.error('stream')
+            raise GeminiError(f"stream interrupted: {type(e).__name__}")
+        except ValueError:
+            self.metrics.error('bad_response')
+            raise GeminiError("unexpected stream chunk")
+        finally:
+            self.metrics.turn(time.perf_counter() - t0, ok, first_token)
+
+    def connection_stats(self):
+        """Connections opened vs requests sent, summed over the session's pools"""
+        opened = sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            opened += pool.num_connections
+            sent += pool.num_requests
+        return {'connections': opened, 'requests': sent}
+
+    def stats(self):
+        return dict(self.metrics.snapshot(), **self.connection_stats())
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,213 @@
+"""
+Offline gazetteer geocoder for free-text patient addresses.
+
+Place names from gazetteer.csv are normalized and indexed twice:
+- a prefix trie over every word-start of every name, for autocomplete
+- a character-trigram index, for fuzzy matching of misspellings
+
+Resolved addresses are memoized in an LRU keyed on the normalized text, so
+repeat localities skip the index entirely.
+"""
+
+import csv
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+
+from triage.spatial_index import haversine_km
+
+GAZETTEER_FILE = "gazetteer.csv"
+
+# Nagpur Municipal Corporation area plus the immediate suburbs
+SERVICE_AREA = {
+    'name': 'Nagpur',
+    'lat': 21.1458,
+    'lon': 79.0882,
+    'radius_km': 25.0,
+}
+
+# Common abbreviations in hand-typed Indian addresses
+ABBREVIATIONS = {
+    'ngr': 'nagar',
+    'rd': 'road',
+    'sq': 'square',
+    'chowk': 'square',
+    'clny': 'colony',
+    'col': 'colony',
+    'st': 'street',
+    'stn': 'station',
+    'hosp': 'hospital',
+}
+
+# Tokens that carry no locality information
+NOISE_WORDS = {
+    'near', 'opp', 'opposite', 'behind', 'beside', 'next', 'to', 'the', 'at',
+    'in', 'of', 'and', 'flat', 'house', 'no', 'plot', 'floor',
+    'nagpur', 'maharashtra', 'india',
+}
+
+MIN_FUZZY_SCORE = 0.45
+
+
+def normalize(text):
+    """Lower-case, strip accents/punctuation, expand abbreviations"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"[^a-z0-9 ]+", ' ', text)
+    words = [ABBREVIATIONS.get(w, w) for w in text.split()]
+    return ' '.join(words)
+
+
+def trigrams(text):
+    """Set of padded character trigrams of a normalized string"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Geocoder:
+    """Gazetteer-backed geocoder with prefix autocomplete and fuzzy lookup"""
+
+    def __init__(self, places, service_area=SERVICE_AREA, cache_size=4096):
+        self.places = list(places)
+        self.service_area = service_area
+        self._exact = {}                  # normalized name -> place index
+        self._trie = {}                   # char -> child node, '$' -> place indexes
+        self._grams = defaultdict(set)    # trigram -> normalized names
+        self._gram_count = {}             # normalized name -> number of trigrams
+        self._max_words = 1
+
+        for idx, place in enumerate(self.places):
+            names = [place['name']] + [n for n in place.get('alt_names', []) if n]
+            for raw in names:
+                key = normalize(raw)
+                if not key:
+                    continue
+                self._exact.setdefault(key, idx)
+                self._max_words = max(self._max_words, len(key.split()))
+                grams = trigrams(key)
+                self._gram_count[key] = len(grams)
+                for gram in grams:
+                    self._grams[gram].add(key)
+                words = key.split()
+                for start in range(len(words)):
+                    self._trie_insert(' '.join(words[start:]), idx)
+
+        # Rank autocomplete candidates by population, largest first
+        self._finalize_trie(self._trie)
+        self._resolve_cached = lru_cache(maxsize=cache_size)(self._resolve)
+
+    # ---------------- index construction ----------------
+    def _trie_insert(self, key, idx):
+        node = self._trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+            node.setdefault('$', set()).add(idx)
+
+    def _finalize_trie(self, node):
+        for ch, child in node.items():
+            if ch == '$':
+                continue
+            child['$'] = sorted(child['$'], key=lambda i: -self.places[i].get('population', 0))
+            self._finalize_trie(child)
+
+    # ---------------- lookups ----------------
+    def in_service_area(self, lat, lon):
+        """True if a coordinate lies within the configured service area"""
+        area = self.service_area
+        return haversine_km(area['lat'], area['lon'], lat, lon) <= area['radius_km']
+
+    def autocomplete(self, prefix, limit=8):
+        """Return up to `limit` place names whose words start with prefix"""
+        node = self._trie
+        for ch in normalize(prefix):
+            node = node.get(ch)
+            if node is None:
+                return []
+        return [self.places[i]['name'] for i in node.get('$', [])[:limit]]
+
+    def _result(self, idx, confidence, match):
+        place = self.places[idx]
+        return {
+            'name': place['name'],
+            'lat': place['lat'],
+            'lon': place['lon'],
+            'confidence': round(confidence, 2),
+            'in_service_area': self.in_service_area(place['lat'], place['lon']),
+            'match': match,
+        }
+
+    def _fuzzy(self, key):
+        """Best (score, name) by trigram Dice coefficient, or None"""
+        grams = trigrams(key)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for name in self._grams.get(gram, ()):
+                overlap[name] += 1
+        best = None
+        for name, shared in overlap.items():
+            score = 2.0 * shared / (len(grams) + self._gram_count[name])
+            if best is None or score > best[0]:
+                best = (score, name)
+        return best
+
+    def geocode(self, address):
+        """Resolve an address to a result dict, or None if nothing matches"""
+        key = normalize(address)
+        if not key:
+            return None
+        result = self._resolve_cached(key)
+        return dict(result) if result else None
+
+    def _resolve(self, key):
+        """Uncached lookup of a normalized address"""
+        # 1. Whole address is a known place
+        if key in self._exact:
+            return self._result(self._exact[key], 1.0, 'exact')
+
+        # 2. Longest known place name appearing as a word window
+        words = key.split()
+        for size in range(min(self._max_words, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                window = ' '.join(words[start:start + size])
+                if window in self._exact and window not in NOISE_WORDS:
+                    return self._result(self._exact[window], 0.9, 'contains')
+
+        # 3. Fuzzy match on the address without noise words and house numbers
+        core = ' '.join(w for w in words if w not in NOISE_WORDS and not w.isdigit())
+        if not core:
+            return None
+        best = self._fuzzy(core)
+        if best is None or best[0] < MIN_FUZZY_SCORE:
+            return None
+        score, name = best
+        return self._result(self._exact[name], 0.85 * score, 'fuzzy')
+
+    def cache_info(self):
+        """LRU statistics for the geocode cache"""
+        return self._resolve_cached.cache_info()
+
+
+def load_gazetteer(path=GAZETTEER_FILE):
+    """Load gazetteer rows from CSV"""
+    places = []
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    places.append({
+                        'name': row['name'],
+                        'alt_names': [n.strip() for n in (row.get('alt_names') or '').split('|')],
+                        'lat': float(row['lat']),
+                        'lon': float(row['lon']),
+                        'population': int(row.get('population') or 0),
+                    })
+    except Exception as e:
+        print(f"⚠️ Could not load gazetteer: {e}")
+    return places
+
+
+def build_geocoder(path=GAZETTEER_FILE):
+    """Geocoder over the bundled gazetteer"""
+    return Geocoder(load_gazetteer(path))
@@ -0,0 +1,404 @@
+"""
+High-frequency GPS ping ingestion for the ambulance fleet.
+
+- PingRingBuffer: fixed-size per-vehicle history backed by NumPy arrays
+- HMMMapMatcher: incremental (online Viterbi) matcher snapping pings to road edges
+- PingStore: ingests batches, matches in a background worker, publishes positions
+- HTTP endpoint: POST /pings with a JSON list of [vehicle_id, ts, lat, lon, speed]
+
+Ingestion only writes into the ring buffers; map matching and the roster
+update in ambulances.json happen off the request path, so a burst of pings
+never waits on the matcher.
+
+Run the endpoint from the repository root:
+    python -m triage.gps --port 8765
+"""
+
+import argparse
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from triage.fleet import AMBULANCES_FILE, update_ambulances
+from triage.spatial_index import GridIndex, KM_PER_DEG_LAT
+
+RING_CAPACITY = 600          # 10 minutes at 1 Hz
+GPS_SIGMA_M = 25.0           # GPS noise (emission model)
+TRANSITION_BETA_M = 60.0     # tolerance for route vs straight-line mismatch
+SEARCH_RADIUS_M = 120.0      # candidate edges per ping
+MAX_CANDIDATES = 6
+MAX_PINGS_PER_PASS = 5       # per vehicle per matcher pass; older backlog is skipped
+
+
+# -------------------------------------------------------
+# RING BUFFER
+# -------------------------------------------------------
+class PingRingBuffer:
+    """Fixed-capacity ping history for one vehicle"""
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.lat = np.zeros(capacity, dtype=np.float64)
+        self.lon = np.zeros(capacity, dtype=np.float64)
+        self.speed = np.zeros(capacity, dtype=np.float32)
+        self.edge = np.full(capacity, -1, dtype=np.int32)
+        self.head = 0      # next write slot
+        self.count = 0     # valid entries (<= capacity)
+        self.total = 0     # pings ever written, used as a cursor by readers
+
+    def extend(self, ts, lat, lon, speed):
+        """Append a batch of pings (arrays of equal length)"""
+        n = len(ts)
+        if n == 0:
+            return
+        if n > self.capacity:
+            ts, lat, lon, speed = ts[-self.capacity:], lat[-self.capacity:], lon[-self.capacity:], speed[-self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+        idx = (self.head + np.arange(n)) % self.capacity
+        self.ts[idx] = ts
+        self.lat[idx] = lat
+        self.lon[idx] = lon
+        self.speed[idx] = speed
+        self.edge[idx] = -1
+        self.head = int((self.head + n) % self.capacity)
+        self.count = min(self.capacity, self.count + n)
+        self.total += n + skipped
+
+    def slot(self, seq):
+        """Ring slot holding ping number `seq`, or None if overwritten"""
+        if seq < self.total - self.count or seq >= self.total:
+            return None
+        return (self.head - (self.total - seq)) % self.capacity
+
+    def window(self):
+        """(ts, lat, lon, speed, edge) arrays in chronological order"""
+        start = (self.head - self.count) % self.capacity
+        idx = (start + np.arange(self.count)) % self.capacity
+        return self.ts[idx], self.lat[idx], self.lon[idx], self.speed[idx], self.edge[idx]
+
+
+# -------------------------------------------------------
+# MAP MATCHING
+# -------------------------------------------------------
+class HMMMapMatcher:
+    """
+    Online HMM map matcher over directed road edges.
+
+    Hidden states are (edge, fraction along edge) candidates near each ping.
+    Emission: Gaussian on the perpendicular distance. Transition: exponential
+    on the gap between the road distance and the straight-line distance of
+    consecutive pings. Only the forward Viterbi scores are kept per vehicle,
+    so each ping costs a handful of bounded searches.
+    """
+
+    def __init__(self, graph, sigma_m=GPS_SIGMA_M, beta_m=TRANSITION_BETA_M,
+                 radius_m=SEARCH_RADIUS_M, max_candidates=MAX_CANDIDATES):
+        self.graph = graph
+        self.sigma_m = sigma_m
+        self.beta_m = beta_m
+        self.radius_m = radius_m
+        self.max_candidates = max_candidates
+
+        ref_lat = float(np.mean(graph.node_lat)) if graph.n_nodes else 0.0
+        self._kx = KM_PER_DEG_LAT * math.cos(math.radians(ref_lat)) * 1000.0
+        self._ky = KM_PER_DEG_LAT * 1000.0
+        self._tails = graph.edge_src.tolist()
+        self._heads = graph.edge_dst.tolist()
+        self._lengths = graph.length_m.tolist()
+        lat, lon = graph.node_lat.tolist(), graph.node_lon.tolist()
+        self._node_lat, self._node_lon = lat, lon
+
+        # Edges indexed by midpoint; the reach covers half the longest edge
+        self._edge_index = GridIndex(cell_deg=0.005)
+        for e, (a, b) in enumerate(zip(self._tails, self._heads)):
+            self._edge_index.upsert(e, (lat[a] + lat[b]) / 2, (lon[a] + lon[b]) / 2)
+        self._reach_km = (max(self._lengths, default=0.0) / 2 + radius_m) / 1000.0
+
+    def candidates(self, lat, lon):
+        """Nearby (distance_m, edge, fraction, snap_lat, snap_lon), closest first"""
+        px, py = lon * self._kx, lat * self._ky
+        found = []
+        for _, e in self._edge_index.within_radius(lat, lon, self._reach_km):
+            a, b = self._tails[e], self._heads[e]
+            ax, ay = self._node_lon[a] * self._kx, self._node_lat[a] * self._ky
+            bx, by = self._node_lon[b] * self._kx, self._node_lat[b] * self._ky
+            dx, dy = bx - ax, by - ay
+            seg = dx * dx + dy * dy
+            f = 0.0 if seg == 0 else max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / seg))
+            sx, sy = ax + f * dx, ay + f * dy
+            d = math.hypot(px - sx, py - sy)
+            if d <= self.radius_m:
+                found.append((d, e, f, sy / self._ky, sx / self._kx))
+        found.sort()
+        return found[:self.max_candidates]
+
+    def _route_distance(self, prev, cand, graph_dists):
+        """Road metres from candidate `prev` to candidate `cand`"""
+        _, e1, f1, _, _ = prev
+        _, e2, f2, _, _ = cand
+        if e1 == e2 and f2 >= f1:
+            return (f2 - f1) * self._lengths[e1]
+        via = graph_dists.get(self._tails[e2])
+        if via is None:
+            return None
+        return (1 - f1) * self._lengths[e1] + via + f2 * self._lengths[e2]
+
+    def step(self, state, lat, lon):
+        """
+        Advance one vehicle's matcher by a ping. `state` is a dict owned by the
+        caller (start with {}). Returns (edge, snap_lat, snap_lon) or None.
+        """
+        cands = self.candidates(lat, lon)
+        if not cands:
+            return None
+        emission = [-0.5 * (c[0] / self.sigma_m) ** 2 for c in cands]
+
+        prev = state.get('cands')
+        scores = None
+        if prev:
+            gc = math.hypot((lon - state['lon']) * self._kx, (lat - state['lat']) * self._ky)
+            limit = 3.0 * gc + 2.0 * self.radius_m + 100.0
+            tails = [self._tails[c[1]] for c in cands]
+            scores = [-math.inf] * len(cands)
+            for p, p_score in zip(prev, state['scores']):
+                dists = self.graph.network_distances(self._heads[p[1]], tails, limit)
+                for j, c in enumerate(cands):
+                    route = self._route_distance(p, c, dists)
+                    if route is None:
+                        continue
+                    s = p_score - abs(route - gc) / self.beta_m + emission[j]
+                    if s > scores[j]:
+                        scores[j] = s
+            if max(scores) == -math.inf:
+                scores = None   # no connected path: restart the chain here
+        if scores is None:
+            scores = emission
+
+        best = max(scores)
+        state['cands'] = cands
+        state['scores'] = [s - best for s in scores]
+        state['lat'], state['lon'] = lat, lon
+        j = scores.index(best)
+        return cands[j][1], cands[j][3], cands[j][4]
+
+
+# -------------------------------------------------------
+# STORE
+# -------------------------------------------------------
+class PingStore:
+    """Per-vehicle ring buffers, background matching and published positions"""
+
+    def __init__(self, matcher=None, capacity=RING_CAPACITY, roster_path=AMBULANCES_FILE,
+                 flush_interval=2.0):
+        self.matcher = matcher
+        self.capacity = capacity
+        self.roster_path = roster_path
+        self.flush_interval = flush_interval
+        self.buffers = {}
+        self.positions = {}          # vehicle id -> dict(lat, lon, edge, ts, speed)
+        self.fleet_index = GridIndex(cell_deg=0.01)
+        self._match_state = {}
+        self._matched_upto = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self.stats = {'pings': 0, 'batches': 0, 'matched': 0, 'skipped': 0, 'unmatched': 0}
+
+    def ingest(self, rows):
+        """Store a batch of [vehicle_id, ts, lat, lon, speed] rows"""
+        grouped = {}
+        for row in rows:
+            grouped.setdefault(str(row[0]), []).append(row[1:5])
+        with self._lock:
+            for vid, pings in grouped.items():
+                buf = self.buffers.get(vid)
+                if buf is None:
+                    buf = self.buffers[vid] = PingRingBuffer(self.capacity)
+                    self._matched_upto[vid] = 0
+                arr = np.asarray(pings, dtype=np.float64)
+                buf.extend(arr[:, 0], arr[:, 1], arr[:, 2], arr[:, 3])
+                self._dirty.add(vid)
+            self.stats['pings'] += len(rows)
+            self.stats['batches'] += 1
+        return len(rows)
+
+    def match_pending(self):
+        """Run the matcher over new pings of every dirty vehicle"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for vid in dirty:
+            # The cursor and the slots it points at must come from the same moment:
+            # ingest() moves both while it holds the lock
+            with self._lock:
+                buf = self.buffers[vid]
+                start = self._matched_upto[vid]
+                end = buf.total
+                if end - start > MAX_PINGS_PER_PASS:
+                    self.stats['skipped'] += end - start - MAX_PINGS_PER_PASS
+                    start = end - MAX_PINGS_PER_PASS
+                pending = []
+                for seq in range(start, end):
+                    slot = buf.slot(seq)
+                    if slot is not None:
+                        pending.append((seq, float(buf.lat[slot]), float(buf.lon[slot])))
+                last_ts = float(buf.ts[buf.slot(end - 1)])
+                last_speed = float(buf.speed[buf.slot(end - 1)])
+
+            state = self._match_state.setdefault(vid, {})
+            result = None
+            for seq, lat, lon in pending:
+                if self.matcher is not None:
+                    result = self.matcher.step(state, lat, lon)
+                else:
+                    result = (-1, lat, lon)
+                if result is None:
+                    self.stats['unmatched'] += 1
+                    result = (-1, lat, lon)
+                else:
+                    self.stats['matched'] += 1
+                with self._lock:
+                    slot = buf.slot(seq)
+                    if slot is not None:
+                        buf.edge[slot] = result[0]
+            self._matched_upto[vid] = end
+            if result is not None:
+                with self._lock:
+                    self.positions[vid] = {
+                        'lat': result[1], 'lon': result[2], 'edge': int(result[0]),
+                        'ts': last_ts, 'speed': last_speed,
+                    }
+                self.fleet_index.upsert(vid, result[1], result[2])
+
+    def snapshot(self):
+        """Copy of the published positions, safe to serialize while the worker runs"""
+        with self._lock:
+            return {vid: dict(pos) for vid, pos in self.positions.items()}
+
+    def flush_roster(self):
+        """Write the latest matched positions of rostered units to ambulances.json"""
+        if not self.roster_path:
+            return 0
+        positions = self.snapshot()
+
+        def merge_positions(ambulances):
+            # Only coordinates: unit state belongs to the technician dashboard
+            updated = 0
+            for amb in ambulances:
+                pos = positions.get(amb['id'])
+                if pos is not None:
+                    amb['lat'] = round(pos['lat'], 6)
+                    amb['lon'] = round(pos['lon'], 6)
+                    updated += 1
+            return updated
+
+        return update_ambulances(merge_positions, self.roster_path)
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop.is_set():
+            self.match_pending()
+            if time.monotonic() - last_flush >= self.flush_interval:
+                try:
+                    self.flush_roster()
+                except Exception as e:
+                    print(f"⚠️ Could not update fleet roster: {e}")
+                last_flush = time.monotonic()
+            self._stop.wait(0.05)
+
+    def start(self):
+        """Start the background matcher/flush worker"""
+        self._worker = threading.Thread(target=self._run, name="gps-matcher", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """Stop the worker after a final match and flush"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+        self.match_pending()
+        self.flush_roster()
+
+
+# -------------------------------------------------------
+# HTTP ENDPOINT
+# -------------------------------------------------------
+def make_handler(store):
+    """Request handler bound to a PingStore"""
+
+    class PingHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive for batch senders
+
+        def _reply(self, code, body):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if self.path != "/pings":
+                return self._reply(404, {'error': 'not found'})
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                if length < 0:
+                    raise ValueError("invalid Content-Length")
+                rows = json.loads(self.rfile.read(length))
+                accepted = store.ingest(rows)
+            except Exception as e:
+                self.close_connection = True    # the body may be left unread
+                return self._reply(400, {'error': str(e)})
+            self._reply(200, {'accepted': accepted})
+
+        def do_GET(self):
+            if self.path == "/positions":
+                return self._reply(200, store.snapshot())
+            if self.path == "/stats":
+                return self._reply(200, store.stats)
+            self._reply(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return PingHandler
+
+
+def serve(store, host="127.0.0.1", port=8765):
+    """Run the ingestion endpoint until interrupted"""
+    server = ThreadingHTTPServer((host, port), make_handler(store))
+    store.start()
+    print(f"📡 GPS ingestion listening on http://{host}:{port}/pings")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store.stop()
+
+
+def main():
+    from triage.routing import load_default_engine
+
+    parser = argparse.ArgumentParser(description="GPS ping ingestion endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--roster", default=AMBULANCES_FILE, help="fleet roster to update ('' to disable)")
+    args = parser.parse_args()
+
+    engine = load_default_engine()
+    store = PingStore(HMMMapMatcher(engine.graph), roster_path=args.roster)
+    serve(store, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Local GPS ping simulator standing in for real ambulance trackers.
+
+Vehicles drive shortest paths between random nodes of the road graph and
+report noisy 1 Hz positions, sent in batches to the ingestion endpoint over a
+keep-alive connection. The first units reuse the roster ids from
+ambulances.json so the dashboards see them move.
+
+Run from the repository root (with `python -m triage.gps` running):
+    python -m triage.gps_simulator --vehicles 2000 --speedup 5
+"""
+
+import argparse
+import http.client
+import json
+import math
+import random
+import time
+
+from triage.fleet import load_ambulances
+from triage.routing import load_default_engine
+from triage.spatial_index import haversine_km
+
+GPS_NOISE_M = 10.0
+M_PER_DEG_LAT = 111_195.0
+
+
+class SimulatedVehicle:
+    """One unit driving random shortest paths through the graph"""
+
+    def __init__(self, vehicle_id, engine, rng):
+        self.id = vehicle_id
+        self.engine = engine
+        self.rng = rng
+        self.node = rng.randrange(engine.graph.n_nodes)
+        self.path = []
+        self.offset_m = 0.0
+        self.speed_ms = 0.0
+        self._new_route()
+
+    def _new_route(self):
+        graph = self.engine.graph
+        while True:
+            _, path = self.engine.shortest_path(self.node, self.rng.randrange(graph.n_nodes))
+            if len(path) > 1:
+                break
+        self.path = path
+        self.offset_m = 0.0
+        self.speed_ms = self.rng.uniform(8.0, 16.0)
+
+    def _leg(self):
+        g = self.engine.graph
+        a, b = self.path[0], self.path[1]
+        length = 1000.0 * haversine_km(g.node_lat[a], g.node_lon[a], g.node_lat[b], g.node_lon[b])
+        return a, b, max(length, 1.0)
+
+    def advance(self, seconds):
+        """Move along the route and return the true (lat, lon)"""
+        remaining = self.speed_ms * seconds
+        while True:
+            a, b, length = self._leg()
+            if self.offset_m + remaining < length:
+                self.offset_m += remaining
+                break
+            remaining -= length - self.offset_m
+            self.offset_m = 0.0
+            self.path.pop(0)
+            self.node = self.path[0]
+            if len(self.path) < 2:
+                self._new_route()
+        g = self.engine.graph
+        f = self.offset_m / length
+        lat = g.node_lat[a] + f * (g.node_lat[b] - g.node_lat[a])
+        lon = g.node_lon[a] + f * (g.node_lon[b] - g.node_lon[a])
+        return float(lat), float(lon)
+
+    def ping(self, ts, seconds=1.0):
+        """Advance and return a noisy [vehicle_id, ts, lat, lon, speed] row"""
+        lat, lon = self.advance(seconds)
+        noise_lat = self.rng.gauss(0, GPS_NOISE_M) / M_PER_DEG_LAT
+        noise_lon = self.rng.gauss(0, GPS_NOISE_M) / (M_PER_DEG_LAT * math.cos(math.radians(lat)))
+        return [self.id, ts, lat + noise_lat, lon + noise_lon, self.speed_ms]
+
+
+def run(host, port, n_vehicles, duration_s, speedup, batch_size, seed=0):
+    """Drive the simulation against a running endpoint; returns sent ping count"""
+    rng = random.Random(seed)
+    engine = load_default_engine()
+    roster_ids = [a['id'] for a in load_ambulances()]
+    ids = roster_ids[:n_vehicles] + [f"SIM-{i:05d}" for i in range(max(0, n_vehicles - len(roster_ids)))]
+    vehicles = [SimulatedVehicle(vid, engine, rng) for vid in ids]
+
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    sent = 0
+    sim_ts = time.time()
+    t_start = time.perf_counter()
+    ticks = int(duration_s * speedup)
+    for tick in range(ticks):
+        rows = [v.ping(sim_ts) for v in vehicles]
+        sim_ts += 1.0
+        for i in range(0, len(rows), batch_size):
+            body = json.dumps(rows[i:i + batch_size])
+            conn.request("POST", "/pings", body=body, headers={"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                print(f"⚠️ Endpoint returned {resp.status}")
+            sent += len(rows[i:i + batch_size])
+        # Pace to `speedup` simulated seconds per wall second
+        target = (tick + 1) / speedup
+        lag = target - (time.perf_counter() - t_start)
+        if lag > 0:
+            time.sleep(lag)
+    elapsed = time.perf_counter() - t_start
+    conn.close()
+    print(f"Sent {sent} pings from {n_vehicles} vehicles in {elapsed:.1f}s ({sent / elapsed:,.0f} pings/s)")
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate ambulance GPS trackers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--vehicles", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30.0, help="wall-clock seconds")
+    parser.add_argument("--speedup", type=float, default=1.0, help="simulated seconds per wall second")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.host, args.port, args.vehicles, args.duration, args.speedup, args.batch_size, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Condition-aware hospital destination selection.
+
+Each hospital in hospitals.json lists its capabilities (cath lab, stroke
+centre, trauma level, ...), stored here as an IntFlag bitset so "can this
+hospital take a STEMI" is a single AND over a numpy array. Diagnoses from the
+classifier map to the capability bits they need.
+
+Live emergency-bed availability comes from CapacityTable, fed by the local
+stand-in service in triage.capacity_service (or the static `er_beds` when the
+service is down).
+
+DestinationSelector runs one one-to-many road search from the patient's node
+to every hospital per traffic bucket and caches the travel-time row, so any
+diagnosis at that location reuses it; choosing a destination is then a
+capability mask, a capacity mask and an argmin.
+"""
+
+import json
+import time
+import urllib.request
+from collections import OrderedDict
+from enum import IntFlag
+from functools import lru_cache
+
+import numpy as np
+
+from triage.traffic import BUCKET_MINUTES, bucket_for
+
+CAPACITY_URL = "http://127.0.0.1:8766/capacity"
+DESTINATION_CACHE_SIZE = 4096
+
+
+class Capability(IntFlag):
+    EMERGENCY = 1
+    ICU = 2
+    CATH_LAB = 4
+    STROKE_CENTER = 8
+    TRAUMA_LEVEL_2 = 16
+    TRAUMA_LEVEL_1 = 32
+
+
+# Capability bits each diagnosis needs (classifier, ML and rapid-triage labels)
+DIAGNOSIS_REQUIREMENTS = {
+    'Cardiac Arrest': Capability.ICU | Capability.CATH_LAB,
+    'Heart Attack': Capability.CATH_LAB,
+    'Heart Attack (Suspected)': Capability.CATH_LAB,
+    'Heart Attack (STEMI Suspected)': Capability.CATH_LAB,
+    'Stroke': Capability.STROKE_CENTER,
+    'Stroke (Suspected)': Capability.STROKE_CENTER,
+    'Major Trauma/Bleeding': Capability.TRAUMA_LEVEL_1,
+    'Major Trauma/Hemorrhage': Capability.TRAUMA_LEVEL_1,
+    'Critical - Unconscious with Trauma/Bleeding': Capability.TRAUMA_LEVEL_1 | Capability.ICU,
+    'Severe Respiratory Distress with Trauma': Capability.TRAUMA_LEVEL_2 | Capability.ICU,
+    'Severe Respiratory Distress': Capability.ICU,
+    'Critical - Unconscious Patient': Capability.ICU,
+    'Critical Emergency - Multiple Critical Symptoms': Capability.ICU,
+    'Shock/Collapse': Capability.ICU,
+}
+
+
+def capability_mask(names):
+    """Bitset from capability names; a level-1 trauma centre also meets level 2"""
+    mask = Capability(0)
+    for name in names:
+        mask |= Capability[name.upper()]
+    if mask & Capability.TRAUMA_LEVEL_1:
+        mask |= Capability.TRAUMA_LEVEL_2
+    return mask
+
+
+@lru_cache(maxsize=256)
+def required_capabilities(diagnosis):
+    """Capability bits a diagnosis needs (any emergency department by default)"""
+    return Capability.EMERGENCY | DIAGNOSIS_REQUIREMENTS.get(diagnosis, Capability(0))
+
+
+def capability_names(mask):
+    """Readable capability names in a bitset"""
+    return [c.name.lower() for c in Capability if c & mask]
+
+
+class CapacityTable:
+    """Available emergency beds per hospital, refreshed from the capacity service"""
+
+    def __init__(self, hospitals, url=CAPACITY_URL, min_interval_s=10.0):
+        self.url = url
+        self.min_interval_s = min_interval_s
+        self.available = {h['id']: h.get('er_beds', 0) for h in hospitals}
+        self.total = dict(self.available)
+        self.updated_at = None
+        self.live = False
+        self._last_poll = 0.0
+
+    def update(self, hospital_id, available, total=None):
+        """Set one hospital's free beds"""
+        self.available[hospital_id] = max(0, int(available))
+        if total is not None:
+            self.total[hospital_id] = int(total)
+        self.updated_at = time.time()
+
+    def poll(self, timeout=0.5, force=False):
+        """Refresh from the service at most every min_interval_s; returns True if live"""
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.min_interval_s:
+            return self.live
+        self._last_poll = now
+        try:
+            with urllib.request.urlopen(self.url, timeout=timeout) as resp:
+                rows = json.loads(resp.read())
+        except Exception as e:
+            if self.live:
+                print(f"⚠️ Capacity service unreachable ({e}). Using last known beds.")
+            self.live = False
+            return False
+        for hospital_id, row in rows.items():
+            if hospital_id in self.available:
+                self.update(hospital_id, row['available'], row.get('total'))
+        self.live = True
+        return True
+
+    def as_array(self, ids):
+        """Free beds aligned with a list of hospital ids"""
+        return np.array([self.available.get(hid, 0) for hid in ids], dtype=np.int32)
+
+
+class DestinationSelector:
+    """
+    Fastest capable hospital with free beds for a patient location and diagnosis.
+
+    Falls back to a capable hospital without free beds, then to the fastest
+    emergency department, and says so in the result.
+    """
+
+    def __init__(self, engine, hospitals, capacity=None, cache_size=DESTINATION_CACHE_SIZE):
+        self.engine = engine
+        self.hospitals = list(hospitals)
+        self.ids = [h['id'] for h in self.hospitals]
+        self.caps = np.array(
+            [int(capability_mask(h.get('capabilities', ['emergency']))) for h in self.hospitals],
+            dtype=np.int64,
+        )
+        self.nodes = [engine.graph.nearest_node(h['lat'], h['lon']) for h in self.hospitals]
+        self.capacity = capacity
+        self.cache_size = cache_size
+        self._rows = OrderedDict()
+        self._version = engine.metric_version
+        self.hits = 0
+        self.misses = 0
+
+    def travel_seconds(self, node, bucket):
+        """Road seconds from a node to every hospital (inf if unreachable), cached"""
+        if self.engine.metric_version != self._version:
+            self._rows.clear()
+            self._version = self.engine.metric_version
+        key = (node, bucket)
+        row = self._rows.get(key)
+        if row is not None:
+            self._rows.move_to_end(key)
+            self.hits += 1
+            return row
+        self.misses += 1
+        reached = self.engine.one_to_many(node, targets=set(self.nodes), depart_minute=bucket * BUCKET_MINUTES)
+        row = np.array([reached.get(n, np.inf) for n in self.nodes], dtype=float)
+        self._rows[key] = row
+        if len(self._rows) > self.cache_size:
+            self._rows.popitem(last=False)
+        return row
+
+    def select(self, lat, lon, diagnosis, depart_at=None):
+        """Best destination dict for a patient, or None if no hospital is reachable"""
+        required = int(required_capabilities(diagnosis))
+        seconds = self.travel_seconds(self.engine.graph.nearest_node(lat, lon), bucket_for(depart_at))
+        reachable = np.isfinite(seconds)
+        capable = (self.caps & required) == required
+        if self.capacity is not None:
+            beds = self.capacity.as_array(self.ids)
+        else:
+            beds = np.array([h.get('er_beds', 0) for h in self.hospitals], dtype=np.int32)
+
+        status = 'ok'
+        ok = capable & reachable & (beds > 0)
+        if not ok.any():
+            status = 'no_beds'
+            ok = capable & reachable
+        if not ok.any():
+            status = 'not_capable'
+            ok = ((self.caps & Capability.EMERGENCY) != 0) & reachable
+        if not ok.any():
+            return None
+
+        i = int(np.argmin(np.where(ok, seconds, np.inf)))
+        hospital = self.hospitals[i]
+        return {
+            'id': hospital['id'],
+            'name': hospital['name'],
+            'eta_min': float(seconds[i]) / 60.0,
+            'beds_available': int(beds[i]),
+            'required': capability_names(required),
+            'status': status,
+        }
+
+    def stats(self):
+        """Travel-row cache counters"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._rows),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,174 @@
+"""
+Emergency-intent detector for free-text chat messages.
+
+A curated lexicon of symptom phrases ("collapsed", "turning blue", "cant
+breathe") is compiled into one Aho-Corasick automaton, so every phrase is
+found in a single pass over the message regardless of lexicon size. Phrases
+are padded with spaces to match whole words only. A hit is dropped when a
+negation word ("no", "not", "without", ...) appears shortly before it in
+the same clause ("no chest pain", "he is not bleeding"); "and" and "but"
+start a new clause, so "not moving and collapsed" still counts.
+
+Hits are mapped onto the ten classifier FEATURES and the three rapid-triage
+questions of the patient portal, so an emergency typed into the chatbot can
+be handed to the triage flow with its answers already filled in.
+"""
+
+import re
+from collections import deque
+
+from triage.symptoms import FEATURES
+
+# feature -> phrases that signal it (matched on normalized text, see normalize())
+LEXICON = {
+    'unconsciousness': [
+        "unconscious", "collapsed", "has collapsed", "passed out", "fainted", "blacked out",
+        "not responding", "unresponsive", "wont wake up", "will not wake up", "cant wake",
+        "not waking up", "knocked out", "lost consciousness", "no pulse", "heart stopped",
+    ],
+    'shortness_of_breath': [
+        "cant breathe", "cannot breathe", "can not breathe", "not breathing", "stopped breathing",
+        "isnt breathing", "struggling to breathe", "difficulty breathing", "trouble breathing",
+        "hard to breathe", "short of breath", "shortness of breath", "breathless", "gasping",
+        "breathing problem", "breathing problems", "problem breathing", "choking", "wheezing",
+        "suffocating",
+    ],
+    'cyanosis': [
+        "turning blue", "turned blue", "going blue", "blue lips", "lips are blue", "lips turning blue",
+        "bluish", "face is blue", "purple lips",
+    ],
+    'chest_pain': [
+        "chest pain", "pain in chest", "pain in his chest", "pain in her chest", "pain in my chest",
+        "chest tightness", "tight chest", "chest is tight", "heart attack", "crushing pain",
+    ],
+    'bleeding': [
+        "bleeding", "bleeding heavily", "lot of blood", "blood everywhere", "losing blood",
+        "vomiting blood", "coughing blood", "stabbed", "gunshot", "deep cut",
+    ],
+    'trauma': [
+        "accident", "crash", "hit by", "run over", "fell from", "fell off", "fall from",
+        "fell down", "fractured", "broken bone", "broken leg", "broken arm", "broke his", "broke her",
+        "broke my", "head injury", "hit his head",
+        "hit her head", "stabbed", "gunshot", "burned", "electrocuted", "drowning",
+    ],
+    'confusion': [
+        "confused", "disoriented", "not making sense", "slurred speech", "slurring",
+        "doesnt know where", "talking nonsense",
+    ],
+    'weakness': [
+        "face drooping", "face is drooping", "one side weak", "weak on one side", "weakness",
+        "cant move his arm", "cant move her arm", "cant move my arm", "paralysed", "paralyzed",
+        "numb on one side",
+    ],
+    'seizure': [
+        "seizure", "seizures", "having a fit", "fitting", "convulsing", "convulsions",
+        "shaking uncontrollably", "jerking",
+    ],
+    'dizziness': [
+        "dizzy", "dizziness", "lightheaded", "light headed", "room spinning", "vertigo",
+    ],
+}
+
+NEGATIONS = {'no', 'not', 'without', 'never', 'denies', 'isnt', 'wasnt', 'doesnt', 'dont',
+             'didnt', 'hasnt', 'havent', 'nor', 'neither'}
+NEGATION_WINDOW = 3     # words before a hit that can negate it
+CLAUSE_BREAK = "|"
+CLAUSE_WORDS = {'and', 'but'}
+
+# Features that alone mean "call an ambulance now"
+EMERGENCY_FEATURES = {'unconsciousness', 'shortness_of_breath', 'cyanosis', 'seizure', 'chest_pain'}
+# Combinations that do (same pairs as the classifier's trauma and stroke rules)
+EMERGENCY_PAIRS = [('bleeding', 'trauma'), ('confusion', 'weakness')]
+
+
+def normalize(text):
+    """Lowercase words separated by single spaces; punctuation and CLAUSE_WORDS become clause breaks"""
+    words = []
+    for token in re.findall(r"[a-z0-9]+|[.,;:!?]", text.lower().replace("'", "").replace("’", "")):
+        words.append(CLAUSE_BREAK if token in CLAUSE_WORDS or not token[0].isalnum() else token)
+    return " " + " ".join(words) + " "
+
+
+class IntentDetector:
+    """Aho-Corasick automaton over the symptom lexicon"""
+
+    def __init__(self, lexicon=LEXICON):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]     # node -> [(phrase, features)]
+        phrases = {}
+        for feature, entries in lexicon.items():
+            for phrase in entries:
+                phrases.setdefault(phrase, []).append(feature)
+        for phrase, features in phrases.items():
+            self._insert(" " + phrase + " ", (phrase, tuple(features)))
+        self._link()
+
+    def _insert(self, pattern, value):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append((len(pattern), value))
+
+    def _link(self):
+        """Breadth-first failure links; outputs of the fallback node are merged in"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, text):
+        """[(phrase, features, start index)] for every lexicon phrase in normalized text"""
+        hits = []
+        node = 0
+        goto, fail, out = self.goto, self.fail, self.out
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, (phrase, features) in out[node]:
+                hits.append((phrase, features, i - length + 1))
+        return hits
+
+    def detect(self, message):
+        """
+        Symptoms in a chat message.
+
+        Returns a dict with the 0/1 'answers' for the classifier FEATURES,
+        the 'critical' answers for the rapid-triage questions, the matched
+        'phrases', the 'negated' ones and whether it is an 'emergency'.
+        """
+        text = normalize(message)
+        found, negated = set(), []
+        phrases = []
+        for phrase, features, start in self.scan(text):
+            before = text[:start].split()[-NEGATION_WINDOW:]
+            if CLAUSE_BREAK in before:
+                before = before[len(before) - before[::-1].index(CLAUSE_BREAK):]
+            if NEGATIONS.intersection(before):
+                negated.append(phrase)
+                continue
+            phrases.append(phrase)
+            found.update(features)
+        answers = {f: 1 if f in found else 0 for f in FEATURES}
+        critical = {
+            'unconsciousness': answers['unconsciousness'],
+            'shortness_of_breath': answers['shortness_of_breath'],
+            'bleeding_trauma': 1 if answers['bleeding'] or answers['trauma'] else 0,
+        }
+        emergency = bool(found & EMERGENCY_FEATURES) or any(a in found and b in found for a, b in EMERGENCY_PAIRS)
+        return {'answers': answers, 'critical': critical, 'symptoms': [f for f in FEATURES if f in found],
+                'phrases': phrases, 'negated': negated, 'emergency': emergency}
@@ -0,0 +1,194 @@
+"""
+Isochrones and response-time coverage analysis.
+
+An isochrone is the set of road nodes reachable from an origin within T
+minutes for a given traffic bucket, computed with a bounded one-to-all
+search. Results are cached per (origin node, bucket, minutes) and dropped
+when edge weights change (traffic update or road closure). Large origin
+sets are fanned out over a process pool whose workers each hold their own
+routing engine, loaded from disk; once the parent's weights have moved on
+from the saved ones (live speed updates, closures) misses are computed
+in-process instead.
+
+Coverage is measured against populated localities from gazetteer.csv: a
+locality counts as covered if any origin reaches its nearest road node in
+time. Using only available units as origins shows live coverage gaps as
+vehicles go en route.
+
+Run from the repository root:
+    python -m triage.isochrones --minutes 8 --at 18:30
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from triage.traffic import bucket_for
+
+RESPONSE_TARGET_MIN = 8.0
+LOADED_METRIC_VERSION = (0, 0)      # metric_version of an engine fresh from disk, as pool workers hold
+
+_worker_engine = None
+
+
+def _init_worker():
+    """Process-pool initializer: build one routing engine per worker"""
+    global _worker_engine
+    from triage.routing import load_default_engine
+    _worker_engine = load_default_engine()
+
+
+def _reachable_nodes(engine, origin_node, max_seconds, bucket):
+    reached = engine.one_to_many(origin_node, max_seconds=max_seconds, bucket=bucket)
+    return np.fromiter(reached.keys(), dtype=np.int32, count=len(reached))
+
+
+def _pool_task(args):
+    origin_node, max_seconds, bucket = args
+    return origin_node, _reachable_nodes(_worker_engine, origin_node, max_seconds, bucket)
+
+
+class IsochroneCache:
+    """Reachable-node sets per (origin node, bucket, minutes)"""
+
+    def __init__(self, engine, max_entries=4096):
+        self.engine = engine
+        self.max_entries = max_entries
+        self._entries = {}
+        self._version = engine.metric_version
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self):
+        if self.engine.metric_version != self._version:
+            self._entries.clear()
+            self._version = self.engine.metric_version
+
+    def get_many(self, origin_nodes, minutes, bucket, executor=None):
+        """{origin node: int32 array of reachable nodes}, computing misses"""
+        self._check_version()
+        result = {}
+        missing = []
+        for node in dict.fromkeys(origin_nodes):
+            cached = self._entries.get((node, bucket, minutes))
+            if cached is None:
+                missing.append(node)
+            else:
+                self.hits += 1
+                result[node] = cached
+        self.misses += len(missing)
+
+        max_seconds = minutes * 60.0
+        # Workers only know the on-disk weights; results from them would be cached
+        # under the parent's version, so use the pool only while the two agree
+        pooled = executor is not None and self.engine.metric_version == LOADED_METRIC_VERSION
+        if pooled and len(missing) > 1:
+            tasks = [(node, max_seconds, bucket) for node in missing]
+            computed = dict(executor.map(_pool_task, tasks))
+        else:
+            computed = {node: _reachable_nodes(self.engine, node, max_seconds, bucket) for node in missing}
+
+        if len(self._entries) + len(computed) > self.max_entries:
+            self._entries.clear()
+        for node, reached in computed.items():
+            self._entries[(node, bucket, minutes)] = reached
+            result[node] = reached
+        return result
+
+
+def make_pool(workers=None):
+    """Process pool whose workers each load the routing engine once"""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+
+def population_nodes(engine, geocoder):
+    """Snap in-area gazetteer localities to road nodes: [(name, node, population)]"""
+    out = []
+    for place in geocoder.places:
+        if place.get('population', 0) <= 0:
+            continue
+        if not geocoder.in_service_area(place['lat'], place['lon']):
+            continue
+        out.append((place['name'], engine.graph.nearest_node(place['lat'], place['lon']), place['population']))
+    return out
+
+
+def coverage_report(engine, cache, origins, localities, minutes=RESPONSE_TARGET_MIN,
+                    when=None, executor=None):
+    """
+    Population coverage within `minutes` from origins [(id, lat, lon)].
+
+    Returns covered population share, the uncovered localities (largest
+    first) and how many localities each origin covers.
+    """
+    bucket = bucket_for(when)
+    origin_nodes = {oid: engine.graph.nearest_node(lat, lon) for oid, lat, lon in origins}
+    reach = cache.get_many(list(origin_nodes.values()), minutes, bucket, executor)
+
+    covered_mask = np.zeros(engine.graph.n_nodes, dtype=bool)
+    for reached in reach.values():
+        covered_mask[reached] = True
+
+    total = sum(pop for _, _, pop in localities) or 1
+    covered = [(name, pop) for name, node, pop in localities if covered_mask[node]]
+    gaps = sorted(((name, pop) for name, node, pop in localities if not covered_mask[node]),
+                  key=lambda item: -item[1])
+    per_origin = {}
+    for oid, node in origin_nodes.items():
+        mask = np.zeros(engine.graph.n_nodes, dtype=bool)
+        mask[reach[node]] = True
+        per_origin[oid] = sum(1 for _, n, _ in localities if mask[n])
+
+    return {
+        'minutes': minutes,
+        'bucket': bucket,
+        'origins': len(origins),
+        'population_pct': 100.0 * sum(pop for _, pop in covered) / total,
+        'localities_covered': len(covered),
+        'localities_total': len(localities),
+        'gaps': gaps,
+        'per_origin': per_origin,
+    }
+
+
+def main():
+    from triage.fleet import load_ambulances
+    from triage.geocoder import build_geocoder
+    from triage.routing import load_default_engine
+
+    parser = argparse.ArgumentParser(description="Response-time coverage report")
+    parser.add_argument("--minutes", type=float, default=RESPONSE_TARGET_MIN)
+    parser.add_argument("--at", default=None, help="time of day HH:MM (default: now)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    when = None
+    if args.at:
+        hh, mm = args.at.split(":")
+        when = int(hh) * 60 + int(mm)
+
+    engine = load_default_engine()
+    cache = IsochroneCache(engine)
+    localities = population_nodes(engine, build_geocoder())
+    ambulances = load_ambulances()
+
+    with make_pool(args.workers) as pool:
+        for label, units in (
+            ("All units (station coverage)", ambulances),
+            ("Available units (live coverage)", [a for a in ambulances if a.get('state') == 'available']),
+        ):
+            report = coverage_report(
+                engine, cache, [(a['id'], a['lat'], a['lon']) for a in units],
+                localities, args.minutes, when, pool,
+            )
+            print(f"\n{label}: {report['origins']} origins, {args.minutes:g}-minute target")
+            print(f"  Population covered: {report['population_pct']:.1f}% "
+                  f"({report['localities_covered']}/{report['localities_total']} localities)")
+            if report['gaps']:
+                print("  Gaps: " + ", ".join(f"{name} ({pop:,})" for name, pop in report['gaps'][:10]))
+    print(f"\nIsochrone cache: {cache.hits} hits, {cache.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
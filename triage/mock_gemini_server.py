@@ -0,0 +1,287 @@
+"""
+Local stand-in for the Gemini REST API.
+
+Answers generateContent with a canned or scripted reply after a latency
+drawn from a configurable distribution, streams the same reply chunk by
+chunk for streamGenerateContent (SSE), and injects 503/429 failures at given
+rates, in periodic 429 bursts or above a requests-per-second quota, so
+retry, backoff and admission behaviour can be measured without network
+access or an API key. With a fixed seed and latency the replies are
+deterministic, for repeatable chatbot runs. An optional per-KB prefill delay makes long
+prompts slower, as with a real model. Each new connection pays a simulated
+TCP+TLS handshake delay and is counted, which shows whether clients reuse
+connections.
+
+Run from the repository root:
+    python -m triage.mock_gemini_server --port 8790 --latency-ms 300 --error-rate 0.05
+and point the chatbot at it:
+    GEMINI_BASE_URL=http://127.0.0.1:8790/v1beta streamlit run index.py
+
+A script is a JSON list of rules tried in order against the last user
+message; a rule without "match" is the default:
+    [{"match": "chest pain", "reply": "Call 108 now.", "latency_ms": 50},
+     {"match": "overload", "status": 503},
+     {"reply": "Generic answer to: {question}"}]
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockState:
+    """Behaviour knobs and counters shared by all handler threads"""
+
+    def __init__(self, latency_ms=200.0, jitter_ms=50.0, error_rate=0.0, rate_limit_rate=0.0,
+                 retry_after_s=None, handshake_ms=0.0, chunk_ms=0.0, chunk_words=4, prefill_ms_per_kb=0.0,
+                 quota_per_s=None, latency_dist="normal", burst_every_s=None, burst_len_s=0.0, script=None,
+                 seed=0):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.burst_every_s = burst_every_s
+        self.burst_len_s = burst_len_s
+        self.started = time.monotonic()
+        self.script = [dict(rule, pattern=re.compile(rule["match"], re.I) if "match" in rule else None)
+                       for rule in (script or [])]
+        self.quota_per_s = quota_per_s
+        self.recent = deque()       # arrival times within the last second (quota)
+        self.prefill_ms_per_kb = prefill_ms_per_kb
+        self.chunk_ms = chunk_ms
+        self.chunk_words = chunk_words
+        self.handshake_ms = handshake_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_s = retry_after_s
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {'connections': 0, 'requests': 0, 'ok': 0, 'http_503': 0, 'http_429': 0}
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def over_quota(self):
+        """Sliding one-second window, like a per-project requests-per-second quota"""
+        if self.quota_per_s is None:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and now - self.recent[0] > 1.0:
+                self.recent.popleft()
+            if len(self.recent) >= self.quota_per_s:
+                return True
+            self.recent.append(now)
+            return False
+
+    def in_burst(self):
+        """Inside one of the periodic windows where every request is rate limited"""
+        if not self.burst_every_s:
+            return False
+        return (time.monotonic() - self.started) % self.burst_every_s < self.burst_len_s
+
+    def rule_for(self, question):
+        """First script rule matching the question, or None"""
+        for rule in self.script:
+            if rule["pattern"] is None or rule["pattern"].search(question):
+                return rule
+        return None
+
+    def sample_latency_ms(self, base):
+        """normal: mean/std dev; lognormal: median with jitter/latency as shape; exponential: mean"""
+        if self.latency_dist == "fixed":
+            return base
+        if self.latency_dist == "lognormal":
+            return base * math.exp(self.rng.gauss(0.0, self.jitter_ms / base if base else 0.0))
+        if self.latency_dist == "exponential":
+            return self.rng.expovariate(1.0 / base) if base else 0.0
+        return max(0.0, self.rng.gauss(base, self.jitter_ms))
+
+    def draw(self, request_bytes=0, rule=None):
+        """(status, delay seconds) for the next request"""
+        if self.over_quota() or self.in_burst():
+            return 429, 0.005
+        base = rule.get("latency_ms", self.latency_ms) if rule else self.latency_ms
+        with self.lock:
+            roll = self.rng.random()
+            delay = self.sample_latency_ms(base) / 1000.0
+        # Prompt processing grows with the size of the request
+        delay += request_bytes / 1024.0 * self.prefill_ms_per_kb / 1000.0
+        if roll < self.rate_limit_rate:
+            return 429, 0.005
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 503, delay / 4
+        if rule and rule.get("status", 200) != 200:
+            return rule["status"], delay
+        return 200, delay
+
+
+def last_question(contents):
+    last = next((c for c in reversed(contents) if c.get("role") == "user"), None)
+    return last["parts"][0]["text"] if last else ""
+
+
+def mock_reply(contents, rule=None):
+    """Scripted reply if a rule matched, else a canned answer echoing the last user message"""
+    question = last_question(contents)
+    if rule and "reply" in rule:
+        return rule["reply"].replace("{question}", question)
+    return (f"(mock) For \"{question[:80]}\": stay calm, keep the person safe and comfortable, "
+            "and call 108 immediately if symptoms are severe or getting worse.")
+
+
+def load_script(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def split_chunks(text, words):
+    """Reply split into chunks of `words` words, as a model would stream it"""
+    parts = text.split(" ")
+    return [" ".join(parts[i:i + words]) + (" " if i + words < len(parts) else "")
+            for i in range(0, len(parts), words)]
+
+
+def make_handler(state):
+    """Request handler bound to a MockState"""
+
+    class MockGeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True   # headers and body go out in separate writes
+
+        def setup(self):
+            super().setup()
+            state.count('connections')
+            time.sleep(state.handshake_ms / 1000.0)
+
+        def handle(self):
+            try:
+                super().handle()
+            except ConnectionResetError:
+                pass   # a client dropped an idle keep-alive connection
+
+        def _reply(self, code, body, headers=None):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            state.count('requests')
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._reply(400, {'error': {'message': 'invalid JSON'}})
+            streaming = ":streamGenerateContent" in self.path
+            if not streaming and ":generateContent" not in self.path:
+                return self._reply(404, {'error': {'message': 'not found'}})
+
+            contents = payload.get("contents", [])
+            rule = state.rule_for(last_question(contents))
+            status, delay = state.draw(length, rule)
+            time.sleep(delay)
+            if status == 429:
+                state.count('http_429')
+                headers = {"Retry-After": str(state.retry_after_s)} if state.retry_after_s else None
+                return self._reply(429, {'error': {'message': 'rate limited'}}, headers)
+            if status != 200:
+                state.count(f'http_{status}')
+                return self._reply(status, {'error': {'message': 'unavailable' if status == 503 else 'scripted error'}})
+
+            state.count('ok')
+            chunks = split_chunks(mock_reply(contents, rule), state.chunk_words)
+            if streaming:
+                try:
+                    return self._stream(chunks)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (deadline) while the reply was being generated
+                    self.close_connection = True
+                    return
+            # Unary replies arrive only once the whole answer is generated
+            time.sleep((len(chunks) - 1) * state.chunk_ms / 1000.0)
+            self._reply(200, {'candidates': [{'content': {'role': 'model', 'parts': [{'text': "".join(chunks)}]}}]})
+
+        def _stream(self, chunks):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i, text in enumerate(chunks):
+                if i:
+                    time.sleep(state.chunk_ms / 1000.0)
+                event = {'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}}]}
+                self._write_chunk(f"data: {json.dumps(event)}\r\n\r\n".encode())
+            self._write_chunk(b"")
+
+        def _write_chunk(self, data):
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+        def do_GET(self):
+            if self.path == "/stats":
+                return self._reply(200, state.counts)
+            self._reply(404, {'error': {'message': 'not found'}})
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockGeminiHandler
+
+
+def start(state, host="127.0.0.1", port=0):
+    """Serve in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1beta"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in Gemini API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="mean (median for lognormal)")
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--latency-dist", default="normal", choices=["normal", "lognormal", "exponential", "fixed"])
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of 503 replies")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of 429 replies")
+    parser.add_argument("--handshake-ms", type=float, default=0.0, help="delay per new connection")
+    parser.add_argument("--chunk-ms", type=float, default=0.0, help="generation time per streamed chunk")
+    parser.add_argument("--quota-per-s", type=float, default=None, help="429 above this many requests/s")
+    parser.add_argument("--burst-every-s", type=float, default=None, help="start a 429 burst this often")
+    parser.add_argument("--burst-len-s", type=float, default=0.0, help="length of each 429 burst")
+    parser.add_argument("--retry-after-s", type=int, default=None, help="Retry-After sent with 429s")
+    parser.add_argument("--script", help="JSON file of scripted replies")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--prefill-ms-per-kb", type=float, default=0.0, help="prompt processing time per KB")
+    args = parser.parse_args()
+
+    state = MockState(args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate,
+                      retry_after_s=args.retry_after_s, handshake_ms=args.handshake_ms, chunk_ms=args.chunk_ms,
+                      prefill_ms_per_kb=args.prefill_ms_per_kb, quota_per_s=args.quota_per_s,
+                      latency_dist=args.latency_dist, burst_every_s=args.burst_every_s,
+                      burst_len_s=args.burst_len_s, script=load_script(args.script) if args.script else None,
+                      seed=args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"🤖 Mock Gemini listening on http://{args.host}:{args.port}/v1beta")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Shared emergency queue, system stats and fleet counters.
+
+The patient portal appends calls and the technician dashboard dispatches
+them; both go through the transitions below so the JSON files stay
+consistent. The transitions work on plain lists/dicts, which lets the
+simulator drive the same logic in memory without touching the files.
+Writers apply them through update_queue(), which holds a file lock across
+the read-modify-write of both files.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:     # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+QUEUE_FILE = "emergency_queue.json"
+STATS_FILE = "system_stats.json"
+FLEET_FILE = "fleet_status.json"
+
+PRIORITY_ORDER = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+
+DEFAULT_STATS = {
+    'calls_today': 0,
+    'dispatched': 0,
+    'avg_response': 8.5,
+    'success_rate': 95
+}
+
+DEFAULT_FLEET = {
+    'total': 10,
+    'available': 8,
+    'en_route': 0,
+    'maintenance': 2
+}
+
+
+# ---------------- files ----------------
+def _load_json(path, default):
+    try:
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+        return default
+    except:
+        return default
+
+
+def _save_json(data, path):
+    # Write a sibling file and swap it in, so readers never see a half-written store
+    # (per thread too: Streamlit sessions of one process save concurrently)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def file_version(path):
+    """Change token of a store file: (mtime_ns, size), or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_queue(path=QUEUE_FILE):
+    """Load queue from file"""
+    return _load_json(path, [])
+
+
+def save_queue(queue, path=QUEUE_FILE):
+    """Save queue to file without duplicates"""
+    seen = set()
+    unique_queue = []
+    for entry in queue:
+        entry_id = entry.get("id") or entry.get("name")
+        if entry_id not in seen:
+            unique_queue.append(entry)
+            seen.add(entry_id)
+    _save_json(unique_queue, path)
+
+
+def load_stats(path=STATS_FILE):
+    """Load stats from file"""
+    return _load_json(path, dict(DEFAULT_STATS))
+
+
+def save_stats(stats, path=STATS_FILE):
+    """Save stats to file"""
+    _save_json(stats, path)
+
+
+@contextmanager
+def _store_lock(path):
+    """Exclusive advisory lock shared by every process that rewrites a store file"""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def update_queue(change, path=QUEUE_FILE, stats_path=STATS_FILE):
+    """
+    Read-modify-write of the queue and stats under the queue lock.
+
+    `change(queue, stats)` edits the freshly loaded queue and stats in place
+    and returns a truthy value if they should be saved; that value is
+    returned. The API flusher, the patient portal, bulk imports and the
+    technician dashboard all write both files, and without the lock
+    whichever saved last dropped the others' calls or dispatches.
+    """
+    with _store_lock(path):
+        queue = load_queue(path)
+        stats = load_stats(stats_path)
+        result = change(queue, stats)
+        if result:
+            save_queue(queue, path)
+            save_stats(stats, stats_path)
+        return result
+
+
+def load_fleet_status(path=FLEET_FILE):
+    """Load fleet status from file"""
+    return _load_json(path, dict(DEFAULT_FLEET))
+
+
+def save_fleet_status(fleet, path=FLEET_FILE):
+    """Save fleet status to file"""
+    _save_json(fleet, path)
+
+
+# ---------------- transitions ----------------
+def queue_sort_key(entry):
+    """Dispatch order: priority first, then highest severity score"""
+    return PRIORITY_ORDER[entry['priority']], -entry['severity_score']
+
+
+def sorted_queue(queue):
+    """Queue in dispatch order"""
+    return sorted(queue, key=queue_sort_key)
+
+
+def record_call(queue, stats, request):
+    """Append a new request once; returns False if its id is already queued"""
+    request_id = request['id']
+    if any(entry.get('id') == request_id for entry in queue):
+        return False
+    queue.append(request)
+    stats['calls_today'] += 1
+    return True
+
+
+def record_calls(queue, stats, requests):
+    """Append a batch of new requests, skipping ids already queued; returns how many were added"""
+    seen = {entry.get('id') for entry in queue}
+    added = 0
+    for request in requests:
+        if request['id'] in seen:
+            continue
+        queue.append(request)
+        seen.add(request['id'])
+        added += 1
+    stats['calls_today'] += added
+    return added
+
+
+def record_dispatch(queue, stats, fleet, patient_id):
+    """One unit leaves for a patient: count it and drop the patient from the queue; False if none was available"""
+    if fleet['available'] <= 0:
+        return False
+    stats['dispatched'] += 1
+    fleet['available'] -= 1
+    fleet['en_route'] += 1
+    queue[:] = [p for p in queue if p['id'] != patient_id]
+    return True
+
+
+def record_completion(fleet):
+    """An en-route unit is back in service; returns False if none was en route"""
+    if fleet['en_route'] <= 0:
+        return False
+    fleet['en_route'] -= 1
+    fleet['available'] += 1
+    return True
+
+
+def record_maintenance(fleet):
+    """An available unit goes to maintenance; returns False if none was available"""
+    if fleet['available'] <= 0:
+        return False
+    fleet['available'] -= 1
+    fleet['maintenance'] += 1
+    return True
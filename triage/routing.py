@@ -0,0 +1,496 @@
+"""
+Road graph and shortest-path routing for ambulance ETAs.
+
+The graph topology is stored once in CSR form (indptr / heads / edge ids),
+independent of any metric. Travel-time weights come from TrafficProfiles
+and are swapped per 15-minute bucket, so switching the active time of day
+costs one cached list lookup instead of a graph rebuild. Time-dependent
+searches read the bucket in force when the vehicle reaches each edge.
+
+Point-to-point routes and one-to-all ETA rows are memoized in bounded LRU
+caches that are dropped whenever the metric changes; both are shared by
+the Streamlit sessions of a process, so every access takes the cache lock.
+"""
+
+import heapq
+import math
+import os
+import random
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from triage.spatial_index import GridIndex, KM_PER_DEG_LAT
+from triage.traffic import BUCKET_MINUTES, BUCKETS_PER_DAY, TrafficProfiles, bucket_for
+
+ROAD_NETWORK_FILE = "road_network.npz"
+TRAFFIC_PROFILE_FILE = "traffic_profiles.npz"
+
+# Free-flow ambulance speeds by road class (0 = arterial, 1 = local)
+FREE_FLOW_KMH = {0: 45.0, 1: 25.0}
+
+ROUTE_CACHE_SIZE = 20_000
+ROW_CACHE_SIZE = 256        # one-to-all rows: n_nodes float32 each
+# OrderedDict keeps a linked-list node per key (key, hash, prev/next pointers)
+# that sys.getsizeof does not report
+ODICT_NODE_BYTES = 48
+
+
+class RoadGraph:
+    """Directed road graph with node coordinates and CSR adjacency"""
+
+    def __init__(self, node_lat, node_lon, edge_src, edge_dst, length_m, road_class):
+        self.node_lat = np.asarray(node_lat, dtype=float)
+        self.node_lon = np.asarray(node_lon, dtype=float)
+        edge_src = np.asarray(edge_src, dtype=np.int32)
+        edge_dst = np.asarray(edge_dst, dtype=np.int32)
+
+        # Sort edges by tail so each node's out-edges are contiguous
+        order = np.argsort(edge_src, kind='stable')
+        self.edge_src = edge_src[order]
+        self.edge_dst = edge_dst[order]
+        self.length_m = np.asarray(length_m, dtype=float)[order]
+        self.road_class = np.asarray(road_class, dtype=np.uint8)[order]
+        self.indptr = np.zeros(self.n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.edge_src, minlength=self.n_nodes), out=self.indptr[1:])
+
+        speeds = np.where(self.road_class == 0, FREE_FLOW_KMH[0], FREE_FLOW_KMH[1])
+        self.free_flow_s = self.length_m / 1000.0 / speeds * 3600.0
+
+        # Python-list mirrors: element access in the search loop is much
+        # cheaper on lists than on NumPy arrays
+        self._indptr = self.indptr.tolist()
+        self._heads = self.edge_dst.tolist()
+        self._lengths = self.length_m.tolist()
+
+        self._node_index = GridIndex(cell_deg=0.005)
+        for node, (lat, lon) in enumerate(zip(self.node_lat.tolist(), self.node_lon.tolist())):
+            self._node_index.upsert(node, lat, lon)
+
+    @property
+    def n_nodes(self):
+        return len(self.node_lat)
+
+    @property
+    def n_edges(self):
+        return len(self.edge_dst)
+
+    @classmethod
+    def load(cls, path):
+        """Load a graph saved with save()"""
+        with np.load(path) as data:
+            return cls(data['node_lat'], data['node_lon'], data['edge_src'],
+                       data['edge_dst'], data['length_m'], data['road_class'])
+
+    def save(self, path):
+        """Save the graph as a compressed .npz"""
+        np.savez_compressed(
+            path, node_lat=self.node_lat, node_lon=self.node_lon, edge_src=self.edge_src,
+            edge_dst=self.edge_dst, length_m=self.length_m, road_class=self.road_class,
+        )
+
+    def out_edges(self, node):
+        """Range of edge ids leaving a node"""
+        return range(self._indptr[node], self._indptr[node + 1])
+
+    def nearest_node(self, lat, lon):
+        """Snap a coordinate to the closest graph node"""
+        found = self._node_index.nearest(lat, lon, k=1)
+        return found[0][1] if found else None
+
+    def nearest_nodes(self, lat, lon, k=3, max_km=None):
+        """Up to k (distance_km, node) candidates near a coordinate"""
+        return self._node_index.nearest(lat, lon, k=k, max_km=max_km)
+
+    def network_distances(self, source, targets, max_m):
+        """Road distance in metres from source to each target within max_m"""
+        indptr, heads, lengths = self._indptr, self._heads, self._lengths
+        remaining = set(targets)
+        found = {}
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap and remaining:
+            d, u = heapq.heappop(heap)
+            if d > dist.get(u, math.inf):
+                continue
+            if u in remaining:
+                remaining.discard(u)
+                found[u] = d
+            for e in range(indptr[u], indptr[u + 1]):
+                nd = d + lengths[e]
+                v = heads[e]
+                if nd <= max_m and nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return found
+
+
+def build_synthetic_city(center_lat=21.1458, center_lon=79.0882, radius_km=20.0,
+                         spacing_km=0.5, arterial_every=4, seed=0):
+    """
+    Lattice road network covering a circular service area.
+
+    Every `arterial_every`-th row and column is an arterial road; the rest are
+    local streets. Node positions are jittered so routes are not all ties.
+    Used until a real road extract is supplied.
+    """
+    rng = random.Random(seed)
+    dlat = spacing_km / KM_PER_DEG_LAT
+    dlon = spacing_km / (KM_PER_DEG_LAT * math.cos(math.radians(center_lat)))
+    steps = int(radius_km / spacing_km)
+
+    ids = {}
+    lats, lons = [], []
+    for i in range(-steps, steps + 1):
+        for j in range(-steps, steps + 1):
+            if math.hypot(i, j) * spacing_km > radius_km:
+                continue
+            ids[(i, j)] = len(lats)
+            lats.append(center_lat + i * dlat + rng.uniform(-0.15, 0.15) * dlat)
+            lons.append(center_lon + j * dlon + rng.uniform(-0.15, 0.15) * dlon)
+
+    src, dst, length, klass = [], [], [], []
+    for (i, j), a in ids.items():
+        for di, dj in ((1, 0), (0, 1)):
+            b = ids.get((i + di, j + dj))
+            if b is None:
+                continue
+            arterial = (i % arterial_every == 0) if di == 0 else (j % arterial_every == 0)
+            metres = 1000.0 * math.hypot(
+                (lats[a] - lats[b]) * KM_PER_DEG_LAT,
+                (lons[a] - lons[b]) * KM_PER_DEG_LAT * math.cos(math.radians(center_lat)),
+            )
+            for u, v in ((a, b), (b, a)):
+                src.append(u)
+                dst.append(v)
+                length.append(metres)
+                klass.append(0 if arterial else 1)
+    return RoadGraph(lats, lons, src, dst, length, klass)
+
+
+class RouteCache:
+    """
+    Bounded LRU of point-to-point routes keyed on (origin, destination, bucket).
+
+    Paths are stored as the first node id plus an array of node-id deltas,
+    narrowed to int16 when they fit (neighbouring nodes usually have nearby
+    ids). Entries carry the metric version they were computed under and the
+    whole cache is dropped when traffic profiles or closures change.
+    """
+
+    def __init__(self, capacity=ROUTE_CACHE_SIZE):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def encode(path):
+        """(first node, delta array) for a node path"""
+        if not path:
+            return -1, np.zeros(0, dtype=np.int16)
+        deltas = np.diff(np.asarray(path, dtype=np.int64))
+        if deltas.size and (deltas.min() < -32768 or deltas.max() > 32767):
+            return path[0], deltas.astype(np.int32)
+        return path[0], deltas.astype(np.int16)
+
+    @staticmethod
+    def decode(first, deltas):
+        """Node path from (first node, delta array)"""
+        if first < 0:
+            return []
+        return np.concatenate(([first], first + np.cumsum(deltas, dtype=np.int64))).tolist()
+
+    def check_version(self, version):
+        """Drop every entry if the metric changed since they were cached"""
+        with self._lock:
+            if version != self.version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.version = version
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """(seconds, path) for a cached route, or None"""
+        entry = self._get(key)
+        if entry is None:
+            return None
+        seconds, first, deltas = entry
+        return seconds, self.decode(first, deltas)
+
+    def put(self, key, seconds, path):
+        """Store a route, evicting the least recently used entry if full"""
+        first, deltas = self.encode(path)
+        self._put(key, (seconds, first, deltas))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _entry_bytes(self, key, entry):
+        seconds, first, deltas = entry
+        # Key and value tuples, their scalars, the delta array with its header
+        return (sys.getsizeof(key) + sys.getsizeof(entry) + sys.getsizeof(seconds)
+                + sys.getsizeof(first) + sys.getsizeof(deltas))
+
+    def memory_bytes(self):
+        """Approximate memory held by cached entries"""
+        with self._lock:
+            entries = list(self._entries.items())
+        total = sys.getsizeof(self._entries)
+        for key, entry in entries:
+            total += self._entry_bytes(key, entry) + ODICT_NODE_BYTES
+        return total
+
+    def stats(self):
+        """Hit ratio, size and memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'memory_bytes': self.memory_bytes(),
+        }
+
+
+class RowCache(RouteCache):
+    """
+    Bounded LRU of one-to-all travel times keyed on (origin node, bucket).
+
+    A row holds float32 seconds to every node (inf if unreachable), so any
+    set of destinations is answered from one search per origin and bucket,
+    which is how the dispatcher asks: each unit against a changing queue.
+    """
+
+    def __init__(self, capacity=ROW_CACHE_SIZE):
+        super().__init__(capacity)
+
+    def get(self, key):
+        """Cached row of seconds, or None"""
+        return self._get(key)
+
+    def put(self, key, row):
+        """Store a row, evicting the least recently used one if full"""
+        self._put(key, row)
+
+    def _entry_bytes(self, key, row):
+        return sys.getsizeof(key) + sys.getsizeof(row)
+
+
+class RoutingEngine:
+    """Shortest-path queries over a RoadGraph with time-of-day weights"""
+
+    def __init__(self, graph, profiles=None, route_cache_size=ROUTE_CACHE_SIZE, row_cache_size=ROW_CACHE_SIZE):
+        self.graph = graph
+        self.profiles = profiles or TrafficProfiles.from_free_flow(graph.free_flow_s, graph.road_class)
+        if self.profiles.n_edges != graph.n_edges:
+            raise ValueError("traffic profiles do not match the road graph")
+        self.route_cache = RouteCache(route_cache_size)
+        self.row_cache = RowCache(row_cache_size)
+        self._closed = set()
+        self._closure_version = 0
+        self._closed_weights = {}
+        self._closed_key = None
+        self.bucket = None
+        self.set_bucket(bucket_for())
+
+    @property
+    def metric_version(self):
+        """Changes whenever edge weights change (profile update or closure)"""
+        return (self.profiles.version, self._closure_version)
+
+    @property
+    def weights(self):
+        """Edge weights for the active bucket"""
+        return self._weights_for(self.bucket)
+
+    def _weights_for(self, bucket):
+        """Edge weights for a bucket with road closures applied"""
+        if not self._closed:
+            return self.profiles.weights(bucket)
+        if self._closed_key != self.metric_version:
+            self._closed_weights.clear()
+            self._closed_key = self.metric_version
+        w = self._closed_weights.get(bucket)
+        if w is None:
+            w = list(self.profiles.weights(bucket))
+            for e in self._closed:
+                w[e] = math.inf
+            self._closed_weights[bucket] = w
+        return w
+
+    def close_edges(self, edge_ids):
+        """Mark edges impassable (road closure)"""
+        self._closed.update(int(e) for e in edge_ids)
+        self._closure_version += 1
+
+    def reopen_edges(self, edge_ids=None):
+        """Lift closures on some edges, or all of them"""
+        if edge_ids is None:
+            self._closed.clear()
+        else:
+            self._closed.difference_update(int(e) for e in edge_ids)
+        self._closure_version += 1
+
+    def set_bucket(self, bucket):
+        """Re-weight the search for a 15-minute bucket (no graph rebuild)"""
+        self.bucket = bucket % BUCKETS_PER_DAY
+        self._weights_for(self.bucket)
+
+    def set_departure_time(self, when):
+        """Re-weight the search for the bucket containing a departure time"""
+        self.set_bucket(bucket_for(when))
+
+    def _search(self, source, targets=None, max_seconds=None, bucket=None,
+                depart_minute=None, want_paths=False):
+        """
+        Dijkstra from one source. With depart_minute set, each edge is costed
+        with the bucket in force when the vehicle reaches it.
+        """
+        graph = self.graph
+        indptr, heads = graph._indptr, graph._heads
+        static_w = self._weights_for(self.bucket if bucket is None else bucket % BUCKETS_PER_DAY)
+        remaining = set(targets) if targets is not None else None
+
+        w, w_bucket = static_w, None
+        dist = {source: 0.0}
+        parent = {source: -1} if want_paths else None
+        heap = [(0.0, source)]
+        done = set()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    break
+            if depart_minute is None:
+                w = static_w
+            else:
+                b = int((depart_minute + d / 60.0) // BUCKET_MINUTES) % BUCKETS_PER_DAY
+                if b != w_bucket:
+                    w, w_bucket = self._weights_for(b), b
+            for e in range(indptr[u], indptr[u + 1]):
+                v = heads[e]
+                nd = d + w[e]
+                if max_seconds is not None and nd > max_seconds:
+                    continue
+                if nd < dist.get(v, math.inf):
+                    dist[v] = nd
+                    if want_paths:
+                        parent[v] = u
+                    heapq.heappush(heap, (nd, v))
+        settled = {node: dist[node] for node in done}
+        return settled, parent
+
+    def one_to_many(self, source, targets=None, max_seconds=None, bucket=None, depart_minute=None):
+        """Travel seconds from source to each reached node (or just `targets`)"""
+        settled, _ = self._search(source, targets, max_seconds, bucket, depart_minute)
+        if targets is None:
+            return settled
+        return {t: settled[t] for t in targets if t in settled}
+
+    def shortest_path(self, source, target, bucket=None, depart_minute=None):
+        """(seconds, node list) for the fastest route, or (inf, []) if unreachable"""
+        settled, parent = self._search(source, [target], None, bucket, depart_minute, want_paths=True)
+        if target not in settled:
+            return math.inf, []
+        path = [target]
+        while parent[path[-1]] != -1:
+            path.append(parent[path[-1]])
+        path.reverse()
+        return settled[target], path
+
+    def route(self, source, target, depart_at=None):
+        """
+        Cached (seconds, node list) for a trip leaving at depart_at, keyed on
+        the snapped nodes and the departure's traffic bucket.
+        """
+        self.route_cache.check_version(self.metric_version)
+        minute = _minute_of_day(depart_at)
+        key = (source, target, int(minute // BUCKET_MINUTES) % BUCKETS_PER_DAY)
+        cached = self.route_cache.get(key)
+        if cached is not None:
+            return cached
+        seconds, path = self.shortest_path(source, target, depart_minute=minute)
+        self.route_cache.put(key, seconds, path)
+        return seconds, path
+
+    def eta_minutes(self, from_latlon, to_latlon, depart_at=None):
+        """Door-to-door ETA in minutes, evaluated at the expected departure time"""
+        source = self.graph.nearest_node(*from_latlon)
+        target = self.graph.nearest_node(*to_latlon)
+        seconds, _ = self.route(source, target, depart_at)
+        return seconds / 60.0
+
+    def travel_row(self, source, bucket):
+        """Cached seconds from source to every node (inf if unreachable), leaving at a bucket's start"""
+        self.row_cache.check_version(self.metric_version)
+        key = (source, bucket)
+        row = self.row_cache.get(key)
+        if row is None:
+            reached = self.one_to_many(source, depart_minute=bucket * BUCKET_MINUTES)
+            row = np.full(self.graph.n_nodes, np.inf, dtype=np.float32)
+            row[np.fromiter(reached.keys(), dtype=np.int64, count=len(reached))] = list(reached.values())
+            self.row_cache.put(key, row)
+        return row
+
+    def eta_matrix_row(self, from_latlon, to_latlons, depart_at=None):
+        """ETAs in minutes from one origin to many destinations (one cached row per origin and bucket)"""
+        source = self.graph.nearest_node(*from_latlon)
+        targets = [self.graph.nearest_node(lat, lon) for lat, lon in to_latlons]
+        bucket = int(_minute_of_day(depart_at) // BUCKET_MINUTES) % BUCKETS_PER_DAY
+        return self.travel_row(source, bucket)[targets].astype(float) / 60.0
+
+
+def load_default_engine(graph_path=ROAD_NETWORK_FILE, profile_path=TRAFFIC_PROFILE_FILE):
+    """Routing engine over the saved road network, or the synthetic city if absent"""
+    if os.path.exists(graph_path):
+        graph = RoadGraph.load(graph_path)
+    else:
+        print("⚠️ Road network file not found. Using synthetic city grid.")
+        graph = build_synthetic_city()
+    profiles = None
+    if os.path.exists(profile_path):
+        profiles = TrafficProfiles.load(profile_path)
+    return RoutingEngine(graph, profiles)
+
+
+def _minute_of_day(when):
+    """Minute of day for a datetime or minute count (None means now)"""
+    if when is None:
+        when = datetime.now()
+    if isinstance(when, datetime):
+        return when.hour * 60 + when.minute + when.second / 60.0
+    return float(when)
@@ -0,0 +1,332 @@
+"""
+Discrete-event simulation of calls, triage and dispatch at city scale.
+
+Calls arrive as a Poisson process whose rate follows a daily profile. Each
+call draws a symptom vector from balanced_emergency_triage_dataset.csv, is
+classified by hybrid_classify_and_prioritize, placed at a gazetteer locality
+weighted by population and recorded with the same queue-store transitions
+the portal and dashboard use. Units are dispatched by the chosen policy on a
+simulated clock (minutes) driven by a heap of events:
+
+    call       -> classify, enqueue, try to dispatch
+    unit free  -> unit back at its station, try to dispatch
+    batch tick -> (batch policy) solve the assignment over the whole queue
+
+Response time is call -> unit on scene (queueing delay + travel ETA).
+
+Run from the repository root:
+    python -m triage.simulator --days 7 --calls-per-day 2000 --fleet 120
+    python -m triage.simulator --policy batch --road
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from triage.classifier import FEATURES, hybrid_classify_and_prioritize
+from triage.dispatch import BatchDispatcher, DEFAULT_SPEED_KMH, ROAD_FACTOR
+from triage.fleet import load_ambulances, build_fleet_index
+from triage.geocoder import build_geocoder
+from triage.queue_store import (
+    DEFAULT_STATS, PRIORITY_ORDER, queue_sort_key, record_call, record_dispatch, record_completion
+)
+from triage.spatial_index import haversine_km
+from triage.traffic import BUCKET_MINUTES, BUCKETS_PER_DAY
+
+DATASET_FILE = "balanced_emergency_triage_dataset.csv"
+
+# Relative call volume per hour of day (mean 1.0): night trough, evening peak
+HOURLY_PROFILE = [
+    0.55, 0.45, 0.40, 0.38, 0.40, 0.50, 0.75, 1.00, 1.15, 1.20, 1.20, 1.15,
+    1.10, 1.10, 1.10, 1.15, 1.20, 1.30, 1.40, 1.35, 1.25, 1.10, 0.90, 0.70,
+]
+
+# Minutes a unit spends after arriving on scene (treatment, transport, handover, return)
+ON_SCENE_MIN = {'HIGH': 20.0, 'MEDIUM': 15.0, 'LOW': 12.0}
+HOSPITAL_TURNAROUND_MIN = 35.0
+
+RESPONSE_TARGET_MIN = {'HIGH': 8.0, 'MEDIUM': 15.0, 'LOW': 30.0}
+
+LOCATION_JITTER_KM = 0.4
+
+# Calls beyond this backlog are diverted to neighbouring services
+MAX_QUEUE = 2000
+
+# Default city-scale run: 2,000 calls a day need about 100 units at the evening peak
+DEFAULT_CALLS_PER_DAY = 2000.0
+DEFAULT_FLEET_SIZE = 120
+
+CALL, UNIT_FREE, BATCH_TICK = 0, 1, 2
+
+
+def load_symptom_vectors(path=DATASET_FILE):
+    """Symptom vectors (n x 10, model column order) from the training dataset"""
+    return pd.read_csv(path, usecols=FEATURES)[FEATURES].to_numpy(dtype=np.int8)
+
+
+def peak_units_busy(calls_per_day):
+    """Units kept busy at the peak hour by a call rate, not counting travel"""
+    busy_min = np.mean(list(ON_SCENE_MIN.values())) + HOSPITAL_TURNAROUND_MIN
+    return calls_per_day / (24 * 60) * max(HOURLY_PROFILE) * busy_min
+
+
+def make_fleet(size=None, ambulances=None):
+    """Roster units able to respond; `size` cycles the stations to scale the fleet"""
+    roster = [a for a in (ambulances or load_ambulances()) if a.get('state') != 'maintenance']
+    if not size:
+        return [dict(a, state='available') for a in roster]
+    return [
+        {'id': f"SIM-{i:04d}", 'station': roster[i % len(roster)]['station'],
+         'lat': roster[i % len(roster)]['lat'], 'lon': roster[i % len(roster)]['lon'],
+         'state': 'available'}
+        for i in range(size)
+    ]
+
+
+class Simulation:
+    """
+    One simulated run: arrival process, queue, fleet and dispatch policy.
+
+    policy is 'nearest' (highest-priority call gets the nearest free unit,
+    the dashboard's default) or 'batch' (BatchDispatcher over the whole
+    queue every `batch_interval` minutes). With `engine`, travel times come
+    from the road graph: one multi-target search per (station, traffic
+    bucket) covers every locality and is kept for the rest of the run.
+    Otherwise straight-line ETA.
+    """
+
+    def __init__(self, units, localities, vectors, calls_per_day, policy='nearest',
+                 engine=None, batch_interval=1.0, max_queue=MAX_QUEUE, seed=0):
+        self.rng = random.Random(seed)
+        self.units = {u['id']: dict(u) for u in units}
+        self.localities = localities
+        self.vectors = [tuple(int(x) for x in row) for row in vectors]
+        self.calls_per_day = calls_per_day
+        self.policy = policy
+        self.engine = engine
+        self.batch_interval = batch_interval
+        self.max_queue = max_queue
+        self.diverted = 0
+
+        self.fleet_index = build_fleet_index(self.units.values())
+        self.queue = []
+        self._order = []  # heap of (queue_sort_key, seq, patient) over self.queue
+        self.stats = dict(DEFAULT_STATS)
+        self.fleet = {'total': len(self.units), 'available': len(self.units), 'en_route': 0, 'maintenance': 0}
+        self.dispatcher = BatchDispatcher(eta_fn=self._batch_eta) if policy == 'batch' else None
+
+        self.events = []
+        self._seq = itertools.count()
+        self.now = 0.0
+        self.response = {p: [] for p in PRIORITY_ORDER}
+        self.waits = {p: [] for p in PRIORITY_ORDER}
+
+        if engine is not None:
+            graph = engine.graph
+            self._station_node = {uid: graph.nearest_node(u['lat'], u['lon']) for uid, u in self.units.items()}
+            self._locality_node = [graph.nearest_node(lat, lon) for _, lat, lon, _ in localities]
+        self._road_tables = {}
+        self._loc_cum = list(itertools.accumulate(pop for _, _, _, pop in localities))
+
+    # ---------------- arrivals ----------------
+    def _schedule(self, at, kind, payload=None):
+        heapq.heappush(self.events, (at, next(self._seq), kind, payload))
+
+    def _next_arrival(self, t):
+        """Next call after t by thinning a Poisson process at the peak hourly rate"""
+        peak = max(HOURLY_PROFILE)
+        rate = self.calls_per_day / (24 * 60) * peak
+        while True:
+            t += self.rng.expovariate(rate)
+            hour = int(t // 60) % 24
+            if self.rng.random() * peak <= HOURLY_PROFILE[hour]:
+                return t
+
+    def _new_call(self, n):
+        loc = self.rng.choices(range(len(self.localities)), cum_weights=self._loc_cum)[0]
+        name, lat, lon, _ = self.localities[loc]
+        answers = dict(zip(FEATURES, self.rng.choice(self.vectors)))
+        diagnosis, priority, severity_score, _ = hybrid_classify_and_prioritize(answers)
+        # Scatter calls around the locality centre
+        jitter = LOCATION_JITTER_KM / 111.2
+        return {
+            'id': n,
+            'location': name,
+            'condition': diagnosis,
+            'priority': priority,
+            'severity_score': severity_score,
+            'lat': lat + self.rng.uniform(-jitter, jitter),
+            'lon': lon + self.rng.uniform(-jitter, jitter),
+            'locality': loc,
+            'called_at': self.now,
+        }
+
+    # ---------------- travel ----------------
+    def travel_min(self, unit, patient):
+        """Travel time in minutes from a unit's station to a patient"""
+        if self.engine is None:
+            km = haversine_km(unit['lat'], unit['lon'], patient['lat'], patient['lon'])
+            return km * ROAD_FACTOR / DEFAULT_SPEED_KMH * 60.0
+        source = self._station_node[unit['id']]
+        bucket = int(self.now // BUCKET_MINUTES) % BUCKETS_PER_DAY
+        table = self._road_tables.get((source, bucket))
+        if table is None:
+            table = self.engine.one_to_many(
+                source, targets=set(self._locality_node), depart_minute=bucket * BUCKET_MINUTES,
+            )
+            self._road_tables[(source, bucket)] = table
+        return table[self._locality_node[patient['locality']]] / 60.0
+
+    def _batch_eta(self, vehicle, patients):
+        return np.array([self.travel_min(vehicle, p) for p in patients], dtype=float)
+
+    # ---------------- dispatch ----------------
+    def _dispatch(self, patient, unit_id, travel):
+        record_dispatch(self.queue, self.stats, self.fleet, patient['id'])
+        self.units[unit_id]['state'] = 'en_route'
+        self.fleet_index.set_state(unit_id, 'en_route')
+        wait = self.now - patient['called_at']
+        self.waits[patient['priority']].append(wait)
+        self.response[patient['priority']].append(wait + travel)
+        busy = travel + self.rng.expovariate(1.0 / ON_SCENE_MIN[patient['priority']]) \
+            + self.rng.expovariate(1.0 / HOSPITAL_TURNAROUND_MIN)
+        self._schedule(self.now + busy, UNIT_FREE, unit_id)
+
+    def _dispatch_nearest(self):
+        while self._order and self.fleet['available'] > 0:
+            _, _, patient = heapq.heappop(self._order)
+            nearest = self.fleet_index.nearest(patient['lat'], patient['lon'], k=1, states=('available',))
+            unit_id = nearest[0][1]
+            self._dispatch(patient, unit_id, self.travel_min(self.units[unit_id], patient))
+
+    def _dispatch_batch(self):
+        if not self.queue or self.fleet['available'] == 0:
+            return
+        self.dispatcher.sync(
+            [u for u in self.units.values() if u['state'] == 'available'], self.queue,
+        )
+        plan = self.dispatcher.solve()
+        by_id = {p['id']: p for p in self.queue}
+        for patient_id, (unit_id, eta_min) in plan.items():
+            self._dispatch(by_id[patient_id], unit_id, eta_min)
+
+    # ---------------- main loop ----------------
+    def run(self, days):
+        """Simulate `days` of calls; returns the number of calls handled"""
+        end = days * 24 * 60
+        self._schedule(self._next_arrival(0.0), CALL)
+        if self.policy == 'batch':
+            self._schedule(self.batch_interval, BATCH_TICK)
+        n_calls = 0
+        while self.events:
+            self.now, _, kind, payload = heapq.heappop(self.events)
+            if kind == CALL:
+                if self.now >= end:
+                    continue
+                patient = self._new_call(n_calls)
+                n_calls += 1
+                self._schedule(self._next_arrival(self.now), CALL)
+                if len(self.queue) >= self.max_queue:
+                    self.diverted += 1
+                    continue
+                record_call(self.queue, self.stats, patient)
+                if self.policy == 'nearest':
+                    heapq.heappush(self._order, (queue_sort_key(patient), patient['id'], patient))
+                    self._dispatch_nearest()
+            elif kind == UNIT_FREE:
+                record_completion(self.fleet)
+                self.units[payload]['state'] = 'available'
+                self.fleet_index.set_state(payload, 'available')
+                if self.policy == 'nearest':
+                    self._dispatch_nearest()
+            elif kind == BATCH_TICK:
+                self._dispatch_batch()
+                if self.now < end or self.queue:
+                    self._schedule(self.now + self.batch_interval, BATCH_TICK)
+        return n_calls
+
+    def report(self):
+        """Response-time distribution per priority"""
+        out = {}
+        for priority, times in self.response.items():
+            if not times:
+                continue
+            arr = np.asarray(times)
+            p50, p90, p95 = np.percentile(arr, [50, 90, 95])
+            out[priority] = {
+                'calls': len(arr),
+                'mean': float(arr.mean()),
+                'p50': float(p50),
+                'p90': float(p90),
+                'p95': float(p95),
+                'max': float(arr.max()),
+                'mean_wait': float(np.mean(self.waits[priority])),
+                'within_target_pct': 100.0 * float((arr <= RESPONSE_TARGET_MIN[priority]).mean()),
+            }
+        return out
+
+
+def service_localities(geocoder):
+    """[(name, lat, lon, population)] for populated places inside the service area"""
+    return [
+        (p['name'], p['lat'], p['lon'], p['population'])
+        for p in geocoder.places
+        if p.get('population', 0) > 0 and geocoder.in_service_area(p['lat'], p['lon'])
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discrete-event dispatch simulation")
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--calls-per-day", type=float, default=DEFAULT_CALLS_PER_DAY)
+    parser.add_argument("--fleet", type=int, default=DEFAULT_FLEET_SIZE,
+                        help="fleet size (0: the ambulances.json roster)")
+    parser.add_argument("--policy", choices=("nearest", "batch"), default="nearest")
+    parser.add_argument("--batch-interval", type=float, default=1.0, help="minutes between batch solves")
+    parser.add_argument("--road", action="store_true", help="road-graph travel times instead of straight line")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = None
+    if args.road:
+        from triage.routing import load_default_engine
+        engine = load_default_engine()
+
+    fleet = make_fleet(args.fleet)
+    busy = peak_units_busy(args.calls_per_day)
+    if busy > len(fleet):
+        print(f"⚠️ {args.calls_per_day:g} calls/day keep about {busy:.0f} units busy at the peak hour, "
+              f"more than the {len(fleet)}-unit fleet: the queue will grow without bound and response "
+              f"times reflect the backlog, not the dispatch policy")
+    sim = Simulation(
+        fleet, service_localities(build_geocoder()), load_symptom_vectors(),
+        args.calls_per_day, policy=args.policy, engine=engine,
+        batch_interval=args.batch_interval, seed=args.seed,
+    )
+    t0 = time.perf_counter()
+    n_calls = sim.run(args.days)
+    elapsed = time.perf_counter() - t0
+
+    print(f"Policy: {args.policy}, fleet: {sim.fleet['total']} units, "
+          f"{args.days:g} day(s), {n_calls:,} calls")
+    print(f"{'Priority':<9}{'calls':>8}{'mean':>8}{'p50':>8}{'p90':>8}{'p95':>8}{'max':>8}{'wait':>8}  on target")
+    for priority, row in sim.report().items():
+        print(f"{priority:<9}{row['calls']:>8,}{row['mean']:>8.1f}{row['p50']:>8.1f}{row['p90']:>8.1f}"
+              f"{row['p95']:>8.1f}{row['max']:>8.1f}{row['mean_wait']:>8.1f}  "
+              f"{row['within_target_pct']:5.1f}% <= {RESPONSE_TARGET_MIN[priority]:g} min")
+    print(f"Stats: {sim.stats['calls_today']:,} calls, {sim.stats['dispatched']:,} dispatched, "
+          f"{sim.diverted:,} diverted (backlog over {sim.max_queue:,})")
+    rate = n_calls / elapsed * 60 if elapsed > 0 else math.inf
+    print(f"Wall time {elapsed:.2f}s ({rate:,.0f} incidents/min)")
+    if engine is not None:
+        print(f"Road travel tables: {len(sim._road_tables)} (station, bucket) searches")
+
+
+if __name__ == "__main__":
+    main()
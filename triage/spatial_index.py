@@ -0,0 +1,288 @@
+"""
+In-memory spatial indexes for ambulances and hospitals.
+
+- GridIndex: uniform lat/lon grid with O(1) moves, used for the live fleet
+- StaticKDTree: balanced 2-D tree built once, used for fixed sites (hospitals)
+
+Both answer k-nearest and radius queries and return (distance_km, item_id)
+pairs sorted by distance.
+"""
+
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+# -------------------------------------------------------
+# MOVING POINTS (AMBULANCES)
+# -------------------------------------------------------
+class GridIndex:
+    """
+    Uniform grid over lat/lon for frequently moving points.
+
+    Each item lives in exactly one cell. Moving an item inside its cell is a
+    tuple overwrite; crossing a cell boundary is two dict operations. Queries
+    scan rings of cells outward from the query cell and stop as soon as no
+    unvisited cell can hold a closer match.
+    """
+
+    def __init__(self, cell_deg=0.01):
+        self.cell_deg = cell_deg
+        self._cells = {}   # (row, col) -> set of item ids
+        self._items = {}   # item id -> (lat, lon, state, (row, col))
+        self._row_range = None
+        self._col_range = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item_id):
+        return item_id in self._items
+
+    def _cell(self, lat, lon):
+        return (int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg)))
+
+    def _grow_bounds(self, cell):
+        row, col = cell
+        if self._row_range is None:
+            self._row_range = [row, row]
+            self._col_range = [col, col]
+            return
+        if row < self._row_range[0]:
+            self._row_range[0] = row
+        elif row > self._row_range[1]:
+            self._row_range[1] = row
+        if col < self._col_range[0]:
+            self._col_range[0] = col
+        elif col > self._col_range[1]:
+            self._col_range[1] = col
+
+    def upsert(self, item_id, lat, lon, state=None):
+        """Insert an item or move it to a new position (state kept if None)"""
+        cell = self._cell(lat, lon)
+        old = self._items.get(item_id)
+        if old is not None:
+            if state is None:
+                state = old[2]
+            if old[3] != cell:
+                bucket = self._cells[old[3]]
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._cells[old[3]]
+                self._cells.setdefault(cell, set()).add(item_id)
+                self._grow_bounds(cell)
+        else:
+            self._cells.setdefault(cell, set()).add(item_id)
+            self._grow_bounds(cell)
+        self._items[item_id] = (lat, lon, state, cell)
+
+    def set_state(self, item_id, state):
+        """Change an item's state without moving it"""
+        lat, lon, _, cell = self._items[item_id]
+        self._items[item_id] = (lat, lon, state, cell)
+
+    def remove(self, item_id):
+        """Drop an item from the index (no-op if missing)"""
+        old = self._items.pop(item_id, None)
+        if old is None:
+            return
+        bucket = self._cells[old[3]]
+        bucket.discard(item_id)
+        if not bucket:
+            del self._cells[old[3]]
+
+    def get(self, item_id):
+        """Return (lat, lon, state) for an item, or None"""
+        entry = self._items.get(item_id)
+        return entry[:3] if entry else None
+
+    def _ring(self, center, radius):
+        row, col = center
+        if radius == 0:
+            yield center
+            return
+        for c in range(col - radius, col + radius + 1):
+            yield (row - radius, c)
+            yield (row + radius, c)
+        for r in range(row - radius + 1, row + radius):
+            yield (r, col - radius)
+            yield (r, col + radius)
+
+    def _max_ring(self, center):
+        """Ring radius beyond which no occupied cell exists"""
+        if self._row_range is None:
+            return -1
+        row, col = center
+        return max(
+            abs(row - self._row_range[0]), abs(row - self._row_range[1]),
+            abs(col - self._col_range[0]), abs(col - self._col_range[1]),
+        )
+
+    def _ring_width_km(self, lat):
+        """Lower bound on the distance covered by one ring of cells"""
+        lat_edge = min(abs(lat) + self.cell_deg, 89.9)
+        return self.cell_deg * KM_PER_DEG_LAT * math.cos(math.radians(lat_edge))
+
+    def nearest(self, lat, lon, k=1, states=None, max_km=None):
+        """Return up to k (distance_km, item_id) pairs closest to a point"""
+        if k <= 0 or not self._items:
+            return []
+        center = self._cell(lat, lon)
+        ring_km = self._ring_width_km(lat)
+        last_ring = self._max_ring(center)
+        if max_km is not None:
+            last_ring = min(last_ring, int(max_km / ring_km) + 1)
+
+        heap = []  # max-heap on distance via negation, size <= k
+        radius = 0
+        while radius <= last_ring:
+            for cell in self._ring(center, radius):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for item_id in bucket:
+                    p_lat, p_lon, p_state, _ = self._items[item_id]
+                    if states is not None and p_state not in states:
+                        continue
+                    d = haversine_km(lat, lon, p_lat, p_lon)
+                    if max_km is not None and d > max_km:
+                        continue
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d, item_id))
+                    elif d < -heap[0][0]:
+                        heapq.heapreplace(heap, (-d, item_id))
+            # Every unvisited cell is at least `radius` full rings away
+            if len(heap) == k and -heap[0][0] <= radius * ring_km:
+                break
+            radius += 1
+        return sorted((-d, item_id) for d, item_id in heap)
+
+    def within_radius(self, lat, lon, radius_km, states=None):
+        """Return all (distance_km, item_id) pairs within radius_km of a point"""
+        if not self._items:
+            return []
+        center = self._cell(lat, lon)
+        last_ring = min(self._max_ring(center), int(radius_km / self._ring_width_km(lat)) + 1)
+        found = []
+        for radius in range(last_ring + 1):
+            for cell in self._ring(center, radius):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for item_id in bucket:
+                    p_lat, p_lon, p_state, _ = self._items[item_id]
+                    if states is not None and p_state not in states:
+                        continue
+                    d = haversine_km(lat, lon, p_lat, p_lon)
+                    if d <= radius_km:
+                        found.append((d, item_id))
+        found.sort()
+        return found
+
+
+# -------------------------------------------------------
+# STATIC POINTS (HOSPITALS, STATIONS)
+# -------------------------------------------------------
+class StaticKDTree:
+    """
+    2-D tree over fixed sites, built once from (item_id, lat, lon) tuples.
+
+    Points are projected to a local equirectangular plane (km) around the
+    centroid, which is accurate to well under 1% across a city. Queries take
+    an optional `where` predicate on item ids, e.g. a capability check.
+    """
+
+    def __init__(self, points):
+        points = list(points)
+        self.ids = [p[0] for p in points]
+        if points:
+            self.ref_lat = sum(p[1] for p in points) / len(points)
+        else:
+            self.ref_lat = 0.0
+        self._kx = KM_PER_DEG_LAT * math.cos(math.radians(self.ref_lat))
+        self.xy = [self._project(p[1], p[2]) for p in points]
+        # Node layout: index into points, left subtree, right subtree, axis
+        self._nodes = []
+        self._root = self._build(list(range(len(points))), 0)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _project(self, lat, lon):
+        return (lon * self._kx, lat * KM_PER_DEG_LAT)
+
+    def _build(self, idxs, depth):
+        if not idxs:
+            return -1
+        axis = depth % 2
+        idxs.sort(key=lambda i: self.xy[i][axis])
+        mid = len(idxs) // 2
+        node = len(self._nodes)
+        self._nodes.append([idxs[mid], -1, -1, axis])
+        self._nodes[node][1] = self._build(idxs[:mid], depth + 1)
+        self._nodes[node][2] = self._build(idxs[mid + 1:], depth + 1)
+        return node
+
+    def nearest(self, lat, lon, k=1, where=None, max_km=None):
+        """Return up to k (distance_km, item_id) pairs closest to a point"""
+        if k <= 0 or self._root < 0:
+            return []
+        qx, qy = self._project(lat, lon)
+        heap = []
+        bound = [math.inf if max_km is None else max_km]
+
+        def visit(node):
+            if node < 0:
+                return
+            idx, left, right, axis = self._nodes[node]
+            px, py = self.xy[idx]
+            d = math.hypot(px - qx, py - qy)
+            if d <= bound[0] and (where is None or where(self.ids[idx])):
+                if len(heap) < k:
+                    heapq.heappush(heap, (-d, idx))
+                elif d < -heap[0][0]:
+                    heapq.heapreplace(heap, (-d, idx))
+                if len(heap) == k:
+                    bound[0] = min(bound[0], -heap[0][0])
+            diff = (qx - px) if axis == 0 else (qy - py)
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if abs(diff) <= bound[0]:
+                visit(far)
+
+        visit(self._root)
+        return sorted((-d, self.ids[idx]) for d, idx in heap)
+
+    def within_radius(self, lat, lon, radius_km, where=None):
+        """Return all (distance_km, item_id) pairs within radius_km of a point"""
+        qx, qy = self._project(lat, lon)
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            idx, left, right, axis = self._nodes[node]
+            px, py = self.xy[idx]
+            d = math.hypot(px - qx, py - qy)
+            if d <= radius_km and (where is None or where(self.ids[idx])):
+                found.append((d, self.ids[idx]))
+            diff = (qx - px) if axis == 0 else (qy - py)
+            if diff <= radius_km:
+                stack.append(left)
+            if diff >= -radius_km:
+                stack.append(right)
+        found.sort()
+        return found
@@ -0,0 +1,102 @@
+"""
+Shared page stylesheets.
+
+Every page used to push several KB of inline <style> through st.markdown on
+every rerun, and index.py alone injected overlapping blocks that redefined
+the same rules. The CSS now lives once in styles/*.css: rules shared by
+several pages in base, portal and dashboard, the rest in one file per page.
+`python -m triage.styles` minifies each page's bundle into
+static/<page>.min.css, which Streamlit serves as a static asset
+(server.enableStaticServing). A page then sends only a one-line @import per
+rerun and the browser takes the sheet from its cache. Without static serving,
+or when a built file no longer matches its sources, the minified bundle is
+inlined instead.
+"""
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+
+STYLE_DIR = "styles"
+STATIC_DIR = "static"
+STATIC_URL = "app/static"       # relative, so it also works under server.baseUrlPath
+BUNDLES = {
+    'home': ['base', 'portal', 'home'],
+    'patient': ['base', 'portal', 'dashboard', 'patient'],
+    'technician': ['base', 'portal', 'dashboard', 'technician'],
+    'routing': ['base', 'routing'],
+    'chatbot': ['base', 'chatbot'],
+}
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_AROUND = re.compile(r"\s*([{}:;,>])\s*")
+
+
+def minify(css):
+    """Drop comments, whitespace and last semicolons"""
+    css = _SPACE.sub(" ", _COMMENT.sub("", css))
+    return _AROUND.sub(r"\1", css).replace(";}", "}").strip()
+
+
+def sources(page):
+    return [os.path.join(STYLE_DIR, f"{name}.css") for name in BUNDLES[page]]
+
+
+def static_path(page):
+    return os.path.join(STATIC_DIR, f"{page}.min.css")
+
+
+def bundle(page):
+    """Minified CSS of a page: its shared sheets then its own, in cascade order"""
+    parts = []
+    for path in sources(page):
+        with open(path, "r", encoding="utf-8") as f:
+            parts.append(f.read())
+    return minify("\n".join(parts))
+
+
+def built(page):
+    """Contents of the built static file, or None"""
+    try:
+        with open(static_path(page), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def build():
+    """Write static/<page>.min.css for every bundle; returns {page: bytes}"""
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    sizes = {}
+    for page in BUNDLES:
+        css = bundle(page)
+        with open(static_path(page), "w", encoding="utf-8") as f:
+            f.write(css + "\n")
+        sizes[page] = len(css.encode())
+    return sizes
+
+
+@lru_cache(maxsize=None)
+def style_tag(page, static=True):
+    """
+    <style> element for a page, computed once per process.
+
+    With static serving: an @import of the built asset, versioned by content
+    so browsers may cache it until it changes. Otherwise the bundle inline.
+    """
+    css = bundle(page)
+    if static and built(page) == css:
+        version = hashlib.md5(css.encode()).hexdigest()[:10]
+        return f'<style>@import url("{STATIC_URL}/{page}.min.css?v={version}");</style>'
+    return f"<style>{css}</style>"
+
+
+def main():
+    for page, size in build().items():
+        print(f"🎨 {static_path(page)}: {size / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
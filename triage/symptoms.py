@@ -0,0 +1,13 @@
+"""
+The ten binary symptom features of the triage questionnaire, in the column
+order the model was trained on.
+
+Kept apart from triage.classifier so modules that only need the names (chat
+intent detection, the triage daemon client) do not import pandas and
+scikit-learn or load the model.
+"""
+
+FEATURES = [
+    'chest_pain', 'shortness_of_breath', 'unconsciousness', 'bleeding',
+    'confusion', 'weakness', 'seizure', 'trauma', 'dizziness', 'cyanosis',
+]
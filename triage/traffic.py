@@ -0,0 +1,112 @@
+"""
+Time-of-day traffic profiles for the road graph.
+
+Every directed edge stores 96 travel times, one per 15-minute bucket of the
+day, in a single (edges x 96) uint16 array in tenths of a second (max ~109
+minutes per edge). Search code never reads that table directly: it asks for
+the per-bucket weight list, which is materialized once per bucket and cached
+until the profile changes.
+"""
+
+import math
+from datetime import datetime
+
+import numpy as np
+
+BUCKET_MINUTES = 15
+BUCKETS_PER_DAY = 24 * 60 // BUCKET_MINUTES
+UNITS_PER_SECOND = 10
+MAX_UNITS = np.iinfo(np.uint16).max
+
+# Hourly congestion multipliers (00:00 .. 23:00) for a large Indian city
+ARTERIAL_CURVE = [
+    1.00, 1.00, 1.00, 1.00, 1.00, 1.05, 1.20, 1.45, 1.80, 2.10, 1.95, 1.60,
+    1.50, 1.45, 1.45, 1.55, 1.75, 2.00, 2.25, 2.15, 1.80, 1.45, 1.20, 1.05,
+]
+LOCAL_CURVE = [
+    1.00, 1.00, 1.00, 1.00, 1.00, 1.00, 1.10, 1.25, 1.45, 1.60, 1.50, 1.35,
+    1.30, 1.30, 1.30, 1.35, 1.45, 1.60, 1.75, 1.70, 1.50, 1.30, 1.10, 1.00,
+]
+
+
+def bucket_for(when=None):
+    """15-minute bucket index (0-95) for a datetime, minute-of-day, or now"""
+    if when is None:
+        when = datetime.now()
+    if isinstance(when, datetime):
+        minute = when.hour * 60 + when.minute
+    else:
+        minute = int(when)
+    return (minute // BUCKET_MINUTES) % BUCKETS_PER_DAY
+
+
+def _bucket_curve(hourly):
+    """Interpolate an hourly curve to 96 buckets (values at bucket midpoints)"""
+    out = []
+    for b in range(BUCKETS_PER_DAY):
+        hour = (b + 0.5) * BUCKET_MINUTES / 60.0 - 0.5
+        lo = math.floor(hour)
+        frac = hour - lo
+        out.append(hourly[lo % 24] * (1 - frac) + hourly[(lo + 1) % 24] * frac)
+    return np.array(out)
+
+
+class TrafficProfiles:
+    """Per-edge travel-time profiles in 15-minute buckets"""
+
+    def __init__(self, table):
+        table = np.asarray(table)
+        if table.ndim != 2 or table.shape[1] != BUCKETS_PER_DAY:
+            raise ValueError(f"profile table must be (edges, {BUCKETS_PER_DAY}), got {table.shape}")
+        self.table = np.ascontiguousarray(table, dtype=np.uint16)
+        self.version = 0
+        self._weights = {}
+
+    @property
+    def n_edges(self):
+        return self.table.shape[0]
+
+    @classmethod
+    def from_free_flow(cls, free_flow_s, road_class, seed=0):
+        """Synthetic profiles: free-flow time scaled by a time-of-day curve per road class"""
+        free_flow_s = np.asarray(free_flow_s, dtype=float)
+        arterial = np.asarray(road_class) == 0
+        curves = np.where(arterial[:, None], _bucket_curve(ARTERIAL_CURVE), _bucket_curve(LOCAL_CURVE))
+        # Per-edge variation so not every road congests identically
+        rng = np.random.default_rng(seed)
+        jitter = 1.0 + 0.15 * rng.random(len(free_flow_s))[:, None] * (curves - 1.0)
+        seconds = free_flow_s[:, None] * curves * jitter
+        units = np.clip(np.rint(seconds * UNITS_PER_SECOND), 1, MAX_UNITS)
+        return cls(units.astype(np.uint16))
+
+    @classmethod
+    def load(cls, path):
+        """Load a profile table saved with save()"""
+        with np.load(path) as data:
+            return cls(data['table'])
+
+    def save(self, path):
+        """Save the profile table as a compressed .npz"""
+        np.savez_compressed(path, table=self.table)
+
+    def weights(self, bucket):
+        """Edge travel times in seconds for one bucket, as a list for fast indexing"""
+        cached = self._weights.get(bucket)
+        if cached is None:
+            cached = (self.table[:, bucket] / UNITS_PER_SECOND).tolist()
+            self._weights[bucket] = cached
+        return cached
+
+    def update_edges(self, edge_ids, seconds, buckets=None):
+        """Overwrite travel times for some edges (all buckets unless given)"""
+        units = np.clip(np.rint(np.asarray(seconds, dtype=float) * UNITS_PER_SECOND), 1, MAX_UNITS)
+        if buckets is None:
+            self.table[np.asarray(edge_ids), :] = units.reshape(-1, 1) if units.ndim == 1 else units
+        else:
+            self.table[np.ix_(np.asarray(edge_ids), np.asarray(buckets))] = units.reshape(len(edge_ids), -1)
+        self._weights.clear()
+        self.version += 1
+
+    def nbytes(self):
+        """Memory held by the compact table"""
+        return self.table.nbytes
@@ -0,0 +1,304 @@
+"""
+Headless triage API for call-center software and other non-browser callers.
+
+The same classification and queue transitions as the patient portal, without
+a Streamlit script rerun per step:
+
+    POST /triage     {answers}                         -> classification only
+    POST /requests   {name, age, phone, location, answers, symptoms?, id?}
+                                                       -> classify, geocode and enqueue
+    GET  /stats      service counters
+
+The model and geocoder are loaded once when the service starts. New calls are
+not written to emergency_queue.json one by one: they are collected in memory
+and a background writer merges each batch into the queue and stats files
+(re-read under the queue lock at every flush, so dispatches made on the
+technician dashboard in between are kept). A burst of calls therefore costs one file write per flush
+interval instead of a full queue rewrite per call. Sending the same `id`
+again enqueues the call once.
+
+Run from the repository root:
+    python -m triage.triage_api --port 8767
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from triage import classifier
+from triage.classifier import hybrid_classify_and_prioritize, parse_answers
+from triage.geocoder import build_geocoder
+from triage.queue_store import QUEUE_FILE, STATS_FILE, record_calls, update_queue
+
+ACTIONS = {
+    'HIGH': 'Immediate ambulance dispatch - Life threatening',
+    'MEDIUM': 'Ambulance dispatch within 15 minutes - Serious condition',
+    'LOW': 'Ambulance dispatch when available - Non-critical',
+}
+REQUIRED_FIELDS = ('name', 'age', 'phone', 'location')
+MAX_BODY_BYTES = 64 * 1024
+# Longest accepted text per caller field; they end up on the dispatcher's queue cards
+MAX_FIELD_CHARS = {'id': 64, 'name': 100, 'phone': 20, 'location': 200, 'symptoms': 500}
+
+
+def classify(answers):
+    """Classification result for validated answers"""
+    return describe(hybrid_classify_and_prioritize(answers))
+
+
+def describe(classification):
+    """Result dict of a (diagnosis, priority, severity_score, method) tuple"""
+    diagnosis, priority, severity_score, method = classification
+    return {
+        'diagnosis': diagnosis,
+        'priority': priority,
+        'severity_score': severity_score,
+        'method': method,
+        'action': ACTIONS[priority],
+    }
+
+
+def caller_fields(body):
+    """Validated caller details of an intake record; ValueError on the first bad field"""
+    if not isinstance(body, dict):
+        raise ValueError("body must be a JSON object")
+    missing = [f for f in REQUIRED_FIELDS if body.get(f) in (None, '')]
+    if missing:
+        raise ValueError(f"missing fields: {', '.join(missing)}")
+    try:
+        age = int(body['age'])
+    except (TypeError, ValueError):
+        raise ValueError("age must be a number")
+    if not 0 <= age <= 120:
+        raise ValueError("age must be between 0 and 120")
+    request_id = body.get('id')
+    if not isinstance(request_id, (str, int, type(None))) or isinstance(request_id, bool):
+        raise ValueError("id must be a string or an integer")
+    fields = {
+        'id': request_id or uuid.uuid4().int >> 64,
+        'name': str(body['name']),
+        'age': age,
+        'phone': str(body['phone']),
+        'location': str(body['location']),
+        'symptoms': str(body.get('symptoms') or 'AI-assessed symptoms'),
+    }
+    for field, limit in MAX_FIELD_CHARS.items():
+        if len(str(fields[field])) > limit:
+            raise ValueError(f"{field} must be at most {limit} characters")
+    return fields
+
+
+def new_request(fields, result, geo=None):
+    """Queue entry from caller details, a classification result and an optional geocode"""
+    request = {
+        'id': fields['id'],
+        'name': fields['name'],
+        'age': fields['age'],
+        'location': fields['location'],
+        'condition': result['diagnosis'],
+        'priority': result['priority'],
+        'severity_score': result['severity_score'],
+        'symptoms': fields['symptoms'],
+        'time': 'Just now',
+        'phone': fields['phone'],
+    }
+    # Coordinates let dispatch route to the patient
+    if geo:
+        request['lat'] = geo['lat']
+        request['lon'] = geo['lon']
+        request['geo_confidence'] = geo['confidence']
+        request['in_service_area'] = geo['in_service_area']
+    return request
+
+
+class TriageService:
+    """Warm classifier + geocoder and a write-behind batch of new calls"""
+
+    def __init__(self, geocoder=None, queue_path=QUEUE_FILE, stats_path=STATS_FILE, flush_interval=0.5):
+        self.geocoder = geocoder
+        self.queue_path = queue_path
+        self.stats_path = stats_path
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self.stats = {'triaged': 0, 'received': 0, 'queued': 0, 'duplicates': 0, 'flushes': 0, 'rejected': 0}
+
+    def triage(self, body):
+        """POST /triage"""
+        if not isinstance(body, dict):
+            raise ValueError("body must be a JSON object")
+        result = classify(parse_answers(body.get('answers')))
+        with self._lock:
+            self.stats['triaged'] += 1
+        return result
+
+    def build_request(self, body):
+        """Queue entry for a POST /requests body, as the patient portal builds it"""
+        fields = caller_fields(body)
+        result = classify(parse_answers(body.get('answers')))
+        geo = self.geocoder.geocode(fields['location']) if self.geocoder else None
+        return new_request(fields, result, geo), result
+
+    def submit(self, body):
+        """POST /requests: classify now, enqueue with the next flush"""
+        request, result = self.build_request(body)
+        with self._lock:
+            self._pending.append(request)
+            self.stats['received'] += 1
+        reply = dict(result, id=request['id'])
+        if 'lat' in request:
+            reply['geo'] = {k: request[k] for k in ('lat', 'lon', 'geo_confidence', 'in_service_area')}
+        return reply
+
+    def flush(self):
+        """Merge pending calls into the queue and stats files; returns how many were queued"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return 0
+            try:
+                queued = update_queue(lambda queue, stats: record_calls(queue, stats, pending),
+                                      self.queue_path, self.stats_path)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = pending     # retried with the next flush
+                raise
+            with self._lock:
+                self.stats['queued'] += queued
+                self.stats['duplicates'] += len(pending) - queued
+                self.stats['flushes'] += 1
+            return queued
+
+    def reject(self):
+        """Count a request refused by the HTTP endpoint"""
+        with self._lock:
+            self.stats['rejected'] += 1
+
+    def snapshot(self):
+        info = classifier.cache_info()
+        with self._lock:
+            pending = len(self._pending)
+            stats = dict(self.stats)
+        return dict(stats, pending=pending, model_loaded=classifier.MODEL_LOADED,
+                    classify_cache={'hits': info.hits, 'misses': info.misses})
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Could not write emergency queue: {e}")
+
+    def start(self):
+        """Start the background queue writer"""
+        self._worker = threading.Thread(target=self._run, name="triage-queue-writer", daemon=True)
+        self._worker.start()
+
+    def stop(self):
+        """Stop the writer after a final flush"""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+        self.flush()
+
+
+# -------------------------------------------------------
+# HTTP ENDPOINT
+# -------------------------------------------------------
+def make_handler(service):
+    """Request handler bound to a TriageService"""
+
+    routes = {'/triage': service.triage, '/requests': service.submit}
+
+    class TriageHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive for call-center integrations
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def _reply(self, code, body):
+            data = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if not 0 <= length <= MAX_BODY_BYTES:
+                    raise ValueError(f"Content-Length must be 0-{MAX_BODY_BYTES}")
+            except ValueError as e:
+                service.reject()
+                self.close_connection = True    # the body is left unread
+                return self._reply(400, {'error': str(e)})
+            data = self.rfile.read(length)     # always drained, so the connection stays usable
+            handle = routes.get(self.path)
+            if handle is None:
+                return self._reply(404, {'error': 'not found'})
+            try:
+                result = handle(json.loads(data or b"null"))
+            except ValueError as e:     # includes malformed JSON
+                service.reject()
+                return self._reply(400, {'error': str(e)})
+            self._reply(201 if self.path == '/requests' else 200, result)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                return self._reply(200, service.snapshot())
+            self._reply(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return TriageHandler
+
+
+def start(service, host="127.0.0.1", port=0):
+    """Serve in a background thread (tests, benchmarks); returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    service.start()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def serve(service, host="127.0.0.1", port=8767):
+    """Run the triage API until interrupted"""
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    service.start()
+    print(f"🚑 Triage API listening on http://{host}:{port} (POST /triage, POST /requests)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless triage and intake API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--queue", default=QUEUE_FILE, help="emergency queue file")
+    parser.add_argument("--stats", default=STATS_FILE, help="system stats file")
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="seconds between queue writes")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    service = TriageService(build_geocoder(), args.queue, args.stats, args.flush_interval)
+    service.geocoder.geocode("Sitabuldi")       # warm the indexes before the first caller
+    print(f"✅ Classifier and geocoder ready in {time.perf_counter() - started:.2f} s")
+    serve(service, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
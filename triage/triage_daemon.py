@@ -0,0 +1,316 @@
+"""
+Warm triage daemon shared by the Streamlit processes of one host.
+
+Every process that imports triage.classifier pays for pandas, scikit-learn
+and unpickling emergency_triage_model.pkl, so running several Streamlit
+workers behind a proxy multiplies that memory and cold-start time. The
+daemon loads them once, classifies all 2^10 symptom patterns at startup and
+answers lookups over a Unix domain socket. Pages go through TriageClient,
+which imports neither, keeps a small pool of open connections and falls
+back to the in-process classifier (imported on first use) while the daemon
+is unreachable.
+
+Protocol, big-endian, one request per round trip on a reused connection:
+
+    request     op:u8  count:u16  count x code:u16    code bit i = FEATURES[i]
+    op 'C'      count x (diagnosis:u16  priority:u8  method:u8  severity:u16)
+    op 'N'      length:u32  JSON {diagnoses, priorities, methods, model_loaded}
+
+A client fetches the name tables once; after that a classification costs
+2 bytes out and 6 bytes back. Larger batches are split into requests of at
+most 65535 codes.
+
+The socket lives in a private runtime directory rather than directly in
+world-writable /tmp, where another local user could claim the path first
+and answer in the daemon's place: $XDG_RUNTIME_DIR, else a per-user
+triage-<uid> directory under the temp dir, created 0700. The daemon refuses
+to use a socket directory owned by another (non-root) user.
+
+Run from the repository root:
+    python -m triage.triage_daemon
+    TRIAGE_SOCKET=/run/triage/triage.sock python -m triage.triage_daemon
+"""
+
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+
+from triage.symptoms import FEATURES
+
+# Fixed per-user name (not mkdtemp) so the daemon and every client agree on it
+RUNTIME_DIR = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+    tempfile.gettempdir(), f"triage-{os.getuid()}" if hasattr(os, "getuid") else "triage")
+SOCKET_PATH = os.environ.get("TRIAGE_SOCKET") or os.path.join(RUNTIME_DIR, "triage-daemon.sock")
+PATTERNS = 2 ** len(FEATURES)
+MAX_CODES = 0xFFFF          # request count is a u16
+OP_CLASSIFY = ord('C')
+OP_NAMES = ord('N')
+HEADER = struct.Struct("!BH")
+RESULT = struct.Struct("!HBBH")
+LENGTH = struct.Struct("!I")
+RETRY_AFTER_S = 5.0         # stay in-process this long after the daemon fails
+
+
+def pattern_code(answers):
+    """10-bit symptom pattern of an answers dict (same 0/1 reading as answers_key)"""
+    return sum(1 << i for i, f in enumerate(FEATURES) if answers.get(f, 0) == 1)
+
+
+def code_key(code):
+    """Feature tuple of a pattern code"""
+    return tuple((code >> i) & 1 for i in range(len(FEATURES)))
+
+
+# -------------------------------------------------------
+# DAEMON
+# -------------------------------------------------------
+class ResultTable:
+    """Every symptom pattern classified once, packed as wire records"""
+
+    def __init__(self):
+        from triage import classifier
+
+        results = classifier.classify_batch([code_key(code) for code in range(PATTERNS)])
+        diagnoses, priorities, methods = {}, {}, {}
+        self.records = []
+        for diagnosis, priority, severity_score, method in results:
+            self.records.append(RESULT.pack(
+                diagnoses.setdefault(str(diagnosis), len(diagnoses)),
+                priorities.setdefault(priority, len(priorities)),
+                methods.setdefault(method, len(methods)),
+                int(severity_score),
+            ))
+        names = json.dumps({
+            'diagnoses': list(diagnoses), 'priorities': list(priorities), 'methods': list(methods),
+            'model_loaded': classifier.MODEL_LOADED,
+        }).encode()
+        self.names = LENGTH.pack(len(names)) + names
+
+    def reply(self, op, codes):
+        if op == OP_CLASSIFY:
+            return b"".join(self.records[code] for code in codes)
+        if op == OP_NAMES:
+            return self.names
+        raise ValueError(f"unknown op {op}")
+
+
+def make_handler(table):
+    """Connection handler bound to a ResultTable"""
+
+    class TriageHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            while True:
+                header = self.rfile.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    return
+                op, count = HEADER.unpack(header)
+                body = self.rfile.read(2 * count)
+                if len(body) < 2 * count:
+                    return
+                codes = struct.unpack(f"!{count}H", body)
+                try:
+                    data = table.reply(op, codes)
+                except (ValueError, IndexError):
+                    return      # malformed request: drop the connection
+                self.wfile.write(data)
+
+    return TriageHandler
+
+
+def claim_socket(path):
+    """Remove a stale socket file; RuntimeError if a daemon is already listening"""
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"a triage daemon is already listening on {path}")
+
+
+def make_socket_dir(path):
+    """Create the socket's directory (0700); refuse one that another user owns"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    owner = os.stat(directory).st_uid
+    if owner not in (0, os.getuid()):
+        raise PermissionError(f"{directory} belongs to uid {owner}, not to this user")
+
+
+def start(table, path=SOCKET_PATH):
+    """Serve in a background thread (tests, benchmarks); returns the server"""
+    make_socket_dir(path)
+    claim_socket(path)
+    server = socketserver.ThreadingUnixStreamServer(path, make_handler(table))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(table, path=SOCKET_PATH):
+    """Run the daemon until interrupted or terminated"""
+    make_socket_dir(path)
+    claim_socket(path)
+    signal.signal(signal.SIGTERM, _interrupt)       # service managers stop with SIGTERM
+    server = socketserver.ThreadingUnixStreamServer(path, make_handler(table))
+    server.daemon_threads = True
+    os.chmod(path, 0o660)
+    print(f"🧠 Triage daemon listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+# -------------------------------------------------------
+# CLIENT
+# -------------------------------------------------------
+class TriageClient:
+    """Pooled daemon connections with in-process fallback"""
+
+    def __init__(self, path=SOCKET_PATH, pool_size=4, timeout=1.0, retry_after=RETRY_AFTER_S):
+        self.path = path
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._names = None
+        self._down_until = 0.0
+        self.stats = {'remote': 0, 'fallback': 0, 'errors': 0}
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    @staticmethod
+    def _recv_exact(sock, size):
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = sock.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionError("triage daemon closed the connection")
+            buf += chunk
+        return bytes(buf)
+
+    def _call(self, op, codes, reply_size=None):
+        """One round trip; a pooled connection that went stale is retried once on a fresh one"""
+        request = HEADER.pack(op, len(codes)) + struct.pack(f"!{len(codes)}H", *codes)
+        try:
+            sock, pooled = self._pool.get_nowait(), True
+        except queue.Empty:
+            sock, pooled = self._connect(), False
+        try:
+            sock.sendall(request)
+            if reply_size is None:
+                data = self._recv_exact(sock, LENGTH.size)
+                data = self._recv_exact(sock, LENGTH.unpack(data)[0])
+            else:
+                data = self._recv_exact(sock, reply_size)
+        except OSError:
+            sock.close()
+            if not pooled:
+                raise
+            self._drain()
+            return self._call(op, codes, reply_size)
+        try:
+            self._pool.put_nowait(sock)
+        except queue.Full:
+            sock.close()
+        return data
+
+    def _drain(self):
+        """Close every pooled connection (they all point at the same dead daemon)"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _remote(self, codes):
+        if self._names is None:
+            self._names = json.loads(self._call(OP_NAMES, ()))
+        names = self._names
+        results = []
+        for start in range(0, len(codes), MAX_CODES):
+            chunk = codes[start:start + MAX_CODES]
+            data = self._call(OP_CLASSIFY, chunk, RESULT.size * len(chunk))
+            for diagnosis, priority, method, severity in RESULT.iter_unpack(data):
+                results.append((names['diagnoses'][diagnosis], names['priorities'][priority],
+                                severity, names['methods'][method]))
+        return results
+
+    def classify_codes(self, codes):
+        """(diagnosis, priority, severity_score, method) per pattern code"""
+        codes = list(codes)
+        if time.monotonic() >= self._down_until:
+            try:
+                results = self._remote(codes)
+                self.stats['remote'] += len(codes)
+                return results
+            except (OSError, ValueError, IndexError):
+                self.stats['errors'] += 1
+                self._names = None
+                self._drain()
+                self._down_until = time.monotonic() + self.retry_after
+        from triage.classifier import classify_batch
+
+        self.stats['fallback'] += len(codes)
+        return classify_batch([code_key(code) for code in codes])
+
+    def classify(self, answers):
+        """Drop-in for hybrid_classify_and_prioritize"""
+        return self.classify_codes([pattern_code(answers)])[0]
+
+    def model_loaded(self):
+        """Whether the classifier behind this client (daemon or in-process) has the ML model"""
+        self.classify_codes([0])
+        if self._names is not None:
+            return self._names['model_loaded']
+        from triage import classifier
+
+        return classifier.MODEL_LOADED
+
+    def close(self):
+        self._drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm triage classification daemon")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path (env TRIAGE_SOCKET)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    table = ResultTable()
+    print(f"✅ {PATTERNS} symptom patterns classified in {time.perf_counter() - started:.2f} s")
+    try:
+        serve(table, args.socket)
+    except (RuntimeError, OSError) as e:
+        print(f"⚠️ {e}")
+
+
+if __name__ == "__main__":
+    main()